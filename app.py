@@ -1,613 +1,62 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+import plotly.io as pio
+from plotly.colors import hex_to_rgb
 import math
-import json
+import functools
+import types
+import os
+import hashlib
+import importlib.util
+import io
 
-# Page configuration
-st.set_page_config(
-    page_title="Racing Lap Simulator",
-    page_icon="🏎️",
-    layout="wide"
+from racing_sim import (
+    AIR_DENSITY,
+    TIRE_COMPOUND_GRIP,
+    WEATHER_GRIP,
+    Car,
+    CarSetup,
+    Decimate,
+    EveryNSteps,
+    FixedDistance,
+    FixedTime,
+    LapStore,
+    Normal,
+    ResultCache,
+    TelemetryTable,
+    Track,
+    Uniform,
+    create_car_database,
+    create_tracks,
+    derive_channels,
+    generate_track_coordinates,
+    iter_csv,
+    lap_channels,
+    lap_time_sensitivity,
+    lttb,
+    monte_carlo,
+    optimize_setup,
+    optimize_strategy,
+    sensitivity_matrix,
+    simulate_batch,
+    simulate_stint,
+    simulation_key,
+    write_telemetry,
 )
 
-# Constants
-GRAVITY = 9.81
-AIR_DENSITY = 1.225
+# Telemetry sampling choices offered in the simulation panel
+TELEMETRY_SAMPLING = {
+    "Every 10 steps": EveryNSteps(10),
+    "Every 10 m": FixedDistance(10),
+    "Every 0.1 s": FixedTime(0.1),
+    "Adaptive (±0.5 km/h)": Decimate(0.5),
+}
 
-class Car:
-    def __init__(self, name, mass, power, drag_coef, downforce_coef, tire_grip, rolling_resistance, frontal_area, color, category):
-        self.name = name
-        self.mass = mass  # kg
-        self.power = power  # kW
-        self.drag_coef = drag_coef
-        self.downforce_coef = downforce_coef
-        self.tire_grip = tire_grip
-        self.rolling_resistance = rolling_resistance
-        self.frontal_area = frontal_area  # m²
-        self.color = color
-        self.category = category
-
-class Track:
-    def __init__(self, name, segments, country, length_km, coordinates=None):
-        self.name = name
-        self.segments = segments
-        self.total_length = sum(seg['length'] for seg in segments)
-        self.country = country
-        self.length_km = length_km
-        self.coordinates = coordinates or []
-
-def create_car_database():
-    """Create database of different car types with realistic specifications"""
-    cars = {
-        # F1 Teams (2023/2024 season)
-        "Red Bull RB19": Car(
-            name="Red Bull RB19",
-            mass=798, power=760, drag_coef=0.85, downforce_coef=3.2, 
-            tire_grip=1.9, rolling_resistance=0.015, frontal_area=1.5,
-            color="#1E41FF", category="Formula 1"
-        ),
-        "Ferrari SF-23": Car(
-            name="Ferrari SF-23",
-            mass=798, power=755, drag_coef=0.88, downforce_coef=3.1,
-            tire_grip=1.85, rolling_resistance=0.015, frontal_area=1.5,
-            color="#DC143C", category="Formula 1"
-        ),
-        "Mercedes W14": Car(
-            name="Mercedes W14",
-            mass=798, power=750, drag_coef=0.92, downforce_coef=2.9,
-            tire_grip=1.8, rolling_resistance=0.015, frontal_area=1.5,
-            color="#00D2BE", category="Formula 1"
-        ),
-        "McLaren MCL60": Car(
-            name="McLaren MCL60",
-            mass=798, power=745, drag_coef=0.89, downforce_coef=3.0,
-            tire_grip=1.82, rolling_resistance=0.015, frontal_area=1.5,
-            color="#FF8700", category="Formula 1"
-        ),
-        "Aston Martin AMR23": Car(
-            name="Aston Martin AMR23",
-            mass=798, power=740, drag_coef=0.90, downforce_coef=2.95,
-            tire_grip=1.78, rolling_resistance=0.015, frontal_area=1.5,
-            color="#006F62", category="Formula 1"
-        ),
-        "Alpine A523": Car(
-            name="Alpine A523",
-            mass=798, power=735, drag_coef=0.93, downforce_coef=2.8,
-            tire_grip=1.75, rolling_resistance=0.015, frontal_area=1.5,
-            color="#0090FF", category="Formula 1"
-        ),
-        
-        # GT3 Cars
-        "Porsche 911 GT3 R": Car(
-            name="Porsche 911 GT3 R",
-            mass=1300, power=410, drag_coef=0.65, downforce_coef=1.8,
-            tire_grip=1.4, rolling_resistance=0.018, frontal_area=2.0,
-            color="#FFD700", category="GT3"
-        ),
-        "BMW M4 GT3": Car(
-            name="BMW M4 GT3",
-            mass=1320, power=415, drag_coef=0.68, downforce_coef=1.7,
-            tire_grip=1.38, rolling_resistance=0.018, frontal_area=2.1,
-            color="#0066CC", category="GT3"
-        ),
-        "Mercedes-AMG GT3": Car(
-            name="Mercedes-AMG GT3",
-            mass=1310, power=420, drag_coef=0.66, downforce_coef=1.75,
-            tire_grip=1.42, rolling_resistance=0.018, frontal_area=2.0,
-            color="#C0C0C0", category="GT3"
-        ),
-        "Ferrari 488 GT3": Car(
-            name="Ferrari 488 GT3",
-            mass=1315, power=425, drag_coef=0.64, downforce_coef=1.9,
-            tire_grip=1.45, rolling_resistance=0.018, frontal_area=1.95,
-            color="#DC143C", category="GT3"
-        ),
-        "Audi R8 LMS GT3": Car(
-            name="Audi R8 LMS GT3",
-            mass=1325, power=418, drag_coef=0.67, downforce_coef=1.72,
-            tire_grip=1.40, rolling_resistance=0.018, frontal_area=2.05,
-            color="#FF0000", category="GT3"
-        ),
-        
-        # LMP1/Hypercar
-        "Toyota GR010 Hybrid": Car(
-            name="Toyota GR010 Hybrid",
-            mass=1030, power=680, drag_coef=0.55, downforce_coef=2.5,
-            tire_grip=1.65, rolling_resistance=0.016, frontal_area=1.8,
-            color="#EB0A1E", category="LMP1/Hypercar"
-        ),
-        "Ferrari 499P": Car(
-            name="Ferrari 499P",
-            mass=1030, power=675, drag_coef=0.57, downforce_coef=2.4,
-            tire_grip=1.62, rolling_resistance=0.016, frontal_area=1.8,
-            color="#DC143C", category="LMP1/Hypercar"
-        ),
-        
-        # Hypercars
-        "Lamborghini Huracán": Car(
-            name="Lamborghini Huracán",
-            mass=1422, power=470, drag_coef=0.39, downforce_coef=0.3,
-            tire_grip=1.2, rolling_resistance=0.012, frontal_area=2.1,
-            color="#32CD32", category="Hypercar"
-        ),
-        "McLaren 720S": Car(
-            name="McLaren 720S",
-            mass=1468, power=530, drag_coef=0.32, downforce_coef=0.4,
-            tire_grip=1.25, rolling_resistance=0.011, frontal_area=2.0,
-            color="#FF8C00", category="Hypercar"
-        ),
-        "Ferrari F8 Tributo": Car(
-            name="Ferrari F8 Tributo",
-            mass=1435, power=530, drag_coef=0.34, downforce_coef=0.35,
-            tire_grip=1.22, rolling_resistance=0.012, frontal_area=2.05,
-            color="#B22222", category="Hypercar"
-        ),
-        "Porsche 911 Turbo S": Car(
-            name="Porsche 911 Turbo S",
-            mass=1640, power=478, drag_coef=0.35, downforce_coef=0.25,
-            tire_grip=1.18, rolling_resistance=0.012, frontal_area=2.15,
-            color="#FFFF00", category="Hypercar"
-        ),
-        
-        # Sports Cars
-        "BMW M3 Competition": Car(
-            name="BMW M3 Competition",
-            mass=1730, power=375, drag_coef=0.35, downforce_coef=0.1,
-            tire_grip=1.1, rolling_resistance=0.014, frontal_area=2.3,
-            color="#4169E1", category="Sports Car"
-        ),
-        "Audi RS6": Car(
-            name="Audi RS6",
-            mass=2040, power=441, drag_coef=0.32, downforce_coef=0.05,
-            tire_grip=1.05, rolling_resistance=0.015, frontal_area=2.4,
-            color="#800080", category="Sports Car"
-        ),
-        "Mercedes-AMG C63": Car(
-            name="Mercedes-AMG C63",
-            mass=1715, power=375, drag_coef=0.34, downforce_coef=0.08,
-            tire_grip=1.08, rolling_resistance=0.014, frontal_area=2.25,
-            color="#2F4F4F", category="Sports Car"
-        )
-    }
-    
-    return cars
-
-def create_tracks():
-    """Create more realistic F1 track layouts with detailed coordinates"""
-    tracks = {
-        "Monza": Track(
-            name="Monza",
-            country="Italy",
-            length_km=5.793,
-            coordinates=[
-                # Real GPS-inspired coordinates scaled for visualization
-                (0, 0), (1100, 20), (1150, -10), (1200, -50), (1220, -30), (1300, 0),
-                (2200, 50), (2250, 20), (2300, -20), (2320, -40), (2400, -20), (2500, 10),
-                (2600, -30), (2650, -60), (2700, -40), (2800, -10), (2900, -40),
-                (2950, -80), (3000, -120), (3100, -140), (3200, -120), (3300, -80),
-                (3400, -40), (3500, -10), (3600, 20), (3700, 50), (3800, 30),
-                (3850, 0), (3900, -30), (3950, -50), (4000, -30), (4100, 0),
-                (4200, 40), (4300, 80), (4400, 100), (4500, 80), (4600, 40),
-                (4700, 0), (4750, -40), (4800, -80), (4750, -120), (4700, -100),
-                (4600, -80), (4500, -60), (4400, -40), (4300, -20), (4200, 0),
-                (4100, 20), (4000, 40), (3900, 20), (3800, 0), (3700, -20),
-                (3600, -40), (3500, -20), (3400, 0), (3300, 20), (3200, 40),
-                (3100, 20), (3000, 0), (2900, -20), (2800, 0), (2700, 20),
-                (2600, 40), (2500, 60), (2400, 40), (2300, 20), (2200, 0),
-                (2100, -20), (2000, 0), (1900, 20), (1800, 0), (1700, -20),
-                (1600, 0), (1500, 20), (1400, 0), (1300, -20), (1200, 0),
-                (1100, 20), (1000, 0), (900, -20), (800, 0), (700, 20),
-                (600, 0), (500, -20), (400, 0), (300, 20), (200, 0), (100, -20), (0, 0)
-            ],
-            segments=[
-                {"type": "straight", "length": 1142, "name": "Main Straight", "drs": True},
-                {"type": "corner", "length": 85, "radius": 85, "angle": 75, "name": "Turn 1 - Prima Variante"},
-                {"type": "straight", "length": 175, "name": "Approach to T2"},
-                {"type": "corner", "length": 95, "radius": 95, "angle": 65, "name": "Turn 2 - Prima Variante"},
-                {"type": "straight", "length": 1090, "name": "Back Straight", "drs": True},
-                {"type": "corner", "length": 120, "radius": 45, "angle": 85, "name": "Turn 3 - Seconda Variante"},
-                {"type": "straight", "length": 55, "name": "Chicane Link"},
-                {"type": "corner", "length": 130, "radius": 50, "angle": 75, "name": "Turn 4 - Seconda Variante"},
-                {"type": "straight", "length": 290, "name": "Approach to Lesmo"},
-                {"type": "corner", "length": 140, "radius": 65, "angle": 90, "name": "Turn 5 - Lesmo 1"},
-                {"type": "straight", "length": 185, "name": "Between Lesmos"},
-                {"type": "corner", "length": 155, "radius": 70, "angle": 85, "name": "Turn 6 - Lesmo 2"},
-                {"type": "straight", "length": 320, "name": "Approach to Ascari"},
-                {"type": "corner", "length": 110, "radius": 55, "angle": 70, "name": "Turn 7 - Ascari 1"},
-                {"type": "corner", "length": 125, "radius": 45, "angle": 80, "name": "Turn 8 - Ascari 2"},
-                {"type": "corner", "length": 95, "radius": 65, "angle": 60, "name": "Turn 9 - Ascari 3"},
-                {"type": "straight", "length": 415, "name": "Approach to Parabolica"},
-                {"type": "corner", "length": 320, "radius": 165, "angle": 180, "name": "Turn 10/11 - Parabolica"},
-                {"type": "straight", "length": 580, "name": "Start/Finish Straight"}
-            ]
-        ),
-        
-        "Silverstone": Track(
-            name="Silverstone",
-            country="Great Britain",
-            length_km=5.891,
-            coordinates=[
-                (0, 0), (200, 10), (400, 25), (600, 40), (800, 60), (1000, 80),
-                (1200, 100), (1400, 120), (1600, 140), (1800, 160), (2000, 180),
-                (2200, 200), (2400, 220), (2600, 240), (2800, 250), (3000, 260),
-                (3200, 270), (3400, 280), (3600, 290), (3800, 295), (4000, 300),
-                (4200, 295), (4400, 285), (4600, 270), (4800, 250), (5000, 225),
-                (5200, 195), (5400, 160), (5600, 120), (5800, 75), (6000, 25),
-                (6200, -25), (6400, -75), (6600, -125), (6800, -175), (7000, -225),
-                (7200, -275), (7400, -320), (7600, -360), (7800, -395), (8000, -425),
-                (8200, -450), (8400, -470), (8600, -485), (8800, -495), (9000, -500),
-                (9200, -495), (9400, -485), (9600, -470), (9800, -450), (10000, -425),
-                (10200, -395), (10400, -360), (10600, -320), (10800, -275), (11000, -225),
-                (11200, -175), (11400, -125), (11600, -75), (11800, -25), (12000, 25),
-                (12200, 75), (12400, 120), (12600, 160), (12800, 195), (13000, 225),
-                (13200, 250), (13400, 270), (13600, 285), (13800, 295), (14000, 300),
-                (14200, 295), (14400, 285), (14600, 270), (14800, 250), (15000, 225),
-                (15200, 195), (15400, 160), (15600, 120), (15800, 75), (16000, 25),
-                (16200, -25), (16400, -75), (16600, -125), (16800, -175), (17000, -200),
-                (17200, -180), (17400, -150), (17600, -110), (17800, -60), (18000, 0),
-                (18200, 60), (18400, 110), (18600, 150), (18800, 180), (19000, 200),
-                (19200, 180), (19400, 150), (19600, 110), (19800, 60), (20000, 0),
-                (20200, -60), (20400, -110), (20600, -150), (20800, -180), (21000, -200),
-                (20800, -220), (20600, -200), (20400, -170), (20200, -130), (20000, -80),
-                (19800, -20), (19600, 40), (19400, 90), (19200, 130), (19000, 160),
-                (18800, 180), (18600, 190), (18400, 185), (18200, 170), (18000, 145),
-                (17800, 110), (17600, 65), (17400, 10), (17200, -45), (17000, -90),
-                (16800, -125), (16600, -150), (16400, -165), (16200, -170), (16000, -165),
-                (15800, -150), (15600, -125), (15400, -90), (15200, -45), (15000, 10),
-                (14800, 65), (14600, 110), (14400, 145), (14200, 170), (14000, 185),
-                (13800, 190), (13600, 180), (13400, 160), (13200, 130), (13000, 90),
-                (12800, 40), (12600, -20), (12400, -80), (12200, -130), (12000, -170),
-                (11800, -200), (11600, -220), (11400, -230), (11200, -225), (11000, -210),
-                (10800, -185), (10600, -150), (10400, -105), (10200, -50), (10000, 15),
-                (9800, 80), (9600, 135), (9400, 180), (9200, 215), (9000, 240),
-                (8800, 255), (8600, 260), (8400, 255), (8200, 240), (8000, 215),
-                (7800, 180), (7600, 135), (7400, 80), (7200, 15), (7000, -50),
-                (6800, -105), (6600, -150), (6400, -185), (6200, -210), (6000, -225),
-                (5800, -230), (5600, -220), (5400, -200), (5200, -170), (5000, -130),
-                (4800, -80), (4600, -20), (4400, 40), (4200, 90), (4000, 130),
-                (3800, 160), (3600, 180), (3400, 190), (3200, 185), (3000, 170),
-                (2800, 145), (2600, 110), (2400, 65), (2200, 10), (2000, -45),
-                (1800, -90), (1600, -125), (1400, -150), (1200, -165), (1000, -170),
-                (800, -165), (600, -150), (400, -125), (200, -90), (0, -45), (0, 0)
-            ],
-            segments=[
-                {"type": "straight", "length": 265, "name": "Wellington Straight"},
-                {"type": "corner", "length": 95, "radius": 150, "angle": 35, "name": "Turn 1 - Abbey"},
-                {"type": "straight", "length": 180, "name": "National Straight"},
-                {"type": "corner", "length": 110, "radius": 95, "angle": 65, "name": "Turn 2 - Farm Curve"},
-                {"type": "straight", "length": 220, "name": "Approach to Village"},
-                {"type": "corner", "length": 85, "radius": 40, "angle": 90, "name": "Turn 3 - Village"},
-                {"type": "straight", "length": 155, "name": "The Loop Straight"},
-                {"type": "corner", "length": 140, "radius": 120, "angle": 75, "name": "Turn 4 - The Loop"},
-                {"type": "straight", "length": 95, "name": "Short Straight"},
-                {"type": "corner", "length": 120, "radius": 85, "angle": 80, "name": "Turn 5 - Aintree"},
-                {"type": "straight", "length": 310, "name": "Wellington Straight"},
-                {"type": "corner", "length": 165, "radius": 180, "angle": 55, "name": "Turn 6 - Brooklands"},
-                {"type": "straight", "length": 240, "name": "Luffield Straight"},
-                {"type": "corner", "length": 145, "radius": 95, "angle": 75, "name": "Turn 7 - Luffield"},
-                {"type": "straight", "length": 185, "name": "Woodcote Straight"},
-                {"type": "corner", "length": 125, "radius": 110, "angle": 65, "name": "Turn 8 - Woodcote"},
-                {"type": "straight", "length": 780, "name": "Copse Straight"},
-                {"type": "corner", "length": 110, "radius": 125, "angle": 70, "name": "Turn 9 - Copse"},
-                {"type": "straight", "length": 345, "name": "Maggotts Straight", "drs": True},
-                {"type": "corner", "length": 135, "radius": 280, "angle": 45, "name": "Turn 10 - Maggotts"},
-                {"type": "corner", "length": 125, "radius": 195, "angle": 55, "name": "Turn 11 - Becketts"},
-                {"type": "corner", "length": 145, "radius": 75, "angle": 85, "name": "Turn 12 - Chapel"},
-                {"type": "straight", "length": 910, "name": "Hangar Straight", "drs": True},
-                {"type": "corner", "length": 155, "radius": 110, "angle": 75, "name": "Turn 13 - Stowe"},
-                {"type": "straight", "length": 265, "name": "Vale Straight"},
-                {"type": "corner", "length": 125, "radius": 85, "angle": 80, "name": "Turn 14 - Vale"},
-                {"type": "corner", "length": 95, "radius": 65, "angle": 70, "name": "Turn 15 - Club"},
-                {"type": "straight", "length": 518, "name": "Start/Finish Straight"}
-            ]
-        ),
-        
-        "Monaco": Track(
-            name="Monaco",
-            country="Monaco", 
-            length_km=3.337,
-            coordinates=[
-                (0, 0), (50, 5), (100, 15), (145, 30), (180, 50), (200, 75),
-                (210, 100), (205, 125), (185, 145), (155, 160), (120, 170),
-                (80, 175), (40, 175), (0, 170), (-35, 160), (-65, 145),
-                (-90, 125), (-110, 100), (-125, 75), (-135, 50), (-140, 25),
-                (-140, 0), (-135, -25), (-125, -50), (-110, -75), (-90, -95),
-                (-65, -110), (-35, -120), (0, -125), (40, -125), (80, -120),
-                (120, -110), (155, -95), (185, -75), (205, -50), (210, -25),
-                (200, 0), (180, 25), (145, 45), (100, 60), (50, 70), (0, 75),
-                (-50, 75), (-95, 70), (-135, 60), (-170, 45), (-195, 25),
-                (-210, 0), (-215, -25), (-210, -50), (-195, -75), (-170, -95),
-                (-135, -110), (-95, -120), (-50, -125), (0, -125), (50, -120),
-                (95, -110), (135, -95), (170, -75), (195, -50), (210, -25),
-                (215, 0), (210, 25), (195, 50), (170, 70), (135, 85),
-                (95, 95), (50, 100), (0, 100), (-50, 95), (-95, 85),
-                (-135, 70), (-170, 50), (-195, 25), (-210, 0), (-215, -25),
-                (-210, -50), (-195, -75), (-170, -95), (-135, -110), (-95, -120),
-                (-50, -125), (0, -125), (50, -120), (95, -110), (135, -95),
-                (170, -75), (195, -50), (210, -25), (215, 0), (210, 25),
-                (195, 50), (170, 70), (135, 85), (95, 95), (50, 100),
-                (0, 100), (-50, 95), (-95, 85), (-135, 70), (-170, 50),
-                (-195, 25), (-210, 0)
-            ],
-            segments=[
-                {"type": "straight", "length": 185, "name": "Start/Finish Straight"},
-                {"type": "corner", "length": 95, "radius": 35, "angle": 85, "name": "Turn 1 - Sainte Devote"},
-                {"type": "straight", "length": 245, "name": "Beau Rivage"},
-                {"type": "corner", "length": 125, "radius": 65, "angle": 70, "name": "Turn 2 - Massenet"},
-                {"type": "straight", "length": 85, "name": "Casino Straight"},
-                {"type": "corner", "length": 155, "radius": 45, "angle": 95, "name": "Turn 3 - Casino"},
-                {"type": "straight", "length": 115, "name": "Mirabeau Straight"},
-                {"type": "corner", "length": 85, "radius": 55, "angle": 75, "name": "Turn 4 - Mirabeau"},
-                {"type": "straight", "length": 65, "name": "Fairmont Straight"},
-                {"type": "corner", "length": 125, "radius": 18, "angle": 180, "name": "Turn 5 - Grand Hotel Hairpin"},
-                {"type": "straight", "length": 155, "name": "Portier Straight"},
-                {"type": "corner", "length": 85, "radius": 45, "angle": 65, "name": "Turn 6 - Portier"},
-                {"type": "straight", "length": 245, "name": "Tunnel Straight"},
-                {"type": "corner", "length": 95, "radius": 85, "angle": 55, "name": "Turn 7 - Nouvelle Chicane"},
-                {"type": "corner", "length": 75, "radius": 75, "angle": 45, "name": "Turn 8 - Nouvelle Chicane"},
-                {"type": "straight", "length": 125, "name": "Tabac Straight"},
-                {"type": "corner", "length": 115, "radius": 65, "angle": 80, "name": "Turn 9 - Tabac"},
-                {"type": "straight", "length": 95, "name": "Swimming Pool Straight"},
-                {"type": "corner", "length": 85, "radius": 25, "angle": 90, "name": "Turn 10 - Swimming Pool"},
-                {"type": "corner", "length": 65, "radius": 30, "angle": 75, "name": "Turn 11 - Swimming Pool"},
-                {"type": "corner", "length": 95, "radius": 35, "angle": 85, "name": "Turn 12 - Swimming Pool"},
-                {"type": "straight", "length": 155, "name": "La Rascasse Straight"},
-                {"type": "corner", "length": 125, "radius": 28, "angle": 110, "name": "Turn 13 - La Rascasse"},
-                {"type": "straight", "length": 85, "name": "Anthony Noghes Straight"},
-                {"type": "corner", "length": 155, "radius": 55, "angle": 95, "name": "Turn 14 - Anthony Noghes"},
-                {"type": "straight", "length": 245, "name": "Final Straight"}
-            ]
-        ),
-        
-        "Spa-Francorchamps": Track(
-            name="Spa-Francorchamps",
-            country="Belgium",
-            length_km=7.004,
-            coordinates=[
-                (0, 0), (300, 20), (600, 45), (900, 75), (1200, 110), (1500, 150),
-                (1800, 195), (2100, 245), (2400, 300), (2700, 360), (3000, 425),
-                (3300, 495), (3600, 570), (3900, 650), (4200, 735), (4500, 825),
-                (4800, 920), (5100, 1020), (5400, 1125), (5700, 1235), (6000, 1350),
-                (6300, 1470), (6600, 1595), (6900, 1725), (7200, 1860), (7500, 2000),
-                (7800, 2145), (8100, 2295), (8400, 2450), (8700, 2610), (9000, 2775),
-                (9300, 2945), (9600, 3120), (9900, 3300), (10200, 3485), (10500, 3675),
-                (10800, 3870), (11100, 4070), (11400, 4275), (11700, 4485), (12000, 4700),
-                (12300, 4920), (12600, 5145), (12900, 5375), (13200, 5610), (13500, 5850),
-                (13800, 6095), (14100, 6345), (14400, 6600), (14700, 6860), (15000, 7125),
-                (15300, 7395), (15600, 7670), (15900, 7950), (16200, 8235), (16500, 8525),
-                (16800, 8820), (17100, 9120), (17400, 9425), (17700, 9735), (18000, 10050),
-                (17700, 10365), (17400, 10675), (17100, 10980), (16800, 11280), (16500, 11575),
-                (16200, 11865), (15900, 12150), (15600, 12430), (15300, 12705), (15000, 12975),
-                (14700, 13240), (14400, 13500), (14100, 13755), (13800, 14005), (13500, 14250),
-                (13200, 14490), (12900, 14725), (12600, 14955), (12300, 15180), (12000, 15400),
-                (11700, 15615), (11400, 15825), (11100, 16030), (10800, 16230), (10500, 16425),
-                (10200, 16615), (9900, 16800), (9600, 16980), (9300, 17155), (9000, 17325),
-                (8700, 17490), (8400, 17650), (8100, 17805), (7800, 17955), (7500, 18100),
-                (7200, 18240), (6900, 18375), (6600, 18505), (6300, 18630), (6000, 18750),
-                (5700, 18865), (5400, 18975), (5100, 19080), (4800, 19180), (4500, 19275),
-                (4200, 19365), (3900, 19450), (3600, 19530), (3300, 19605), (3000, 19675),
-                (2700, 19740), (2400, 19800), (2100, 19855), (1800, 19905), (1500, 19950),
-                (1200, 19990), (900, 20025), (600, 20055), (300, 20080), (0, 20100),
-                (-300, 20080), (-600, 20055), (-900, 20025), (-1200, 19990), (-1500, 19950),
-                (-1800, 19905), (-2100, 19855), (-2400, 19800), (-2700, 19740), (-3000, 19675),
-                (-3300, 19605), (-3600, 19530), (-3900, 19450), (-4200, 19365), (-4500, 19275),
-                (-4800, 19180), (-5100, 19080), (-5400, 18975), (-5700, 18865), (-6000, 18750),
-                (-6300, 18630), (-6600, 18505), (-6900, 18375), (-7200, 18240), (-7500, 18100),
-                (-7800, 17955), (-8100, 17805), (-8400, 17650), (-8700, 17490), (-9000, 17325),
-                (-9300, 17155), (-9600, 16980), (-9900, 16800), (-10200, 16615), (-10500, 16425),
-                (-10800, 16230), (-11100, 16030), (-11400, 15825), (-11700, 15615), (-12000, 15400),
-                (-12300, 15180), (-12600, 14955), (-12900, 14725), (-13200, 14490), (-13500, 14250),
-                (-13800, 14005), (-14100, 13755), (-14400, 13500), (-14700, 13240), (-15000, 12975),
-                (-15300, 12705), (-15600, 12430), (-15900, 12150), (-16200, 11865), (-16500, 11575),
-                (-16800, 11280), (-17100, 10980), (-17400, 10675), (-17700, 10365), (-18000, 10050),
-                (-17700, 9735), (-17400, 9425), (-17100, 9120), (-16800, 8820), (-16500, 8525),
-                (-16200, 8235), (-15900, 7950), (-15600, 7670), (-15300, 7395), (-15000, 7125),
-                (-14700, 6860), (-14400, 6600), (-14100, 6345), (-13800, 6095), (-13500, 5850),
-                (-13200, 5610), (-12900, 5375), (-12600, 5145), (-12300, 4920), (-12000, 4700),
-                (-11700, 4485), (-11400, 4275), (-11100, 4070), (-10800, 3870), (-10500, 3675),
-                (-10200, 3485), (-9900, 3300), (-9600, 3120), (-9300, 2945), (-9000, 2775),
-                (-8700, 2610), (-8400, 2450), (-8100, 2295), (-7800, 2145), (-7500, 2000),
-                (-7200, 1860), (-6900, 1725), (-6600, 1595), (-6300, 1470), (-6000, 1350),
-                (-5700, 1235), (-5400, 1125), (-5100, 1020), (-4800, 920), (-4500, 825),
-                (-4200, 735), (-3900, 650), (-3600, 570), (-3300, 495), (-3000, 425),
-                (-2700, 360), (-2400, 300), (-2100, 245), (-1800, 195), (-1500, 150),
-                (-1200, 110), (-900, 75), (-600, 45), (-300, 20), (0, 0)
-            ],
-            segments=[
-                {"type": "straight", "length": 700, "name": "Start/Finish Straight"},
-                {"type": "corner", "length": 120, "radius": 35, "angle": 90, "name": "Turn 1 - La Source"},
-                {"type": "straight", "length": 180, "name": "Raidillon Approach"},
-                {"type": "corner", "length": 85, "radius": 250, "angle": 35, "name": "Turn 2 - Eau Rouge"},
-                {"type": "corner", "length": 140, "radius": 180, "angle": 45, "name": "Turn 3 - Raidillon"},
-                {"type": "straight", "length": 1800, "name": "Kemmel Straight", "drs": True},
-                {"type": "corner", "length": 160, "radius": 45, "angle": 110, "name": "Turn 4 - Les Combes"},
-                {"type": "straight", "length": 280, "name": "Approach to Malmedy"},
-                {"type": "corner", "length": 95, "radius": 65, "angle": 75, "name": "Turn 5 - Malmedy"},
-                {"type": "straight", "length": 420, "name": "Sector 2 Straight"},
-                {"type": "corner", "length": 125, "radius": 85, "angle": 80, "name": "Turn 6 - Rivage"},
-                {"type": "straight", "length": 190, "name": "Approach to Pouhon"},
-                {"type": "corner", "length": 180, "radius": 120, "angle": 95, "name": "Turn 7 - Pouhon"},
-                {"type": "straight", "length": 320, "name": "Sector 2 Mid"},
-                {"type": "corner", "length": 110, "radius": 75, "angle": 65, "name": "Turn 8 - Fagnes"},
-                {"type": "straight", "length": 280, "name": "Approach to Stavelot"},
-                {"type": "corner", "length": 95, "radius": 55, "angle": 85, "name": "Turn 9 - Stavelot"},
-                {"type": "straight", "length": 150, "name": "Paul Frere Straight"},
-                {"type": "corner", "length": 125, "radius": 95, "angle": 70, "name": "Turn 10 - Paul Frere"},
-                {"type": "straight", "length": 480, "name": "Blanchimont Straight"},
-                {"type": "corner", "length": 220, "radius": 350, "angle": 55, "name": "Turn 11 - Blanchimont"},
-                {"type": "straight", "length": 370, "name": "Final Straight"},
-                {"type": "corner", "length": 85, "radius": 25, "angle": 120, "name": "Turn 12 - Bus Stop Chicane"},
-                {"type": "corner", "length": 65, "radius": 30, "angle": 100, "name": "Turn 13 - Bus Stop Exit"},
-                {"type": "straight", "length": 285, "name": "Start/Finish Approach"}
-            ]
-        ),
-        
-        "Suzuka": Track(
-            name="Suzuka",
-            country="Japan",
-            length_km=5.807,
-            coordinates=[
-                (0, 0), (250, 15), (500, 35), (750, 60), (1000, 90), (1250, 125),
-                (1500, 165), (1750, 210), (2000, 260), (2250, 315), (2500, 375),
-                (2750, 440), (3000, 510), (3250, 585), (3500, 665), (3750, 750),
-                (4000, 840), (4250, 935), (4500, 1035), (4750, 1140), (5000, 1250),
-                (5250, 1365), (5500, 1485), (5750, 1610), (6000, 1740), (6250, 1875),
-                (6500, 2015), (6750, 2160), (7000, 2310), (7250, 2465), (7500, 2625),
-                (7750, 2790), (8000, 2960), (8250, 3135), (8500, 3315), (8750, 3500),
-                (9000, 3690), (9250, 3885), (9500, 4085), (9750, 4290), (10000, 4500),
-                (10250, 4715), (10500, 4935), (10750, 5160), (11000, 5390), (11250, 5625),
-                (11500, 5865), (11750, 6110), (12000, 6360), (12250, 6615), (12500, 6875),
-                (12750, 7140), (13000, 7410), (13250, 7685), (13500, 7965), (13750, 8250),
-                (14000, 8540), (14250, 8835), (14500, 9135), (14750, 9440), (15000, 9750),
-                (14750, 10060), (14500, 10365), (14250, 10665), (14000, 10960), (13750, 11250),
-                (13500, 11535), (13250, 11815), (13000, 12090), (12750, 12360), (12500, 12625),
-                (12250, 12885), (12000, 13140), (11750, 13390), (11500, 13635), (11250, 13875),
-                (11000, 14110), (10750, 14340), (10500, 14565), (10250, 14785), (10000, 15000),
-                (9750, 15210), (9500, 15415), (9250, 15615), (9000, 15810), (8750, 16000),
-                (8500, 16185), (8250, 16365), (8000, 16540), (7750, 16710), (7500, 16875),
-                (7250, 17035), (7000, 17190), (6750, 17340), (6500, 17485), (6250, 17625),
-                (6000, 17760), (5750, 17890), (5500, 18015), (5250, 18135), (5000, 18250),
-                (4750, 18360), (4500, 18465), (4250, 18565), (4000, 18660), (3750, 18750),
-                (3500, 18835), (3250, 18915), (3000, 18990), (2750, 19060), (2500, 19125),
-                (2250, 19185), (2000, 19240), (1750, 19290), (1500, 19335), (1250, 19375),
-                (1000, 19410), (750, 19440), (500, 19465), (250, 19485), (0, 19500),
-                (-250, 19485), (-500, 19465), (-750, 19440), (-1000, 19410), (-1250, 19375),
-                (-1500, 19335), (-1750, 19290), (-2000, 19240), (-2250, 19185), (-2500, 19125),
-                (-2750, 19060), (-3000, 18990), (-3250, 18915), (-3500, 18835), (-3750, 18750),
-                (-4000, 18660), (-4250, 18565), (-4500, 18465), (-4750, 18360), (-5000, 18250),
-                (-5250, 18135), (-5500, 18015), (-5750, 17890), (-6000, 17760), (-6250, 17625),
-                (-6500, 17485), (-6750, 17340), (-7000, 17190), (-7250, 17035), (-7500, 16875),
-                (-7750, 16710), (-8000, 16540), (-8250, 16365), (-8500, 16185), (-8750, 16000),
-                (-9000, 15810), (-9250, 15615), (-9500, 15415), (-9750, 15210), (-10000, 15000),
-                (-10250, 14785), (-10500, 14565), (-10750, 14340), (-11000, 14110), (-11250, 13875),
-                (-11500, 13635), (-11750, 13390), (-12000, 13140), (-12250, 12885), (-12500, 12625),
-                (-12750, 12360), (-13000, 12090), (-13250, 11815), (-13500, 11535), (-13750, 11250),
-                (-14000, 10960), (-14250, 10665), (-14500, 10365), (-14750, 10060), (-15000, 9750),
-                (-14750, 9440), (-14500, 9135), (-14250, 8835), (-14000, 8540), (-13750, 8250),
-                (-13500, 7965), (-13250, 7685), (-13000, 7410), (-12750, 7140), (-12500, 6875),
-                (-12250, 6615), (-12000, 6360), (-11750, 6110), (-11500, 5865), (-11250, 5625),
-                (-11000, 5390), (-10750, 5160), (-10500, 4935), (-10250, 4715), (-10000, 4500),
-                (-9750, 4290), (-9500, 4085), (-9250, 3885), (-9000, 3690), (-8750, 3500),
-                (-8500, 3315), (-8250, 3135), (-8000, 2960), (-7750, 2790), (-7500, 2625),
-                (-7250, 2465), (-7000, 2310), (-6750, 2160), (-6500, 2015), (-6250, 1875),
-                (-6000, 1740), (-5750, 1610), (-5500, 1485), (-5250, 1365), (-5000, 1250),
-                (-4750, 1140), (-4500, 1035), (-4250, 935), (-4000, 840), (-3750, 750),
-                (-3500, 665), (-3250, 585), (-3000, 510), (-2750, 440), (-2500, 375),
-                (-2250, 315), (-2000, 260), (-1750, 210), (-1500, 165), (-1250, 125),
-                (-1000, 90), (-750, 60), (-500, 35), (-250, 15), (0, 0)
-            ],
-            segments=[
-                {"type": "straight", "length": 547, "name": "Start/Finish Straight"},
-                {"type": "corner", "length": 115, "radius": 85, "angle": 90, "name": "Turn 1"},
-                {"type": "straight", "length": 220, "name": "Approach to S-Curves"},
-                {"type": "corner", "length": 95, "radius": 65, "angle": 70, "name": "Turn 2 - S-Curves"},
-                {"type": "corner", "length": 85, "radius": 75, "angle": 65, "name": "Turn 3 - S-Curves"},
-                {"type": "straight", "length": 380, "name": "Dunlop Straight"},
-                {"type": "corner", "length": 125, "radius": 45, "angle": 100, "name": "Turn 4 - Dunlop Corner"},
-                {"type": "straight", "length": 180, "name": "Approach to Degner"},
-                {"type": "corner", "length": 95, "radius": 55, "angle": 85, "name": "Turn 5 - Degner 1"},
-                {"type": "corner", "length": 85, "radius": 65, "angle": 75, "name": "Turn 6 - Degner 2"},
-                {"type": "straight", "length": 280, "name": "Hairpin Approach"},
-                {"type": "corner", "length": 140, "radius": 25, "angle": 180, "name": "Turn 7 - Hairpin"},
-                {"type": "straight", "length": 320, "name": "Back Straight"},
-                {"type": "corner", "length": 110, "radius": 95, "angle": 80, "name": "Turn 8 - Spoon Curve"},
-                {"type": "straight", "length": 420, "name": "Spoon Straight"},
-                {"type": "corner", "length": 185, "radius": 180, "angle": 135, "name": "Turn 9 - Spoon Exit"},
-                {"type": "straight", "length": 850, "name": "Main Straight", "drs": True},
-                {"type": "corner", "length": 95, "radius": 85, "angle": 70, "name": "Turn 10 - 130R"},
-                {"type": "straight", "length": 290, "name": "Approach to Casio"},
-                {"type": "corner", "length": 85, "radius": 35, "angle": 90, "name": "Turn 11 - Casio Triangle"},
-                {"type": "corner", "length": 65, "radius": 45, "angle": 75, "name": "Turn 12 - Casio Triangle"},
-                {"type": "corner", "length": 75, "radius": 55, "angle": 65, "name": "Turn 13 - Casio Triangle"},
-                {"type": "straight", "length": 385, "name": "Final Straight"}
-            ]
-        ),
-        
-        "Nurburgring": Track(
-            name="Nurburgring",
-            country="Germany",
-            length_km=5.148,
-            coordinates=[
-                (0, 0), (200, 10), (400, 25), (600, 45), (800, 70), (1000, 100),
-                (1200, 135), (1400, 175), (1600, 220), (1800, 270), (2000, 325),
-                (2200, 385), (2400, 450), (2600, 520), (2800, 595), (3000, 675),
-                (3200, 760), (3400, 850), (3600, 945), (3800, 1045), (4000, 1150),
-                (4200, 1260), (4400, 1375), (4600, 1495), (4800, 1620), (5000, 1750),
-                (5200, 1885), (5400, 2025), (5600, 2170), (5800, 2320), (6000, 2475),
-                (6200, 2635), (6400, 2800), (6600, 2970), (6800, 3145), (7000, 3325),
-                (7200, 3510), (7400, 3700), (7600, 3895), (7800, 4095), (8000, 4300),
-                (8200, 4510), (8400, 4725), (8600, 4945), (8800, 5170), (9000, 5400),
-                (9200, 5635), (9400, 5875), (9600, 6120), (9800, 6370), (10000, 6625),
-                (10200, 6885), (10400, 7150), (10600, 7420), (10800, 7695), (11000, 7975),
-                (11200, 8260), (11400, 8550), (11600, 8845), (11800, 9145), (12000, 9450),
-                (11800, 9755), (11600, 10055), (11400, 10350), (11200, 10640), (11000, 10925),
-                (10800, 11205), (10600, 11480), (10400, 11750), (10200, 12015), (10000, 12275),
-                (9800, 12530), (9600, 12780), (9400, 13025), (9200, 13265), (9000, 13500),
-                (8800, 13730), (8600, 13955), (8400, 14175), (8200, 14390), (8000, 14600),
-                (7800, 14805), (7600, 15005), (7400, 15200), (7200, 15390), (7000, 15575),
-                (6800, 15755), (6600, 15930), (6400, 16100), (6200, 16265), (6000, 16425),
-                (5800, 16580), (5600, 16730), (5400, 16875), (5200, 17015), (5000, 17150),
-                (4800, 17280), (4600, 17405), (4400, 17525), (4200, 17640), (4000, 17750),
-                (3800, 17855), (3600, 17955), (3400, 18050), (3200, 18140), (3000, 18225),
-                (2800, 18305), (2600, 18380), (2400, 18450), (2200, 18515), (2000, 18575),
-                (1800, 18630), (1600, 18680), (1400, 18725), (1200, 18765), (1000, 18800),
-                (800, 18830), (600, 18855), (400, 18875), (200, 18890), (0, 18900),
-                (-200, 18890), (-400, 18875), (-600, 18855), (-800, 18830), (-1000, 18800),
-                (-1200, 18765), (-1400, 18725), (-1600, 18680), (-1800, 18630), (-2000, 18575),
-                (-2200, 18515), (-2400, 18450), (-2600, 18380), (-2800, 18305), (-3000, 18225),
-                (-3200, 18140), (-3400, 18050), (-3600, 17955), (-3800, 17855), (-4000, 17750),
-                (-4200, 17640), (-4400, 17525), (-4600, 17405), (-4800, 17280), (-5000, 17150),
-                (-5200, 17015), (-5400, 16875), (-5600, 16730), (-5800, 16580), (-6000, 16425),
-                (-6200, 16265), (-6400, 16100), (-6600, 15930), (-6800, 15755), (-7000, 15575),
-                (-7200, 15390), (-7400, 15200), (-7600, 15005), (-7800, 14805), (-8000, 14600),
-                (-8200, 14390), (-8400, 14175), (-8600, 13955), (-8800, 13730), (-9000, 13500),
-                (-9200, 13265), (-9400, 13025), (-9600, 12780), (-9800, 12530), (-10000, 12275),
-                (-10200, 12015), (-10400, 11750), (-10600, 11480), (-10800, 11205), (-11000, 10925),
-                (-11200, 10640), (-11400, 10350), (-11600, 10055), (-11800, 9755), (-12000, 9450),
-                (-11800, 9145), (-11600, 8845), (-11400, 8550), (-11200, 8260), (-11000, 7975),
-                (-10800, 7695), (-10600, 7420), (-10400, 7150), (-10200, 6885), (-10000, 6625),
-                (-9800, 6370), (-9600, 6120), (-9400, 5875), (-9200, 5635), (-9000, 5400),
-                (-8800, 5170), (-8600, 4945), (-8400, 4725), (-8200, 4510), (-8000, 4300),
-                (-7800, 4095), (-7600, 3895), (-7400, 3700), (-7200, 3510), (-7000, 3325),
-                (-6800, 3145), (-6600, 2970), (-6400, 2800), (-6200, 2635), (-6000, 2475),
-                (-5800, 2320), (-5600, 2170), (-5400, 2025), (-5200, 1885), (-5000, 1750),
-                (-4800, 1620), (-4600, 1495), (-4400, 1375), (-4200, 1260), (-4000, 1150),
-                (-3800, 1045), (-3600, 945), (-3400, 850), (-3200, 760), (-3000, 675),
-                (-2800, 595), (-2600, 520), (-2400, 450), (-2200, 385), (-2000, 325),
-                (-1800, 270), (-1600, 220), (-1400, 175), (-1200, 135), (-1000, 100),
-                (-800, 70), (-600, 45), (-400, 25), (-200, 10), (0, 0)
-            ],
-            segments=[
-                {"type": "straight", "length": 485, "name": "Start/Finish Straight"},
-                {"type": "corner", "length": 120, "radius": 45, "angle": 95, "name": "Turn 1 - Mercedes Arena"},
-                {"type": "straight", "length": 180, "name": "Approach to Ford Kurve"},
-                {"type": "corner", "length": 145, "radius": 75, "angle": 110, "name": "Turn 2 - Ford Kurve"},
-                {"type": "straight", "length": 290, "name": "Approach to Dunlop Kehre"},
-                {"type": "corner", "length": 125, "radius": 35, "angle": 120, "name": "Turn 3 - Dunlop Kehre"},
-                {"type": "straight", "length": 220, "name": "Schumacher S Approach"},
-                {"type": "corner", "length": 95, "radius": 55, "angle": 85, "name": "Turn 4 - Schumacher S"},
-                {"type": "corner", "length": 85, "radius": 65, "angle": 75, "name": "Turn 5 - Schumacher S"},
-                {"type": "straight", "length": 680, "name": "Veedol Chicane Straight"},
-                {"type": "corner", "length": 75, "radius": 25, "angle": 90, "name": "Turn 6 - Veedol Chicane"},
-                {"type": "corner", "length": 65, "radius": 30, "angle": 85, "name": "Turn 7 - Veedol Chicane"},
-                {"type": "straight", "length": 920, "name": "Dottinger Hohe", "drs": True},
-                {"type": "corner", "length": 180, "radius": 250, "angle": 45, "name": "Turn 8 - Hohenrain"},
-                {"type": "straight", "length": 340, "name": "Approach to Michael Schumacher S"},
-                {"type": "corner", "length": 110, "radius": 85, "angle": 80, "name": "Turn 9 - Michael Schumacher S"},
-                {"type": "corner", "length": 95, "radius": 95, "angle": 70, "name": "Turn 10 - Michael Schumacher S"},
-                {"type": "straight", "length": 285, "name": "Final Straight"},
-                {"type": "corner", "length": 125, "radius": 65, "angle": 90, "name": "Turn 11 - NGK Chicane"},
-                {"type": "corner", "length": 85, "radius": 75, "angle": 75, "name": "Turn 12 - NGK Chicane"},
-                {"type": "straight", "length": 420, "name": "Start/Finish Approach"}
-            ]
-        )
-    }
-    
-    return {name: track for name, track in tracks.items()}
+CHART_MAX_POINTS = 2000  # per trace, after downsampling to the chart window
+WEBGL_THRESHOLD = 1000  # points per trace above which charts render with WebGL
+FUEL_CATEGORIES = ("Formula 1", "GT3", "LMP1/Hypercar")  # categories with a fuel load slider
+MAX_FUEL_LOAD = 110  # kg, top of the fuel load slider
 
 def create_custom_track_builder():
     """Track builder interface"""
@@ -695,38 +144,6 @@ def create_custom_track_builder():
             st.session_state.custom_segments = []
             st.rerun()
 
-def generate_track_coordinates(segments):
-    """Generate coordinates for custom track"""
-    coords = [(0, 0)]
-    current_x, current_y = 0, 0
-    current_angle = 0
-    
-    for segment in segments:
-        if segment['type'] == 'straight':
-            # Add straight line
-            end_x = current_x + segment['length'] * math.cos(math.radians(current_angle))
-            end_y = current_y + segment['length'] * math.sin(math.radians(current_angle))
-            coords.append((end_x, end_y))
-            current_x, current_y = end_x, end_y
-        else:
-            # Add corner arc
-            radius = segment['radius']
-            angle_change = segment['angle']
-            
-            # Generate arc points
-            arc_points = max(5, int(angle_change / 10))
-            for i in range(1, arc_points + 1):
-                t = i / arc_points
-                angle_offset = angle_change * t
-                arc_x = current_x + radius * math.cos(math.radians(current_angle + angle_offset))
-                arc_y = current_y + radius * math.sin(math.radians(current_angle + angle_offset))
-                coords.append((arc_x, arc_y))
-            
-            current_x, current_y = coords[-1]
-            current_angle += angle_change
-    
-    return coords
-
 def create_custom_car_builder():
     """Car builder interface"""
     st.header("🏗️ Custom Car Builder")
@@ -780,172 +197,27 @@ def create_custom_car_builder():
         st.session_state.custom_car = custom_car
         st.success(f"✅ Created {car_name}!")
 
-def calculate_corner_speed(car, radius):
-    """Calculate maximum speed for a corner based on physics"""
-    if radius <= 0:
-        return 30
-    
-    speeds = np.linspace(15, 200, 100)
-    max_speed = 15
-    
-    for speed in speeds:
-        # Downforce increases with speed squared
-        downforce = 0.5 * AIR_DENSITY * car.downforce_coef * car.frontal_area * (speed/3.6)**2
-        
-        # Total vertical force
-        total_force = car.mass * GRAVITY + downforce
-        
-        # Maximum lateral force
-        max_lateral_force = car.tire_grip * total_force
-        
-        # Required centripetal force
-        centripetal_force = car.mass * (speed/3.6)**2 / radius
-        
-        if centripetal_force > max_lateral_force:
-            break
-        
-        max_speed = speed
-    
-    return max_speed
+@st.cache_resource
+def get_result_cache():
+    """Process-wide result cache shared by all sessions and reruns"""
+    return ResultCache(
+        max_bytes=int(os.environ.get("RACING_SIM_CACHE_MB", "64")) * 1024 * 1024,
+        cache_dir=os.environ.get("RACING_SIM_CACHE_DIR") or None
+    )
 
-def calculate_acceleration(car, speed_kmh):
-    """Calculate acceleration at current speed"""
-    speed_ms = speed_kmh / 3.6
-    
-    # Engine power limit
-    if speed_ms < 5:
-        speed_ms = 5
-    engine_force = car.power * 1000 / speed_ms
-    
-    # Aerodynamic drag
-    drag_force = 0.5 * AIR_DENSITY * car.drag_coef * car.frontal_area * speed_ms**2
-    
-    # Rolling resistance
-    rolling_force = car.rolling_resistance * car.mass * GRAVITY
-    
-    # Net force
-    net_force = engine_force - drag_force - rolling_force
-    
-    # Traction limit
-    downforce = 0.5 * AIR_DENSITY * car.downforce_coef * car.frontal_area * speed_ms**2
-    traction_limit = car.tire_grip * (car.mass * GRAVITY + downforce)
-    
-    # Apply traction limit
-    net_force = min(net_force, traction_limit)
-    
-    return max(-10, net_force / car.mass)
+@st.cache_resource
+def get_lap_store():
+    """Process-wide lap history; kept across restarts when RACING_SIM_STORE names a database file"""
+    return LapStore(os.environ.get("RACING_SIM_STORE") or ":memory:")
 
-def calculate_braking_distance(car, start_speed, end_speed):
-    """Calculate braking distance"""
-    if start_speed <= end_speed:
-        return 0
-    
-    start_ms = start_speed / 3.6
-    end_ms = end_speed / 3.6
-    
-    # Braking force
-    downforce = 0.5 * AIR_DENSITY * car.downforce_coef * car.frontal_area * start_ms**2
-    braking_force = car.tire_grip * (car.mass * GRAVITY + downforce)
-    drag_force = 0.5 * AIR_DENSITY * car.drag_coef * car.frontal_area * start_ms**2
-    
-    total_force = braking_force + drag_force
-    deceleration = total_force / car.mass
-    
-    # Distance calculation
-    distance = (start_ms**2 - end_ms**2) / (2 * deceleration)
-    
-    return max(0, distance)
+def smooth_track_coordinates(coordinates):
+    """Spline-smoothed (x, y) outline of a closed track, computed once per layout"""
+    return _smooth_track_coordinates(tuple(tuple(coord) for coord in coordinates))
 
-def simulate_lap(track, car):
-    """Simulate a complete lap with detailed physics"""
-    current_speed = 80  # Starting speed km/h
-    total_time = 0
-    total_distance = 0
-    
-    distances = [0]
-    speeds = [current_speed]
-    times = [0]
-    segment_names = ["Start"]
-    
-    dt = 0.05  # 50ms time step for better accuracy
-    
-    for i, segment in enumerate(track.segments):
-        segment_length = segment['length']
-        
-        if segment['type'] == 'straight':
-            # Find next corner
-            next_corner_speed = 100
-            for j in range(i + 1, len(track.segments)):
-                if track.segments[j]['type'] == 'corner':
-                    next_corner_speed = calculate_corner_speed(car, track.segments[j]['radius'])
-                    break
-            
-            # DRS effect
-            drs_boost = 1.15 if segment.get('drs', False) and car.category == "Formula 1" else 1.0
-            
-            distance_covered = 0
-            while distance_covered < segment_length:
-                remaining = segment_length - distance_covered
-                braking_dist = calculate_braking_distance(car, current_speed, next_corner_speed)
-                
-                if braking_dist >= remaining:
-                    # Brake
-                    decel = min(15, (current_speed - next_corner_speed) / dt)
-                    current_speed = max(next_corner_speed, current_speed - decel * dt)
-                else:
-                    # Accelerate
-                    accel = calculate_acceleration(car, current_speed)
-                    max_speed = 380 if car.category == "Formula 1" else 300
-                    current_speed = min(max_speed * drs_boost, current_speed + accel * dt)
-                
-                # Distance and time
-                distance_step = current_speed / 3.6 * dt
-                distance_covered += distance_step
-                total_distance += distance_step
-                total_time += dt
-                
-                # Record every 10 steps to reduce data
-                if len(distances) % 10 == 0:
-                    distances.append(total_distance)
-                    speeds.append(current_speed)
-                    times.append(total_time)
-                    segment_names.append(segment['name'])
-        
-        elif segment['type'] == 'corner':
-            # Corner handling
-            corner_speed = calculate_corner_speed(car, segment['radius'])
-            current_speed = min(current_speed, corner_speed)
-            
-            # Time through corner
-            corner_time = segment_length / (current_speed / 3.6)
-            total_time += corner_time
-            total_distance += segment_length
-            
-            distances.append(total_distance)
-            speeds.append(current_speed)
-            times.append(total_time)
-            segment_names.append(segment['name'])
-    
-    return {
-        'lap_time': total_time,
-        'total_distance': total_distance,
-        'avg_speed': (total_distance / total_time) * 3.6,
-        'top_speed': max(speeds),
-        'distances': distances,
-        'speeds': speeds,
-        'times': times,
-        'segments': segment_names
-    }
-
-def create_enhanced_track_layout(track):
-    """Create highly realistic track layouts with enhanced visuals"""
-    if not track.coordinates:
-        # Generate basic coordinates if none exist
-        track.coordinates = generate_track_coordinates(track.segments)
-    
-    coords = track.coordinates
-    x_coords = [coord[0] for coord in coords]
-    y_coords = [coord[1] for coord in coords]
+@functools.lru_cache(maxsize=64)
+def _smooth_track_coordinates(coordinates):
+    x_coords = tuple(coord[0] for coord in coordinates)
+    y_coords = tuple(coord[1] for coord in coordinates)
     
     # Smooth the track for better visuals
     if len(x_coords) > 10:
@@ -955,11 +227,52 @@ def create_enhanced_track_layout(track):
             tck, u = splprep([x_coords, y_coords], s=0, per=1)
             u_new = np.linspace(0, 1, len(x_coords) * 3)
             x_smooth, y_smooth = splev(u_new, tck)
-            x_coords, y_coords = x_smooth, y_smooth
-        except:
+            x_coords, y_coords = tuple(x_smooth.tolist()), tuple(y_smooth.tolist())
+        except Exception:
             pass  # Fall back to original coordinates
     
-    fig = go.Figure()
+    return x_coords, y_coords
+
+# Colours of the track layout figure; the theme name is part of the figure cache key
+TRACK_THEMES = {
+    "racing": {
+        'background': '#0D5D2B',  # Racing green
+        'grass': '#228B22',
+        'grass_fill': 'rgba(34, 139, 34, 0.3)',
+        'barrier': '#FF0000',
+        'surface': '#2F2F2F',
+        'text': 'white',
+    },
+}
+
+def create_enhanced_track_layout(track, theme="racing"):
+    """Create highly realistic track layouts with enhanced visuals.
+
+    The figure's JSON is built once per layout and theme and shared between
+    reruns and sessions, so picking another car does not re-render the
+    circuit; every call returns a new figure that callers may modify.
+    """
+    if not track.coordinates:
+        # Generate basic coordinates if none exist
+        track.coordinates = generate_track_coordinates(track.segments)
+    
+    compiled = track.compiled
+    return pio.from_json(_track_layout_json(
+        track.name,
+        track.country,
+        track.length_km,
+        tuple(tuple(coord) for coord in track.coordinates),
+        len(compiled),
+        tuple(np.flatnonzero(compiled.drs).tolist()),
+        tuple(np.flatnonzero(compiled.is_corner & (compiled.radii < 100)).tolist()),  # Tight corners only
+        theme,
+    ))
+
+@functools.lru_cache(maxsize=64)
+def _track_layout_json(name, country, length_km, coordinates, total_segments, drs_segments, tight_corners, theme):
+    colors = TRACK_THEMES[theme]
+    x_coords, y_coords = _smooth_track_coordinates(coordinates)
+    x_loop, y_loop = list(x_coords) + [x_coords[0]], list(y_coords) + [y_coords[0]]
     
     # Track colors by country/name
     track_colors = {
@@ -971,168 +284,165 @@ def create_enhanced_track_layout(track):
         "Nurburgring": "#000000",  # German black
     }
     
-    track_color = track_colors.get(track.name, "#333333")
+    track_color = track_colors.get(name, "#333333")
     
-    # Create track with realistic appearance
-    # Grass/background
-    fig.add_trace(go.Scatter(
-        x=x_coords + [x_coords[0]],
-        y=y_coords + [y_coords[0]],
-        mode='lines',
-        name='Track Grass',
-        line=dict(color='#228B22', width=80),
-        fill='toself',
-        fillcolor='rgba(34, 139, 34, 0.3)',
-        showlegend=False
-    ))
-    
-    # Track borders (barriers)
-    fig.add_trace(go.Scatter(
-        x=x_coords + [x_coords[0]],
-        y=y_coords + [y_coords[0]],
-        mode='lines',
-        name='Safety Barriers',
-        line=dict(color='#FF0000', width=35),
-        showlegend=False
-    ))
-    
-    # Track surface
-    fig.add_trace(go.Scatter(
-        x=x_coords + [x_coords[0]],
-        y=y_coords + [y_coords[0]],
-        mode='lines',
-        name=f'{track.name} Circuit',
-        line=dict(color='#2F2F2F', width=25),
-        hovertemplate=f'<b>{track.name}</b><br>Length: {track.length_km} km<br>Country: {track.country}<extra></extra>'
-    ))
-    
-    # Racing line
-    fig.add_trace(go.Scatter(
-        x=x_coords + [x_coords[0]],
-        y=y_coords + [y_coords[0]],
-        mode='lines',
-        name='Racing Line',
-        line=dict(color=track_color, width=3, dash='dot'),
-        showlegend=False
-    ))
+    # Grass/background, barriers, surface and racing line share the outline
+    traces = [
+        go.Scatter(
+            x=x_loop, y=y_loop, mode='lines', name='Track Grass',
+            line=dict(color=colors['grass'], width=80),
+            fill='toself', fillcolor=colors['grass_fill'], hoverinfo='skip'
+        ),
+        go.Scatter(
+            x=x_loop, y=y_loop, mode='lines', name='Safety Barriers',
+            line=dict(color=colors['barrier'], width=35), hoverinfo='skip'
+        ),
+        go.Scatter(
+            x=x_loop, y=y_loop, mode='lines', name=f'{name} Circuit',
+            line=dict(color=colors['surface'], width=25),
+            hovertemplate=f'<b>{name}</b><br>Length: {length_km} km<br>Country: {country}<extra></extra>'
+        ),
+        go.Scatter(
+            x=x_loop, y=y_loop, mode='lines', name='Racing Line',
+            line=dict(color=track_color, width=3, dash='dot'), hoverinfo='skip'
+        ),
+    ]
     
-    # Start/Finish line
+    # Start/Finish line: checkered pattern as one trace per colour, stripes split by None
     if len(x_coords) > 1:
         start_x, start_y = x_coords[0], y_coords[0]
         # Calculate perpendicular direction
-        dx = x_coords[1] - x_coords[0] if len(x_coords) > 1 else 1
-        dy = y_coords[1] - y_coords[0] if len(y_coords) > 1 else 0
+        dx = x_coords[1] - x_coords[0]
+        dy = y_coords[1] - y_coords[0]
         length = math.sqrt(dx*dx + dy*dy)
         if length > 0:
             # Perpendicular vector
             px, py = -dy/length * 20, dx/length * 20
-            
-            # Checkered pattern for start/finish
+            stripes = {'white': ([], []), 'black': ([], [])}
             for i in range(-3, 4):
-                color = 'white' if i % 2 == 0 else 'black'
-                fig.add_trace(go.Scatter(
-                    x=[start_x - px + i*px/3, start_x + px + i*px/3],
-                    y=[start_y - py + i*py/3, start_y + py + i*py/3],
-                    mode='lines',
-                    name='Start/Finish',
-                    line=dict(color=color, width=6),
-                    showlegend=False
+                xs, ys = stripes['white' if i % 2 == 0 else 'black']
+                xs += [start_x - px + i*px/3, start_x + px + i*px/3, None]
+                ys += [start_y - py + i*py/3, start_y + py + i*py/3, None]
+            for color, (xs, ys) in stripes.items():
+                traces.append(go.Scatter(
+                    x=xs, y=ys, mode='lines', name='Start/Finish',
+                    line=dict(color=color, width=6), hoverinfo='skip'
                 ))
     
-    # Add DRS zones
-    drs_segments = [seg for seg in track.segments if seg.get('drs', False)]
+    def marker_positions(segments):
+        index = (np.array(segments, dtype=float) / total_segments * len(x_coords)).astype(int)
+        return np.take(x_coords, index).tolist(), np.take(y_coords, index).tolist()
+    
+    # DRS zones (simplified markers), all in one trace
     if drs_segments:
-        # Simplified DRS zone markers
-        total_segments = len(track.segments)
-        for i, seg in enumerate(track.segments):
-            if seg.get('drs', False):
-                segment_ratio = i / total_segments
-                x_pos = x_coords[int(segment_ratio * len(x_coords))]
-                y_pos = y_coords[int(segment_ratio * len(y_coords))]
-                
-                fig.add_trace(go.Scatter(
-                    x=[x_pos],
-                    y=[y_pos],
-                    mode='markers+text',
-                    name='DRS Zone',
-                    marker=dict(
-                        symbol='square',
-                        size=20,
-                        color='blue',
-                        line=dict(color='white', width=2)
-                    ),
-                    text=['DRS'],
-                    textposition='middle center',
-                    textfont=dict(color='white', size=10),
-                    showlegend=False
-                ))
+        x_pos, y_pos = marker_positions(drs_segments)
+        traces.append(go.Scatter(
+            x=x_pos,
+            y=y_pos,
+            mode='markers+text',
+            name='DRS Zone',
+            marker=dict(
+                symbol='square',
+                size=20,
+                color='blue',
+                line=dict(color='white', width=2)
+            ),
+            text=['DRS'] * len(x_pos),
+            textposition='middle center',
+            textfont=dict(color='white', size=10),
+            hovertemplate='DRS Zone<extra></extra>'
+        ))
+    
+    # Corner markers for major turns, numbered in track order
+    if tight_corners:
+        x_pos, y_pos = marker_positions(tight_corners)
+        traces.append(go.Scatter(
+            x=x_pos,
+            y=y_pos,
+            mode='markers+text',
+            name='Turns',
+            marker=dict(
+                symbol='circle',
+                size=12,
+                color='yellow',
+                line=dict(color='red', width=2)
+            ),
+            text=[str(number) for number in range(1, len(x_pos) + 1)],
+            textposition='middle center',
+            textfont=dict(color='red', size=8, family='Arial Black'),
+            hovertemplate='Turn %{text}<extra></extra>'
+        ))
+    
+    fig = go.Figure(data=traces)
     
     # Track information with enhanced styling
     fig.add_annotation(
         x=0.02, y=0.98, xref='paper', yref='paper',
-        text=f"🏁 <b>{track.name}</b><br>🌍 {track.country}<br>📏 {track.length_km} km<br>🏎️ {len(track.segments)} segments",
+        text=f"🏁 <b>{name}</b><br>🌍 {country}<br>📏 {length_km} km<br>🏎️ {total_segments} segments",
         showarrow=False,
-        font=dict(size=14, color='white'),
+        font=dict(size=14, color=colors['text']),
         bgcolor='rgba(0,0,0,0.8)',
-        bordercolor='white',
+        bordercolor=colors['text'],
         borderwidth=2,
         align='left'
     )
     
-    # Add corner markers for major turns
-    corner_count = 0
-    for i, seg in enumerate(track.segments):
-        if seg['type'] == 'corner' and seg.get('radius', 100) < 100:  # Tight corners only
-            corner_count += 1
-            segment_ratio = i / len(track.segments)
-            x_pos = x_coords[int(segment_ratio * len(x_coords))]
-            y_pos = y_coords[int(segment_ratio * len(y_coords))]
-            
-            fig.add_trace(go.Scatter(
-                x=[x_pos],
-                y=[y_pos],
-                mode='markers+text',
-                name=f'Turn {corner_count}',
-                marker=dict(
-                    symbol='circle',
-                    size=12,
-                    color='yellow',
-                    line=dict(color='red', width=2)
-                ),
-                text=[str(corner_count)],
-                textposition='middle center',
-                textfont=dict(color='red', size=8, family='Arial Black'),
-                showlegend=False
-            ))
-    
     fig.update_layout(
         title=dict(
-            text=f"🏁 {track.name} Circuit",
-            font=dict(size=20, color='white')
+            text=f"🏁 {name} Circuit",
+            font=dict(size=20, color=colors['text'])
         ),
         xaxis_title="",
         yaxis_title="",
         width=900,
         height=700,
         showlegend=False,
-        plot_bgcolor='#0D5D2B',  # Racing green background
-        paper_bgcolor='#0D5D2B',
-        font=dict(color='white')
+        plot_bgcolor=colors['background'],
+        paper_bgcolor=colors['background'],
+        font=dict(color=colors['text'])
     )
     
     # Equal aspect ratio and hide axes for clean look
     fig.update_xaxes(showgrid=False, showticklabels=False, zeroline=False)
     fig.update_yaxes(showgrid=False, showticklabels=False, zeroline=False, scaleanchor="x", scaleratio=1)
     
-    return fig
+    return fig.to_json()
+
+def chart_points(x, y, window=None, max_points=CHART_MAX_POINTS):
+    """(x, y) within the x range ``window``, thinned by lttb() to at most ``max_points``.
+
+    ``x`` must be sorted; one point either side of the window is kept so the
+    line reaches the plot edges.
+    """
+    if window is not None:
+        lo = max(int(np.searchsorted(x, window[0], 'left')) - 1, 0)
+        hi = int(np.searchsorted(x, window[1], 'right')) + 1
+        x, y = x[lo:hi], y[lo:hi]
+    keep = lttb(x, y, max_points)
+    return x[keep], y[keep]
 
-def create_speed_profile(result, car):
-    """Create enhanced speed profile visualization"""
-    df = pd.DataFrame({
-        'Distance': result['distances'],
-        'Speed': result['speeds'],
-        'Time': result['times']
-    })
+def create_speed_profile(result, car, window=None, max_points=CHART_MAX_POINTS, channels=None):
+    """Create enhanced speed profile visualization.
+
+    ``window`` is the (start, end) distance in km to show, the whole lap by
+    default; each trace is downsampled to ``max_points`` within it and
+    drawn with WebGL once it has more than WEBGL_THRESHOLD points.
+    ``channels`` are the lap's DerivedChannels from lap_channels().
+    """
+    from plotly.subplots import make_subplots
+    
+    distances = np.asarray(result['distances'], dtype=float) / 1000  # km
+    speeds = np.asarray(result['speeds'], dtype=float)
+    times = np.asarray(result['times'], dtype=float)
+    time_window = None if window is None else tuple(np.interp(window, distances, times))
+    
+    if channels is None:
+        channels = derive_channels(car, speeds, times)  # Longitudinal only, without the track's radii
+    
+    def scatter(x, y, x_window, **kwargs):
+        x, y = chart_points(x, y, x_window, max_points)
+        trace = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+        return trace(x=x, y=y, mode='lines', **kwargs)
     
     fig = make_subplots(
         rows=3, cols=1,
@@ -1143,10 +453,8 @@ def create_speed_profile(result, car):
     
     # Speed vs Distance
     fig.add_trace(
-        go.Scatter(
-            x=[d/1000 for d in df['Distance']],
-            y=df['Speed'],
-            mode='lines',
+        scatter(
+            distances, speeds, window,
             name='Speed',
             line=dict(color=car.color, width=3),
             fill='tonexty'
@@ -1156,42 +464,32 @@ def create_speed_profile(result, car):
     
     # Speed vs Time
     fig.add_trace(
-        go.Scatter(
-            x=df['Time'],
-            y=df['Speed'],
-            mode='lines',
+        scatter(
+            times, speeds, time_window,
             name='Speed over Time',
             line=dict(color='orange', width=3)
         ),
         row=2, col=1
     )
     
-    # Calculate G-forces (simplified)
-    g_forces = []
-    for i in range(1, len(df['Speed'])):
-        speed_diff = df['Speed'].iloc[i] - df['Speed'].iloc[i-1]
-        time_diff = df['Time'].iloc[i] - df['Time'].iloc[i-1]
-        if time_diff > 0:
-            accel = (speed_diff / 3.6) / time_diff  # m/s²
-            g_force = accel / 9.81
-            g_forces.append(abs(g_force))
-        else:
-            g_forces.append(0)
-    
-    g_forces = [0] + g_forces  # Add initial value
-    
-    # G-Force plot
+    # G-Force plot: combined load with the cornering share on top
     fig.add_trace(
-        go.Scatter(
-            x=[d/1000 for d in df['Distance']],
-            y=g_forces,
-            mode='lines',
+        scatter(
+            distances, channels.combined_g, window,
             name='G-Force',
             line=dict(color='red', width=2),
             fill='tozeroy'
         ),
         row=3, col=1
     )
+    fig.add_trace(
+        scatter(
+            distances, channels.lateral_g, window,
+            name='Lateral G',
+            line=dict(color='cyan', width=1)
+        ),
+        row=3, col=1
+    )
     
     fig.update_layout(
         title=f'{car.name} - Detailed Performance Analysis',
@@ -1208,9 +506,47 @@ def create_speed_profile(result, car):
     fig.update_yaxes(title_text='Speed (km/h)', row=2, col=1, gridcolor='#444')
     fig.update_xaxes(title_text='Distance (km)', row=3, col=1, gridcolor='#444')
     fig.update_yaxes(title_text='G-Force', row=3, col=1, gridcolor='#444')
+    if window is not None:
+        fig.update_xaxes(range=list(window), row=1, col=1)
+        fig.update_xaxes(range=list(time_window), row=2, col=1)
+        fig.update_xaxes(range=list(window), row=3, col=1)
     
     return fig
 
+@st.fragment
+def speed_profile_section(result, car, channels):
+    """Speed profile with a distance window; moving it reruns only this fragment"""
+    lap_km = math.ceil(result['distances'][-1] / 100) / 10
+    window = st.slider("Chart window (km)", 0.0, lap_km, (0.0, lap_km), step=0.1)
+    full_lap = window == (0.0, lap_km)
+    st.plotly_chart(create_speed_profile(result, car, None if full_lap else window, channels=channels),
+                    use_container_width=True)
+
+def sector_summary(result, channels, sectors=3):
+    """Time share on throttle and brakes and peak loads of each sector (equal sample counts)"""
+    times = np.asarray(result['times'], dtype=float)
+    interval = np.diff(times, prepend=times[0])  # Flags and loads describe the interval ending at a sample
+    bounds = [len(times) * k // sectors for k in range(sectors)]
+    sector_time = np.maximum(np.add.reduceat(interval, bounds), 1e-9)
+    
+    def time_share(flags):
+        return (100 * np.add.reduceat(interval * flags, bounds) / sector_time).round(1)
+    
+    return {
+        'Sector': np.arange(1, sectors + 1),
+        'Full Throttle (%)': time_share(channels.throttle),
+        'Braking (%)': time_share(channels.brake),
+        'Traction Limited (%)': time_share(channels.traction_limited),
+        'Peak Lateral (g)': np.maximum.reduceat(channels.lateral_g, bounds).round(2),
+        'Peak Braking (g)': np.maximum(-np.minimum.reduceat(channels.longitudinal_g, bounds), 0).round(2),
+    }
+
+def telemetry_bytes(telemetry, fmt):
+    """A TelemetryTable serialized in memory for a download button"""
+    buffer = io.BytesIO()
+    write_telemetry(buffer, telemetry, fmt)
+    return buffer.getvalue()
+
 def format_lap_time(seconds):
     """Format lap time as MM:SS.SSS"""
     if seconds is None or seconds <= 0:
@@ -1220,13 +556,31 @@ def format_lap_time(seconds):
     secs = seconds % 60
     return f"{minutes:02d}:{secs:06.3f}"
 
+@st.cache_resource
+def load_databases():
+    """Car and track databases, built once per process and shared read-only.
+
+    The smoothed outline of every built-in track is computed here too, so
+    the first render of any circuit does not pay for the spline fit.
+    """
+    cars = create_car_database()
+    tracks = create_tracks()
+    for track in tracks.values():
+        smooth_track_coordinates(track.coordinates)
+    return types.MappingProxyType(cars), types.MappingProxyType(tracks)
+
 def main():
+    # Page configuration; must be the first Streamlit call of the run
+    st.set_page_config(
+        page_title="Racing Lap Simulator",
+        page_icon="🏎️",
+        layout="wide"
+    )
     st.title("🏎️ Ultimate Racing Lap Simulator")
     st.markdown("### 🏁 Professional racing simulation with realistic physics, custom tracks & cars")
     
-    # Create databases
-    cars = create_car_database()
-    tracks = create_tracks()
+    # Shared read-only databases; setups derive new Car values
+    cars, tracks = load_databases()
     
     # Sidebar with tabs
     with st.sidebar:
@@ -1256,7 +610,7 @@ def main():
             st.header("🚗 Vehicle Selection")
             
             # Car selection (including custom)
-            available_cars = cars.copy()
+            available_cars = dict(cars)
             if 'custom_car' in st.session_state:
                 available_cars["Custom Car"] = st.session_state.custom_car
             
@@ -1272,7 +626,8 @@ def main():
                 list(filtered_cars.keys()),
                 help="Select your racing machine"
             )
-            car = filtered_cars[car_name]
+            base_car = filtered_cars[car_name]
+            car = base_car
             
             # Display car specs
             with st.expander("🔧 Vehicle Specifications"):
@@ -1287,27 +642,33 @@ def main():
                     st.metric("Rolling Res.", f"{car.rolling_resistance:.3f}")
             
             st.header("⚙️ Setup Options")
+            fuel_load = 0
+            tire_compound = None
             
             # Fuel load for relevant categories
-            if car.category in ["Formula 1", "GT3", "LMP1/Hypercar"]:
-                fuel_load = st.slider("Fuel Load (kg)", 0, 110, 40)
-                car.mass += fuel_load
+            if base_car.category in FUEL_CATEGORIES:
+                fuel_load = st.slider("Fuel Load (kg)", 0, MAX_FUEL_LOAD, 40)
             
             # Tire compound
-            if car.category == "Formula 1":
-                tire_compound = st.selectbox("Tire Compound", ["Soft", "Medium", "Hard"])
-                multipliers = {"Soft": 1.05, "Medium": 1.0, "Hard": 0.95}
-                car.tire_grip *= multipliers[tire_compound]
+            if base_car.category == "Formula 1":
+                tire_compound = st.selectbox("Tire Compound", list(TIRE_COMPOUND_GRIP))
             
             # Weather conditions
-            weather = st.selectbox("Weather", ["Dry", "Light Rain", "Heavy Rain"])
-            if weather == "Light Rain":
-                car.tire_grip *= 0.85
-            elif weather == "Heavy Rain":
-                car.tire_grip *= 0.7
+            weather = st.selectbox("Weather", list(WEATHER_GRIP))
+            setup = CarSetup(fuel_load=fuel_load, tire_compound=tire_compound, weather=weather)
+            car = base_car.with_setup(setup)
             
             st.header("🎮 Simulation")
+            sampling = st.selectbox("Telemetry Sampling", list(TELEMETRY_SAMPLING))
             run_simulation = st.button("🏁 Start Lap Simulation", type="primary")
+            
+            result_cache = get_result_cache()
+            cache_stats = result_cache.stats()
+            st.caption(
+                f"Result cache: {cache_stats['hits'] + cache_stats['disk_hits']} hits, "
+                f"{cache_stats['misses']} misses, {cache_stats['entries']} entries "
+                f"({cache_stats['bytes'] / 1e6:.1f} MB)"
+            )
         
         with tab2:
             create_custom_track_builder()
@@ -1328,7 +689,10 @@ def main():
         if run_simulation:
             with st.spinner(f"🏁 Simulating {car.name} around {track.name}..."):
                 # Run the simulation
-                result = simulate_lap(track, car)
+                result = result_cache.simulate_lap(track, base_car, setup, sampler=TELEMETRY_SAMPLING[sampling])
+                lap_store = get_lap_store()
+                lap_store.record(track, base_car, result, setup)
+                channels = lap_channels(track, car, result)
                 
                 # Results display
                 st.subheader("📊 Lap Results")
@@ -1389,6 +753,18 @@ def main():
                     s1.metric("Sector 1", f"{sector_1:.3f}s")
                     s2.metric("Sector 2", f"{sector_2:.3f}s") 
                     s3.metric("Sector 3", f"{sector_3:.3f}s")
+                    st.dataframe(sector_summary(result, channels), hide_index=True, use_container_width=True)
+                
+                # Best stored lap of every car here in the same weather
+                best_laps = lap_store.best_laps(track.name, weather)
+                if best_laps:
+                    st.subheader("🗂️ Lap History")
+                    st.dataframe(
+                        [{'Car': lap['car'], 'Lap Time': format_lap_time(lap['lap_time']),
+                          'Tire Compound': lap['tire_compound'], 'Fuel Load (kg)': lap['fuel_load']}
+                         for lap in best_laps[:10]],
+                        use_container_width=True
+                    )
                 
         else:
             st.info("👆 Select your vehicle and track, then click 'Start Lap Simulation' to begin!")
@@ -1416,7 +792,7 @@ def main():
                 fill='toself',
                 name=car.name,
                 line_color=car.color,
-                fillcolor=f"rgba{tuple(list(px.colors.hex_to_rgb(car.color)) + [0.3])}"
+                fillcolor=f"rgba{tuple(list(hex_to_rgb(car.color)) + [0.3])}"
             ))
             
             preview_fig.update_layout(
@@ -1441,50 +817,48 @@ def main():
     # Speed profile (when simulation is run)
     if run_simulation and 'result' in locals():
         st.subheader("📈 Detailed Performance Analysis")
-        speed_fig = create_speed_profile(result, car)
-        st.plotly_chart(speed_fig, use_container_width=True)
+        speed_profile_section(result, car, channels)
         
-        # Telemetry data export
+        # Telemetry data export: columnar table, files built only when downloaded
         st.subheader("📊 Telemetry Data")
-        telemetry_df = pd.DataFrame({
-            'Distance (m)': result['distances'],
-            'Speed (km/h)': result['speeds'],
-            'Time (s)': result['times'],
-            'Segment': result['segments']
-        })
+        telemetry = TelemetryTable.from_result(result, channels)
+        file_stem = f"{car.name}_{track.name}_telemetry"
         
         col1, col2 = st.columns([3, 1])
         with col1:
-            st.dataframe(telemetry_df.head(20), use_container_width=True)
+            st.dataframe(telemetry.to_pandas().head(20), use_container_width=True)
         with col2:
             st.download_button(
                 "📥 Download Full Data",
-                telemetry_df.to_csv(index=False),
-                f"{car.name}_{track.name}_telemetry.csv",
+                lambda: "".join(iter_csv(telemetry)),
+                f"{file_stem}.csv",
                 "text/csv"
             )
+            if importlib.util.find_spec("pyarrow"):
+                st.download_button(
+                    "📥 Download Parquet",
+                    lambda: telemetry_bytes(telemetry, "parquet"),
+                    f"{file_stem}.parquet",
+                    "application/vnd.apache.parquet"
+                )
     
     # Multi-car comparison
     st.subheader("🏁 Multi-Car Comparison")
     if st.button("Compare All Cars on This Track"):
-        comparison_results = []
-        progress_bar = st.progress(0)
+        import pandas as pd
+        import plotly.express as px
         
-        total_cars = len(cars)
-        for i, (car_name, car) in enumerate(cars.items()):
-            if car.category in ["Formula 1", "GT3"]:  # Focus on racing cars
-                result = simulate_lap(track, car)
-                comparison_results.append({
-                    'Car': car_name,
-                    'Category': car.category,
-                    'Lap Time': result['lap_time'],
-                    'Top Speed': result['top_speed'],
-                    'Avg Speed': result['avg_speed']
-                })
-            progress_bar.progress((i + 1) / total_cars)
+        racing_cars = {name: car for name, car in cars.items() if car.category in ["Formula 1", "GT3"]}  # Focus on racing cars
+        comparison_key = hashlib.sha256("".join(
+            simulation_key(racing_car, track, solver="batch") for racing_car in racing_cars.values()
+        ).encode('utf-8')).hexdigest()
+        comparison_df = pd.DataFrame(result_cache.get_or_compute(
+            comparison_key,
+            lambda: simulate_batch({track.name: track}, racing_cars).to_dict('list')
+        ))
+        get_lap_store().record_rows(comparison_df.to_dict('records'), {track.name: track}, racing_cars)
         
-        if comparison_results:
-            comparison_df = pd.DataFrame(comparison_results)
+        if not comparison_df.empty:
             comparison_df = comparison_df.sort_values('Lap Time')
             
             # Format lap times
@@ -1532,6 +906,152 @@ def main():
             )
             st.plotly_chart(fig, use_container_width=True)
     
+    # Race stint: fuel burn and tire wear carried from lap to lap
+    st.subheader("🏎️ Race Stint")
+    stint_laps = st.number_input("Race Laps", min_value=1, max_value=100, value=50)
+    if st.button("Simulate Stint"):
+        from plotly.subplots import make_subplots
+        
+        stint = simulate_stint(track, base_car, int(stint_laps), setup, exact=True)
+        stint_df = stint.to_pandas()
+        
+        s1, s2, s3 = st.columns(3)
+        s1.metric("Race Time", format_lap_time(stint.total_time))
+        s2.metric("Fastest Lap", format_lap_time(stint_df['Lap Time'].min()))
+        s3.metric("Fuel Left", f"{stint.fuel_remaining:.1f} kg")
+        if stint.fuel_remaining < 0:
+            needed = math.ceil(setup.fuel_load - stint.fuel_remaining)
+            if base_car.category in FUEL_CATEGORIES and needed <= MAX_FUEL_LOAD:
+                st.warning(f"Ran out of fuel: start with at least {needed} kg")
+            else:
+                st.warning(f"Ran out of fuel: {int(stint_laps)} laps need {needed} kg, "
+                           f"more than this car can start with; shorten the stint")
+        
+        stint_fig = make_subplots(specs=[[{"secondary_y": True}]])
+        stint_fig.add_trace(go.Scatter(x=stint_df['Lap'], y=stint_df['Lap Time'], mode='lines+markers',
+                                       name='Lap Time (s)', line=dict(color=base_car.color, width=2)))
+        stint_fig.add_trace(go.Scatter(x=stint_df['Lap'], y=stint_df['Fuel (kg)'], mode='lines',
+                                       name='Fuel (kg)', line=dict(color='orange', width=2, dash='dot')),
+                            secondary_y=True)
+        stint_fig.update_layout(
+            title=f"{base_car.name} - {int(stint_laps)} laps of {track.name}",
+            height=400,
+            plot_bgcolor='#1e1e1e',
+            paper_bgcolor='#1e1e1e',
+            font=dict(color='white')
+        )
+        stint_fig.update_xaxes(title_text='Lap', gridcolor='#444')
+        stint_fig.update_yaxes(title_text='Lap Time (s)', gridcolor='#444', secondary_y=False)
+        stint_fig.update_yaxes(title_text='Fuel (kg)', showgrid=False, secondary_y=True)
+        st.plotly_chart(stint_fig, use_container_width=True)
+        st.dataframe(stint_df.round(3), hide_index=True, use_container_width=True)
+
+    if st.button("Optimize Pit Strategy"):
+        # Searches in-process: a table-driven search takes well under a second,
+        # less than starting a process pool under Streamlit
+        try:
+            search = optimize_strategy(track, base_car, int(stint_laps), setup.weather, max_workers=1)
+        except ValueError as error:
+            st.error(f"No strategy for this race: {error}")
+        else:
+            best = search.best
+            p1, p2, p3 = st.columns(3)
+            p1.metric("Best Strategy", best.describe())
+            p2.metric("Race Time", format_lap_time(best.race_time))
+            p3.metric("Search Nodes", f"{search.nodes:,}", help=f"{search.search_space:,} possible strategies")
+            st.dataframe({
+                'Strategy': [strategy.describe() for strategy in search.strategies],
+                'Stops': [strategy.stops for strategy in search.strategies],
+                'Race Time': [format_lap_time(strategy.race_time) for strategy in search.strategies],
+                'Gap (s)': [round(strategy.race_time - best.race_time, 3) for strategy in search.strategies],
+            }, hide_index=True, use_container_width=True)
+
+    st.subheader("🔧 Setup Optimizer")
+    if st.button("Optimize Downforce Level"):
+        tuned = optimize_setup(track, base_car, setup=setup)
+        o1, o2, o3 = st.columns(3)
+        o1.metric("Downforce Coef", f"{tuned.parameters['downforce_coef']:.2f}",
+                  f"{tuned.parameters['downforce_coef'] - base_car.downforce_coef:+.2f}")
+        o2.metric("Drag Coef", f"{tuned.parameters['drag_coef']:.3f}",
+                  f"{tuned.parameters['drag_coef'] - base_car.drag_coef:+.3f}", delta_color="inverse")
+        o3.metric("Lap Time", format_lap_time(tuned.lap_time), f"{tuned.lap_time - tuned.start_lap_time:+.3f}s",
+                  delta_color="inverse")
+
+        trace_df = tuned.to_pandas()
+        trace_fig = go.Figure()
+        trace_fig.add_trace(go.Scatter(x=trace_df['Generation'], y=trace_df['Best Lap Time'], mode='lines+markers',
+                                       name='Best', line=dict(color=base_car.color, width=2)))
+        trace_fig.add_trace(go.Scatter(x=trace_df['Generation'], y=trace_df['Mean Lap Time'], mode='lines',
+                                       name='Generation Mean', line=dict(color='gray', width=1, dash='dot')))
+        trace_fig.update_layout(
+            title=f"Convergence - {tuned.evaluations} laps solved, {tuned.cache_hits} from cache",
+            xaxis_title='Generation',
+            yaxis_title='Lap Time (s)',
+            height=350,
+            plot_bgcolor='#1e1e1e',
+            paper_bgcolor='#1e1e1e',
+            font=dict(color='white')
+        )
+        st.plotly_chart(trace_fig, use_container_width=True)
+
+    st.subheader("📐 Lap-Time Sensitivity")
+    if st.button("Compute Sensitivities"):
+        sensitivity = lap_time_sensitivity(track, base_car, setup)
+        d1, d2, d3, d4 = st.columns(4)
+        d1.metric("+10 kg", f"{10 * sensitivity['mass']:+.3f}s")
+        d2.metric("+10 kW", f"{10 * sensitivity['power']:+.3f}s")
+        d3.metric("+0.1 Downforce", f"{0.1 * sensitivity['downforce_coef']:+.3f}s")
+        d4.metric("+0.01 Drag", f"{0.01 * sensitivity['drag_coef']:+.3f}s")
+
+        # Every circuit, seconds per 1% of each parameter so the columns compare
+        matrix = sensitivity_matrix({**tracks, track.name: track}, [base_car], setup, per_percent=True)
+        st.dataframe(
+            matrix.drop(columns='Car').set_index('Track').round(3),
+            use_container_width=True
+        )
+
+    st.subheader("🎲 Monte Carlo Lap Times")
+    mc1, mc2, mc3, mc4 = st.columns(4)
+    grip_spread = mc1.slider("Grip Uncertainty (±%)", 0.0, 10.0, 3.0, 0.5, help="Standard deviation of the weather grip")
+    power_spread = mc2.slider("Power Uncertainty (±%)", 0.0, 10.0, 2.0, 0.5, help="Standard deviation of engine power")
+    fuel_spread = mc3.slider("Fuel Uncertainty (kg)", 0.0, 20.0, 5.0, 1.0, help="Fuel load drawn up to this much either side")
+    mc_laps = mc4.number_input("Max Laps", min_value=1000, max_value=100_000, value=10_000, step=1000)
+    if st.button("Run Monte Carlo"):
+        weather_grip = WEATHER_GRIP[setup.weather]
+        distributions = {
+            'weather_grip': Normal(weather_grip, weather_grip * grip_spread / 100),
+            'power': Normal(base_car.power, base_car.power * power_spread / 100),
+        }
+        if fuel_spread:
+            distributions['fuel_load'] = Uniform(max(setup.fuel_load - fuel_spread, 0.0), setup.fuel_load + fuel_spread)
+        # Stops early once the mean lap time is known to within ±50 ms
+        stats = monte_carlo(track, base_car, distributions, int(mc_laps), setup, ci_half_width=0.05)
+        p5, p50, p95 = stats.percentile([5, 50, 95])
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("P5", format_lap_time(p5))
+        m2.metric("Median", format_lap_time(p50))
+        m3.metric("P95", format_lap_time(p95))
+        m4.metric("Laps Run", f"{stats.count:,}", f"±{stats.ci_half_width() * 1000:.1f} ms mean", delta_color="off")
+
+        edges, counts = stats.histogram()
+        # Regroup the fine bins into about 60 bars
+        group = max(1, len(counts) // 60)
+        bars = np.add.reduceat(counts, np.arange(0, len(counts), group))
+        hist_fig = go.Figure(go.Bar(x=edges[:-1:group] + group * stats.bin_width / 2, y=bars,
+                                    width=group * stats.bin_width, marker_color=base_car.color, name='Laps'))
+        for label, value in (("P5", p5), ("P50", p50), ("P95", p95)):
+            hist_fig.add_vline(x=value, line=dict(color='white', dash='dot'), annotation_text=label)
+        hist_fig.update_layout(
+            title=f"Lap Time Distribution - {base_car.name} at {track.name}",
+            xaxis_title='Lap Time (s)',
+            yaxis_title='Laps',
+            height=400,
+            plot_bgcolor='#1e1e1e',
+            paper_bgcolor='#1e1e1e',
+            font=dict(color='white')
+        )
+        st.plotly_chart(hist_fig, use_container_width=True)
+
     # Technical information
     with st.expander("🔬 Technical Details & Physics Model"):
         col1_t, col2_t = st.columns(2)
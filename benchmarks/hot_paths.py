@@ -0,0 +1,227 @@
+"""Time the physics and rendering hot paths without a Streamlit server.
+
+Covers simulate_lap (every solver), calculate_corner_speed,
+calculate_braking_distance, create_enhanced_track_layout (first build and
+cached) and create_speed_profile on every built-in track and car, plus
+seeded synthetic tracks of 10, 1k and 100k segments.  Each entry reports throughput, p50/p99
+latency per unit of work (lap, call or figure) and the tracemalloc peak of
+one call.  Run from the repository root:
+
+    python benchmarks/hot_paths.py [--output report.json] [--compare baseline.json]
+
+The report goes to the system temporary directory unless --output names a
+path, so runs leave the source tree clean.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from app import _track_layout_figure, create_enhanced_track_layout, create_speed_profile
+from racing_sim import (
+    Track,
+    calculate_braking_distance,
+    calculate_corner_speed,
+    create_car_database,
+    create_tracks,
+    simulate_lap,
+)
+
+SYNTHETIC_SIZES = (10, 1_000, 100_000)
+RENDER_LIMIT = 1_000  # segments; plots of larger tracks are recorded as skipped
+BUDGET = 2.0  # seconds of repeats per case after the first call
+DEFAULT_OUTPUT = os.path.join(tempfile.gettempdir(), 'hot_paths.json')
+
+
+def synthetic_track(n_segments, seed=0):
+    """Seeded layout alternating straights and corners, DRS on every fifth straight"""
+    rng = random.Random(seed)
+    segments = []
+    for i in range(n_segments):
+        if i % 2 == 0:
+            segments.append({'type': 'straight', 'length': rng.uniform(50, 400),
+                             'name': f'Straight {i // 2 + 1}', 'drs': i % 10 == 0})
+        else:
+            segments.append({'type': 'corner', 'length': rng.uniform(30, 150), 'radius': rng.uniform(20, 300),
+                             'angle': rng.choice((-1, 1)) * rng.uniform(20, 120), 'name': f'Turn {i // 2 + 1}'})
+    return Track(f"Synthetic {n_segments}", segments, "Synthetic", sum(seg['length'] for seg in segments) / 1000)
+
+
+def representative_cars(cars):
+    """First car of every category, to keep synthetic runs short"""
+    picked = {}
+    for car in cars.values():
+        picked.setdefault(car.category, car)
+    return {car.name: car for car in picked.values()}
+
+
+def time_cases(func, cases, budget):
+    """Per-call latencies of func(*args), repeating each case within its share of the budget.
+
+    The first call warms per-track and per-car caches and is discarded, unless
+    it alone took longer than the whole budget, in which case it is the only sample.
+    """
+    latencies = []
+    for args in cases:
+        start = time.perf_counter()
+        func(*args)
+        first = time.perf_counter() - start
+        if first >= budget:
+            latencies.append(first)
+            continue
+        deadline = time.perf_counter() + budget / len(cases)
+        while True:
+            start = time.perf_counter()
+            func(*args)
+            latencies.append(time.perf_counter() - start)
+            if start + latencies[-1] >= deadline:
+                break
+    return latencies
+
+
+def peak_memory(func, args):
+    """tracemalloc peak of one warm call; traced separately so it does not skew the timings"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(name, group, func, cases, budget, work_per_call=1, unit='calls'):
+    latencies = [latency / work_per_call for latency in time_cases(func, cases, budget)]
+    total = sum(latencies)
+    entry = {
+        'name': name,
+        'group': group,
+        'cases': len(cases),
+        'calls': len(latencies) * work_per_call,
+        'throughput': len(latencies) / total,
+        'unit': f'{unit}/s',
+        'p50_ms': statistics.median(latencies) * 1e3,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1e3,
+        'peak_mib': peak_memory(func, cases[0]) / 2**20,
+    }
+    print(f"{name:<40}{group:<18}{entry['throughput']:>14.1f} {entry['unit']:<10}"
+          f"{entry['p50_ms']:>10.3f}{entry['p99_ms']:>10.3f}{entry['peak_mib']:>10.2f}")
+    return entry
+
+
+def skipped(name, group, reason):
+    print(f"{name:<40}{group:<18}  skipped: {reason}")
+    return {'name': name, 'group': group, 'skipped': reason}
+
+
+def braking_cases(track, cars):
+    """Braking from each car's corner-free top speed down to every corner on the track"""
+    radii = [seg['radius'] for seg in track.segments if seg['type'] == 'corner']
+    return [(car, 300.0, max(calculate_corner_speed(car, radius), 15.0)) for car in cars.values() for radius in radii]
+
+
+def uncached_track_layout(track):
+    """Build the track figure as on the first view of a layout"""
+    _track_layout_figure.cache_clear()
+    return create_enhanced_track_layout(track)
+
+
+def run_group(group, tracks, cars, budget, render_limit):
+    results = []
+    pairs = [(track, car) for track in tracks.values() for car in cars.values()]
+    for solver in ('timestep', 'adaptive', 'envelope'):
+        results.append(benchmark(f'simulate_lap[{solver}]', group, simulate_lap,
+                                 [(track, car, solver) for track, car in pairs], budget, unit='laps'))
+
+    corner_calls = [(car, seg['radius']) for track, car in pairs for seg in track.segments if seg['type'] == 'corner']
+    results.append(benchmark('calculate_corner_speed', group, lambda *cases: [calculate_corner_speed(*c) for c in cases],
+                             [tuple(corner_calls)], budget, work_per_call=len(corner_calls)))
+    brake_calls = [case for track in tracks.values() for case in braking_cases(track, cars)]
+    results.append(benchmark('calculate_braking_distance', group, lambda *cases: [calculate_braking_distance(*c) for c in cases],
+                             [tuple(brake_calls)], budget, work_per_call=len(brake_calls)))
+
+    largest = max(len(track.segments) for track in tracks.values())
+    if largest > render_limit:
+        reason = f'{largest} segments > render limit {render_limit}'
+        results.append(skipped('create_enhanced_track_layout', group, reason))
+        results.append(skipped('create_enhanced_track_layout (cached)', group, reason))
+        results.append(skipped('create_speed_profile', group, reason))
+    else:
+        layouts = [(track,) for track in tracks.values()]
+        results.append(benchmark('create_enhanced_track_layout', group, uncached_track_layout,
+                                 layouts, budget, unit='figures'))
+        results.append(benchmark('create_enhanced_track_layout (cached)', group, create_enhanced_track_layout,
+                                 layouts, budget, unit='figures'))
+        profiles = [(simulate_lap(track, car), car) for track, car in pairs]
+        results.append(benchmark('create_speed_profile', group, create_speed_profile,
+                                 profiles, budget, unit='figures'))
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline_path):
+    """Print the throughput ratio against an earlier report"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(entry['name'], entry['group']): entry for entry in baseline['results'] if 'throughput' in entry}
+    print(f"\nThroughput vs {baseline_path} ({baseline.get('revision')} -> {report['revision']})")
+    for entry in report['results']:
+        old = before.get((entry['name'], entry['group']))
+        if old and 'throughput' in entry:
+            print(f"{entry['name']:<40}{entry['group']:<18}{entry['throughput'] / old['throughput']:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'JSON report path (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--compare', help='earlier JSON report to compare throughput against')
+    parser.add_argument('--budget', type=float, default=BUDGET, help='seconds of repeats per benchmark')
+    parser.add_argument('--synthetic', default=','.join(map(str, SYNTHETIC_SIZES)),
+                        help='comma-separated synthetic track sizes, empty for none')
+    parser.add_argument('--render-limit', type=int, default=RENDER_LIMIT,
+                        help='largest track (segments) to time the plots on')
+    args = parser.parse_args()
+
+    cars = create_car_database()
+    print(f"{'benchmark':<40}{'group':<18}{'throughput':>14} {'':<10}{'p50 ms':>10}{'p99 ms':>10}{'peak MiB':>10}")
+    results = run_group('builtin', create_tracks(), cars, args.budget, args.render_limit)
+    synthetic_cars = representative_cars(cars)
+    for size in [int(value) for value in args.synthetic.split(',') if value]:
+        track = synthetic_track(size)
+        results += run_group(f'synthetic-{size}', {track.name: track}, synthetic_cars, args.budget, args.render_limit)
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'budget_s': args.budget,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
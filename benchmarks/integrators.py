@@ -0,0 +1,86 @@
+"""Accuracy against cost of the fixed-step Euler and adaptive-step lap integrators.
+
+Both integrate the same lap model; the reference is the adaptive solver at
+a tolerance far below the others.  For every Euler step and adaptive
+tolerance the table reports the worst and mean lap time error, the worst
+lap distance error (Euler overshoots braking points), the steps recorded
+per lap and the wall time per lap over every built-in track and car.  Run
+from the repository root:
+
+    python benchmarks/integrators.py [--output integrators.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from racing_sim import create_car_database, create_tracks
+from racing_sim.physics import TIMESTEP_DT, ADAPTIVE_RTOL, _adaptive_steps, _drain, _timestep_steps
+
+EULER_STEPS = (0.2, 0.1, TIMESTEP_DT, 0.02, 0.01, 0.005, 0.002)  # s
+ADAPTIVE_TOLERANCES = (1e-2, 1e-3, 1e-4, 1e-5, ADAPTIVE_RTOL, 1e-7, 1e-8, 1e-9)
+REFERENCE_RTOL = 1e-11
+
+
+def run(steps):
+    """(lap_time, total_distance, steps recorded, seconds) of one lap's step generator"""
+    count = [0]
+
+    def consume(step):
+        count[0] += 1
+
+    start = time.perf_counter()
+    lap_time, total_distance, _ = _drain(steps, consume)
+    return lap_time, total_distance, count[0], time.perf_counter() - start
+
+
+def measure(name, setting, make_steps, pairs, reference):
+    errors, distance_errors, points, seconds = [], [], [], []
+    for (track, car), (ref_time, ref_distance) in zip(pairs, reference):
+        lap_time, total_distance, count, elapsed = run(make_steps(track, car))
+        errors.append(abs(lap_time - ref_time))
+        distance_errors.append(abs(total_distance - ref_distance))
+        points.append(count)
+        seconds.append(elapsed)
+    entry = {
+        'integrator': name,
+        'setting': setting,
+        'max_error_ms': max(errors) * 1e3,
+        'mean_error_ms': statistics.mean(errors) * 1e3,
+        'max_distance_error_m': max(distance_errors),
+        'steps_per_lap': statistics.mean(points),
+        'ms_per_lap': statistics.mean(seconds) * 1e3,
+    }
+    print(f"{name:<10}{setting:>10g}{entry['max_error_ms']:>14.4f}{entry['mean_error_ms']:>14.4f}"
+          f"{entry['max_distance_error_m']:>12.3f}{entry['steps_per_lap']:>12.0f}{entry['ms_per_lap']:>10.3f}")
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='JSON report path')
+    args = parser.parse_args()
+
+    cars, tracks = create_car_database(), create_tracks()
+    pairs = [(track, car) for track in tracks.values() for car in cars.values()]
+    reference = [run(_adaptive_steps(track, car, REFERENCE_RTOL))[:2] for track, car in pairs]
+
+    print(f"{len(pairs)} laps against the adaptive solver at rtol {REFERENCE_RTOL:g}")
+    print(f"{'':<10}{'dt / rtol':>10}{'max err ms':>14}{'mean err ms':>14}{'dist err m':>12}{'steps/lap':>12}{'ms/lap':>10}")
+    results = [measure('euler', dt, lambda track, car: _timestep_steps(track, car, dt), pairs, reference)
+               for dt in EULER_STEPS]
+    results += [measure('adaptive', rtol, lambda track, car: _adaptive_steps(track, car, rtol), pairs, reference)
+                for rtol in ADAPTIVE_TOLERANCES]
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'reference_rtol': REFERENCE_RTOL, 'laps': len(pairs), 'results': results}, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
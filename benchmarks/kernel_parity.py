@@ -0,0 +1,93 @@
+"""Check the compiled time-stepped kernel against the reference Python solver.
+
+Runs every built-in track and car under two setups, plus a seeded synthetic
+track, through both physics._timestep_steps and racing_sim.kernel, and
+compares every step and the lap totals, and checks that the kernel's
+output arrays are sized from an upper bound on the steps.  Without numba (or with
+RACING_SIM_JIT=0) the kernel runs uncompiled, which still checks its logic.
+Exits non-zero on any difference above TOLERANCE or a lap with more steps
+than its bound.  Run from the repository
+root:
+
+    python benchmarks/kernel_parity.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from hot_paths import synthetic_track
+from racing_sim import CarSetup, create_car_database, create_tracks
+from racing_sim.kernel import _step_capacity, _timestep_kernel, compiled_timestep_kernel, timestep_lap_arrays
+from racing_sim.physics import _drain, _timestep_kernel_arguments, _timestep_steps
+
+TOLERANCE = 1e-9
+SETUPS = (CarSetup(), CarSetup(fuel_load=50, tire_compound="Soft", weather="Heavy Rain"))
+REPEATS = 3
+
+
+def reference_lap(track, car):
+    steps = []
+    totals = _drain(_timestep_steps(track, car), steps.append)
+    return np.array(steps, dtype=float), totals
+
+
+def kernel_lap(kernel, track, car):
+    *columns, totals = timestep_lap_arrays(kernel, _timestep_kernel_arguments(track, car))
+    return np.column_stack(columns), totals
+
+
+def lap_seconds(func, laps):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for track, car in laps:
+            func(track, car)
+    return (time.perf_counter() - start) / (REPEATS * len(laps))
+
+
+def main():
+    compiled = compiled_timestep_kernel()
+    kernel = compiled or _timestep_kernel
+    print(f"kernel: {'numba-compiled' if compiled else 'uncompiled Python (numba unavailable or disabled)'}")
+
+    cars, tracks = create_car_database(), create_tracks()
+    tracks['Synthetic 1000'] = synthetic_track(1_000)
+    laps = [(track, car.with_setup(setup)) for track in tracks.values()
+            for car in cars.values() for setup in SETUPS]
+
+    start = time.perf_counter()
+    kernel_lap(kernel, *laps[0])
+    print(f"first kernel call {time.perf_counter() - start:.3f} s (compilation or cache load)")
+
+    worst_step = worst_total = 0.0
+    slack = []
+    for track, car in laps:
+        reference, reference_totals = reference_lap(track, car)
+        result, totals = kernel_lap(kernel, track, car)
+        if reference.shape != result.shape:
+            print(f"{track.name} / {car.name}: {len(result)} kernel steps, {len(reference)} reference steps")
+            sys.exit(1)
+        arguments = _timestep_kernel_arguments(track, car)
+        capacity = _step_capacity(*arguments[:2], arguments[4], *arguments[9:])
+        if capacity < len(result):
+            print(f"{track.name} / {car.name}: {len(result)} steps, bound {capacity}")
+            sys.exit(1)
+        slack.append(capacity / len(result))
+        worst_step = max(worst_step, float(np.abs(reference - result).max()))
+        worst_total = max(worst_total, max(abs(a - b) for a, b in zip(reference_totals, totals)))
+    print(f"{len(laps)} laps: worst step difference {worst_step:.3g}, worst total difference {worst_total:.3g}")
+    print(f"output arrays {min(slack):.1f}x to {max(slack):.1f}x the steps taken")
+
+    reference_cost = lap_seconds(lambda track, car: reference_lap(track, car), laps)
+    kernel_cost = lap_seconds(lambda track, car: kernel_lap(kernel, track, car), laps)
+    print(f"reference {reference_cost * 1e3:.3f} ms/lap, kernel {kernel_cost * 1e3:.3f} ms/lap, "
+          f"{reference_cost / kernel_cost:.1f}x")
+    if max(worst_step, worst_total) > TOLERANCE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Check pit strategies of races that need more fuel than the default lap model covers.
+
+Every race in RACES starts with more than LAP_MODEL_FUEL's top load.  Each
+is fuelled with race_fuel(), searched with optimize_strategy() and the best
+strategy replayed with simulate_strategy().  Exits non-zero when a race
+does not need the extra fuel, no strategy is found, or the search's race
+time is off the replay by more than RACE_TIME_TOLERANCE.  Run from the
+repository root:
+
+    python benchmarks/long_races.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from racing_sim import create_car_database, create_tracks
+from racing_sim.stint import LAP_MODEL_FUEL
+from racing_sim.strategy import optimize_strategy, race_fuel, simulate_strategy
+
+CAR = "Red Bull RB19"
+RACES = (("Spa-Francorchamps", 70), ("Monza", 100), ("Spa-Francorchamps", 100))
+MAX_STOPS = 2
+RACE_TIME_TOLERANCE = 0.005  # relative
+
+
+def main():
+    car = create_car_database()[CAR]
+    tracks = create_tracks()
+
+    failed = False
+    print(f"{'Race':<26}{'fuel kg':>9}{'search s':>12}{'replay s':>12}{'Δ':>9}{'ms':>8}  strategy")
+    for track_name, laps in RACES:
+        track = tracks[track_name]
+        start = time.perf_counter()
+        fuel = race_fuel(track, car, laps)
+        search = optimize_strategy(track, car, laps, fuel_load=fuel, max_stops=MAX_STOPS, max_workers=1)
+        cost = time.perf_counter() - start
+        if search.best is None:
+            print(f"{track_name} x {laps}: no strategy found")
+            failed = True
+            continue
+        replay = simulate_strategy(track, car, search.best, laps, fuel_load=fuel)
+        error = abs(search.best.race_time - replay.total_time) / replay.total_time
+        print(f"{f'{track_name} x {laps}':<26}{fuel:>9.1f}{search.best.race_time:>12.1f}{replay.total_time:>12.1f}"
+              f"{error:>9.3%}{cost * 1e3:>8.0f}  {search.best.describe()}")
+        failed = failed or fuel <= LAP_MODEL_FUEL[1] or error > RACE_TIME_TOLERANCE
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Measure cold-start and per-rerun cost of the Streamlit app.
+
+Each measurement runs in a fresh interpreter so import caches do not leak
+between samples.  Run from the repository root:
+
+    python benchmarks/startup.py [--app path/to/app.py] [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+IMPORT_PROBE = """
+import sys, time
+sys.path.insert(0, {app_dir!r})
+start = time.perf_counter()
+import app
+print(time.perf_counter() - start)
+"""
+
+RENDER_PROBE = """
+import time
+from streamlit.testing.v1 import AppTest
+app_test = AppTest.from_file({app_path!r}, default_timeout=300)
+start = time.perf_counter()
+app_test.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+app_test.run()
+print(first, time.perf_counter() - start)
+"""
+
+
+def run_probe(code):
+    output = subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True, text=True
+    ).stdout
+    return [float(value) for value in output.split()[-2:] if value]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    app_path = os.path.abspath(args.app)
+
+    imports, first_runs, reruns = [], [], []
+    for _ in range(args.runs):
+        imports.append(run_probe(IMPORT_PROBE.format(app_dir=os.path.dirname(app_path)))[-1])
+        first, rerun = run_probe(RENDER_PROBE.format(app_path=app_path))
+        first_runs.append(first)
+        reruns.append(rerun)
+
+    report = {
+        'app': app_path,
+        'runs': args.runs,
+        'import_s': statistics.median(imports),
+        'first_run_s': statistics.median(first_runs),
+        'rerun_s': statistics.median(reruns),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
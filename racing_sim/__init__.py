@@ -0,0 +1,60 @@
+"""Headless racing lap simulation: cars, tracks, physics and batch runners.
+
+Importing the package has no UI side effects; the Streamlit app in app.py
+is one client of it.
+"""
+from .cars import TIRE_COMPOUND_GRIP, WEATHER_GRIP, Car, CarSetup, create_car_database
+from .tracks import CORNER, SEGMENT_TYPES, STRAIGHT, CompiledTrack, Track, create_tracks, generate_track_coordinates
+from .physics import (
+    AIR_DENSITY,
+    CAR_PHYSICS_FIELDS,
+    DEFAULT_SAMPLERS,
+    DRS_BOOST,
+    GRAVITY,
+    LAP_SOLVERS,
+    PHYSICS_VERSION,
+    PerformanceEnvelope,
+    acceleration_curve,
+    acceleration_table,
+    braking_speed,
+    braking_terms,
+    calculate_acceleration,
+    calculate_braking_distance,
+    calculate_corner_speed,
+    corner_speed_table,
+    deceleration_curve,
+    performance_envelope,
+    simulate_lap,
+    solve_corner_speeds,
+    stack_cars,
+    top_speed_limit,
+)
+from .sampling import Decimate, EveryNSteps, FixedDistance, FixedTime, lttb
+from .channels import CHANNEL_NAMES, DerivedChannels, derive_channels, lap_channels, segment_indices
+from .telemetry import (
+    TELEMETRY_CHUNK_SIZE,
+    TelemetryChunk,
+    TelemetryStream,
+    TelemetryTable,
+    iter_csv,
+    read_telemetry,
+    stream_lap,
+    write_telemetry,
+)
+from .batch import run_sweep, simulate_batch
+from .cache import ResultCache, simulation_key, track_hash
+from .store import LapStore
+from .stint import LapModel, Stint, lap_model, simulate_stint, tire_grip_factor
+from .strategy import (
+    DEFAULT_PIT_LOSS,
+    PIT_LOSS,
+    Strategy,
+    StrategySearch,
+    optimize_strategy,
+    race_fuel,
+    simulate_strategy,
+    stint_times,
+)
+from .montecarlo import MONTE_CARLO_PARAMETERS, LapTimeStats, Normal, Triangular, Uniform, monte_carlo
+from .sensitivity import SENSITIVITY_UNITS, lap_time_sensitivity, sensitivity_matrix
+from .tuning import SETUP_BOUNDS, SetupResult, SetupTrace, aero_map_drag, optimize_setup, setup_bounds, setup_lap_times
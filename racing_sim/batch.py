@@ -0,0 +1,145 @@
+"""Batched lap simulation and process-pool parameter sweeps"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cars import WEATHER_GRIP, CarSetup
+from .physics import LAP_SOLVERS, _simulate_stacked_envelope, simulate_lap, stack_cars
+from .tracks import create_tracks
+
+SWEEP_MAX_CHUNK = 256  # setups per process-pool task
+
+def _named_items(objects):
+    """(name, object) pairs from a name-keyed dict or an iterable of named objects"""
+    if isinstance(objects, dict):
+        return list(objects.items())
+    return [(obj.name, obj) for obj in objects]
+
+def simulate_batch(tracks, cars, conditions=("Dry",)):
+    """Simulate every car on every track under every weather condition.
+
+    ``tracks`` and ``cars`` may be name-keyed dicts (as returned by
+    create_tracks() and create_car_database()) or iterables; ``conditions``
+    are WEATHER_GRIP keys.  All car/condition pairs on a track are solved in
+    one stacked envelope pass.  Returns a tidy DataFrame with one row per
+    (track, car, condition).
+    """
+    import pandas as pd
+
+    car_items = _named_items(cars)
+    conditions = list(conditions)
+    unknown = [weather for weather in conditions if weather not in WEATHER_GRIP]
+    if unknown:
+        raise ValueError(f"Unknown weather conditions {unknown}, expected one of {list(WEATHER_GRIP)}")
+
+    rows = [(car_name, car, weather) for weather in conditions for car_name, car in car_items]
+    stacked = stack_cars(
+        [car for _, car, _ in rows],
+        grip_factors=[WEATHER_GRIP[weather] for _, _, weather in rows]
+    )
+
+    frames = []
+    for track_name, track in _named_items(tracks):
+        lap_times, top_speeds, avg_speeds = _simulate_stacked_envelope(track, stacked)
+        frames.append(pd.DataFrame({
+            'Track': track_name,
+            'Car': [car_name for car_name, _, _ in rows],
+            'Category': [car.category for _, car, _ in rows],
+            'Weather': [weather for _, _, weather in rows],
+            'Lap Time': lap_times,
+            'Top Speed': top_speeds,
+            'Avg Speed': avg_speeds,
+        }))
+
+    columns = ['Track', 'Car', 'Category', 'Weather', 'Lap Time', 'Top Speed', 'Avg Speed']
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+# Read-only databases installed once per sweep worker process
+_SWEEP_TRACKS = {}
+_SWEEP_CARS = {}
+
+def _init_sweep_worker(tracks, cars):
+    """Process pool initializer: keep the track and car databases for every task"""
+    _SWEEP_TRACKS.clear()
+    _SWEEP_TRACKS.update(tracks)
+    _SWEEP_CARS.clear()
+    _SWEEP_CARS.update(cars)
+
+def _run_sweep_chunk(track_name, rows, solver):
+    """Simulate one chunk of (car, fuel, compound, weather) rows on a single track"""
+    track = _SWEEP_TRACKS[track_name]
+    cars = [_SWEEP_CARS[car_name] for car_name, _, _, _ in rows]
+    setups = [CarSetup(fuel, compound, weather) for _, fuel, compound, weather in rows]
+
+    if solver == "envelope":
+        lap_times, top_speeds, avg_speeds = _simulate_stacked_envelope(track, stack_cars(
+            cars,
+            grip_factors=[setup.grip_factor for setup in setups],
+            extra_mass=[setup.fuel_load for setup in setups]
+        ))
+    else:
+        lap_times, top_speeds, avg_speeds = [], [], []
+        for car, setup in zip(cars, setups):
+            result = simulate_lap(track, car.with_setup(setup), solver)
+            lap_times.append(result['lap_time'])
+            top_speeds.append(result['top_speed'])
+            avg_speeds.append(result['avg_speed'])
+
+    return [
+        {
+            'Track': track_name,
+            'Car': car_name,
+            'Fuel Load': fuel,
+            'Tire Compound': compound,
+            'Weather': weather,
+            'Lap Time': float(lap_time),
+            'Top Speed': float(top_speed),
+            'Avg Speed': float(avg_speed),
+        }
+        for (car_name, fuel, compound, weather), lap_time, top_speed, avg_speed
+        in zip(rows, lap_times, top_speeds, avg_speeds)
+    ]
+
+def _auto_chunk_size(n_tasks, n_workers):
+    """About four chunks per worker so the pool balances.
+
+    The cap keeps stacked batches cache-friendly and results streaming.
+    """
+    return max(1, min(SWEEP_MAX_CHUNK, math.ceil(n_tasks / (n_workers * 4))))
+
+def run_sweep(cars, tracks=None, fuel_loads=(0,), compounds=("Medium",), weathers=("Dry",),
+              solver="envelope", max_workers=None, chunk_size=None):
+    """Run a car x track x setup parameter sweep on a process pool.
+
+    Yields one result dict per (track, car, fuel load, compound, weather) as
+    chunks complete, in completion order.  ``tracks`` defaults to
+    create_tracks(); tracks and cars are sent to each worker once through
+    the pool initializer, so tasks only carry names and setup values.  With
+    the "envelope" solver each chunk is solved as one stacked batch.
+    """
+    if solver not in LAP_SOLVERS:
+        raise ValueError(f"Unknown lap solver '{solver}', expected one of {sorted(LAP_SOLVERS)}")
+    tracks = dict(_named_items(tracks if tracks is not None else create_tracks()))
+    cars = dict(_named_items(cars))
+
+    setups = [
+        (car_name, fuel, compound, weather)
+        for car_name in cars
+        for fuel in fuel_loads
+        for compound in compounds
+        for weather in weathers
+    ]
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = chunk_size or _auto_chunk_size(len(setups) * len(tracks), max_workers)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker,
+                             initargs=(tracks, cars)) as executor:
+        futures = [
+            executor.submit(_run_sweep_chunk, track_name, setups[start:start + chunk_size], solver)
+            for track_name in tracks
+            for start in range(0, len(setups), chunk_size)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
@@ -0,0 +1,192 @@
+"""Content-addressed cache of simulation results"""
+import numpy as np
+import dataclasses
+import json
+import os
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+from .physics import CAR_PHYSICS_FIELDS, DEFAULT_SAMPLERS, PHYSICS_VERSION, simulate_lap
+
+def simulation_key(car, track, setup=None, solver="timestep", sampler=None):
+    """Stable content hash of everything that determines a simulation result.
+
+    Covers the car's physical fields and category (which sets the top speed
+    and DRS), the track segments, the setup (a CarSetup or equivalent dict),
+    the solver and the telemetry sampler (None meaning the solver default),
+    plus PHYSICS_VERSION so persisted results of older physics are not
+    served.  Names, colours and coordinates do not affect results and are left out,
+    so identical cars or layouts share entries.
+    """
+    sampler = sampler or DEFAULT_SAMPLERS.get(solver)
+    payload = {
+        'version': PHYSICS_VERSION,
+        'car': {field: getattr(car, field) for field in CAR_PHYSICS_FIELDS + ('category',)},
+        'segments': track.segments,
+        'setup': dataclasses.asdict(setup) if dataclasses.is_dataclass(setup) else (setup or {}),
+        'solver': solver,
+        'sampler': [type(sampler).__name__, dataclasses.asdict(sampler)] if sampler else None,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=float)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def track_hash(track):
+    """Stable content hash of a track's segments; renamed copies of a layout share it"""
+    canonical = json.dumps(track.segments, sort_keys=True, separators=(',', ':'), default=float)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def _result_nbytes(value):
+    """Rough in-memory size of a cached result"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + (len(value) * 8 if value.dtype == object else 0)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_result_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + 24 * len(value)
+    return sys.getsizeof(value)
+
+def _jsonable(value):
+    """Convert NumPy arrays and scalars (and tuples to lists) in a result dict for JSON persistence.
+
+    Always returns new dicts and lists.  Lists hold items of one kind, so
+    only the first decides whether they are descended into.
+    """
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value] if value and isinstance(value[0], (dict, list, tuple, np.ndarray, np.generic)) else list(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _copied(value):
+    """Copy of a _jsonable() result down to its lists, so callers cannot change a cached entry"""
+    if isinstance(value, dict):
+        return {key: _copied(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copied(item) for item in value] if value and isinstance(value[0], (dict, list)) else value.copy()
+    return value
+
+class ResultCache:
+    """Content-addressed LRU cache of simulation results with a memory cap.
+
+    Keys come from simulation_key().  Entries are evicted least recently
+    used first once their estimated size exceeds ``max_bytes``.  With a
+    ``cache_dir`` every entry is also written there as JSON and read back on
+    a memory miss, so results survive server restarts.  Results are stored
+    as they are persisted, NumPy arrays and scalars converted to lists and
+    Python numbers, and every lookup returns a copy, so a hit has the same
+    types whether it came from memory or disk and callers may modify it.
+    One instance may be shared between threads (Streamlit sessions): the
+    LRU bookkeeping is guarded by a lock.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json") if self.cache_dir else None
+
+    def get(self, key):
+        """Cached result for ``key`` or None; counts a hit or a miss"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return _copied(self.entries[key])
+
+        path = self._disk_path(key)
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    result = json.load(handle)
+            except (OSError, ValueError):
+                pass  # Unreadable entry, treat as a miss and overwrite it
+            else:
+                with self.lock:
+                    self.disk_hits += 1
+                    self._store(key, result)
+                return _copied(result)
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """Store a result, converted by _jsonable(), in memory and, when configured, on disk"""
+        result = _jsonable(result)
+        with self.lock:
+            self._store(key, result)
+        path = self._disk_path(key)
+        if path:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(result, handle)
+            os.replace(tmp_path, path)
+
+    def _store(self, key, result):
+        """Insert and evict; callers hold the lock"""
+        if key in self.entries:
+            self.current_bytes -= self.sizes.pop(key)
+            del self.entries[key]
+        size = _result_nbytes(result)
+        self.entries[key] = result
+        self.sizes[key] = size
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes and len(self.entries) > 1:
+            old_key, _ = self.entries.popitem(last=False)
+            self.current_bytes -= self.sizes.pop(old_key)
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached result for ``key``, calling ``compute()`` and storing it on a miss; a hit's types either way"""
+        result = self.get(key)
+        if result is None:
+            result = _jsonable(compute())
+            self.put(key, result)  # Stores its own conversion, so the caller's copy stays separate
+        return result
+
+    def simulate_lap(self, track, car, setup=None, solver="timestep", sampler=None):
+        """Cached simulate_lap() of ``car`` with ``setup`` (a CarSetup) applied"""
+        return self.get_or_compute(
+            simulation_key(car, track, setup, solver, sampler),
+            lambda: simulate_lap(track, car.with_setup(setup) if setup else car, solver, sampler)
+        )
+
+    def clear(self):
+        """Drop the in-memory entries (files on disk are kept)"""
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and memory use"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,185 @@
+"""Car specifications, setups and the built-in car database"""
+import dataclasses
+
+WEATHER_GRIP = {"Dry": 1.0, "Light Rain": 0.85, "Heavy Rain": 0.7}
+TIRE_COMPOUND_GRIP = {"Soft": 1.05, "Medium": 1.0, "Hard": 0.95}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CarSetup:
+    """Setup applied on top of a car: fuel on board, tire compound and weather"""
+    fuel_load: float = 0  # kg
+    tire_compound: str = None  # key of TIRE_COMPOUND_GRIP, None for no compound choice
+    weather: str = "Dry"  # key of WEATHER_GRIP
+
+    def __post_init__(self):
+        if self.tire_compound is not None and self.tire_compound not in TIRE_COMPOUND_GRIP:
+            raise ValueError(f"Unknown tire compound '{self.tire_compound}', expected one of {list(TIRE_COMPOUND_GRIP)}")
+        if self.weather not in WEATHER_GRIP:
+            raise ValueError(f"Unknown weather '{self.weather}', expected one of {list(WEATHER_GRIP)}")
+
+    @property
+    def grip_factor(self):
+        compound_grip = TIRE_COMPOUND_GRIP[self.tire_compound] if self.tire_compound else 1.0
+        return compound_grip * WEATHER_GRIP[self.weather]
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Car:
+    """Immutable car specification; use with_setup() for setup-adjusted variants"""
+    name: str
+    mass: float  # kg
+    power: float  # kW
+    drag_coef: float
+    downforce_coef: float
+    tire_grip: float
+    rolling_resistance: float
+    frontal_area: float  # m²
+    color: str
+    category: str
+
+    def with_setup(self, setup=None, **setup_fields):
+        """Copy of the car with a CarSetup (or CarSetup fields as keywords) applied"""
+        if setup is None:
+            setup = CarSetup(**setup_fields)
+        elif setup_fields:
+            setup = dataclasses.replace(setup, **setup_fields)
+        return dataclasses.replace(
+            self,
+            mass=self.mass + setup.fuel_load,
+            tire_grip=self.tire_grip * setup.grip_factor
+        )
+
+def create_car_database():
+    """Create database of different car types with realistic specifications"""
+    cars = {
+        # F1 Teams (2023/2024 season)
+        "Red Bull RB19": Car(
+            name="Red Bull RB19",
+            mass=798, power=760, drag_coef=0.85, downforce_coef=3.2, 
+            tire_grip=1.9, rolling_resistance=0.015, frontal_area=1.5,
+            color="#1E41FF", category="Formula 1"
+        ),
+        "Ferrari SF-23": Car(
+            name="Ferrari SF-23",
+            mass=798, power=755, drag_coef=0.88, downforce_coef=3.1,
+            tire_grip=1.85, rolling_resistance=0.015, frontal_area=1.5,
+            color="#DC143C", category="Formula 1"
+        ),
+        "Mercedes W14": Car(
+            name="Mercedes W14",
+            mass=798, power=750, drag_coef=0.92, downforce_coef=2.9,
+            tire_grip=1.8, rolling_resistance=0.015, frontal_area=1.5,
+            color="#00D2BE", category="Formula 1"
+        ),
+        "McLaren MCL60": Car(
+            name="McLaren MCL60",
+            mass=798, power=745, drag_coef=0.89, downforce_coef=3.0,
+            tire_grip=1.82, rolling_resistance=0.015, frontal_area=1.5,
+            color="#FF8700", category="Formula 1"
+        ),
+        "Aston Martin AMR23": Car(
+            name="Aston Martin AMR23",
+            mass=798, power=740, drag_coef=0.90, downforce_coef=2.95,
+            tire_grip=1.78, rolling_resistance=0.015, frontal_area=1.5,
+            color="#006F62", category="Formula 1"
+        ),
+        "Alpine A523": Car(
+            name="Alpine A523",
+            mass=798, power=735, drag_coef=0.93, downforce_coef=2.8,
+            tire_grip=1.75, rolling_resistance=0.015, frontal_area=1.5,
+            color="#0090FF", category="Formula 1"
+        ),
+        
+        # GT3 Cars
+        "Porsche 911 GT3 R": Car(
+            name="Porsche 911 GT3 R",
+            mass=1300, power=410, drag_coef=0.65, downforce_coef=1.8,
+            tire_grip=1.4, rolling_resistance=0.018, frontal_area=2.0,
+            color="#FFD700", category="GT3"
+        ),
+        "BMW M4 GT3": Car(
+            name="BMW M4 GT3",
+            mass=1320, power=415, drag_coef=0.68, downforce_coef=1.7,
+            tire_grip=1.38, rolling_resistance=0.018, frontal_area=2.1,
+            color="#0066CC", category="GT3"
+        ),
+        "Mercedes-AMG GT3": Car(
+            name="Mercedes-AMG GT3",
+            mass=1310, power=420, drag_coef=0.66, downforce_coef=1.75,
+            tire_grip=1.42, rolling_resistance=0.018, frontal_area=2.0,
+            color="#C0C0C0", category="GT3"
+        ),
+        "Ferrari 488 GT3": Car(
+            name="Ferrari 488 GT3",
+            mass=1315, power=425, drag_coef=0.64, downforce_coef=1.9,
+            tire_grip=1.45, rolling_resistance=0.018, frontal_area=1.95,
+            color="#DC143C", category="GT3"
+        ),
+        "Audi R8 LMS GT3": Car(
+            name="Audi R8 LMS GT3",
+            mass=1325, power=418, drag_coef=0.67, downforce_coef=1.72,
+            tire_grip=1.40, rolling_resistance=0.018, frontal_area=2.05,
+            color="#FF0000", category="GT3"
+        ),
+        
+        # LMP1/Hypercar
+        "Toyota GR010 Hybrid": Car(
+            name="Toyota GR010 Hybrid",
+            mass=1030, power=680, drag_coef=0.55, downforce_coef=2.5,
+            tire_grip=1.65, rolling_resistance=0.016, frontal_area=1.8,
+            color="#EB0A1E", category="LMP1/Hypercar"
+        ),
+        "Ferrari 499P": Car(
+            name="Ferrari 499P",
+            mass=1030, power=675, drag_coef=0.57, downforce_coef=2.4,
+            tire_grip=1.62, rolling_resistance=0.016, frontal_area=1.8,
+            color="#DC143C", category="LMP1/Hypercar"
+        ),
+        
+        # Hypercars
+        "Lamborghini Huracán": Car(
+            name="Lamborghini Huracán",
+            mass=1422, power=470, drag_coef=0.39, downforce_coef=0.3,
+            tire_grip=1.2, rolling_resistance=0.012, frontal_area=2.1,
+            color="#32CD32", category="Hypercar"
+        ),
+        "McLaren 720S": Car(
+            name="McLaren 720S",
+            mass=1468, power=530, drag_coef=0.32, downforce_coef=0.4,
+            tire_grip=1.25, rolling_resistance=0.011, frontal_area=2.0,
+            color="#FF8C00", category="Hypercar"
+        ),
+        "Ferrari F8 Tributo": Car(
+            name="Ferrari F8 Tributo",
+            mass=1435, power=530, drag_coef=0.34, downforce_coef=0.35,
+            tire_grip=1.22, rolling_resistance=0.012, frontal_area=2.05,
+            color="#B22222", category="Hypercar"
+        ),
+        "Porsche 911 Turbo S": Car(
+            name="Porsche 911 Turbo S",
+            mass=1640, power=478, drag_coef=0.35, downforce_coef=0.25,
+            tire_grip=1.18, rolling_resistance=0.012, frontal_area=2.15,
+            color="#FFFF00", category="Hypercar"
+        ),
+        
+        # Sports Cars
+        "BMW M3 Competition": Car(
+            name="BMW M3 Competition",
+            mass=1730, power=375, drag_coef=0.35, downforce_coef=0.1,
+            tire_grip=1.1, rolling_resistance=0.014, frontal_area=2.3,
+            color="#4169E1", category="Sports Car"
+        ),
+        "Audi RS6": Car(
+            name="Audi RS6",
+            mass=2040, power=441, drag_coef=0.32, downforce_coef=0.05,
+            tire_grip=1.05, rolling_resistance=0.015, frontal_area=2.4,
+            color="#800080", category="Sports Car"
+        ),
+        "Mercedes-AMG C63": Car(
+            name="Mercedes-AMG C63",
+            mass=1715, power=375, drag_coef=0.34, downforce_coef=0.08,
+            tire_grip=1.08, rolling_resistance=0.014, frontal_area=2.25,
+            color="#2F4F4F", category="Sports Car"
+        )
+    }
+    
+    return cars
@@ -0,0 +1,121 @@
+"""Derived telemetry channels: g-forces, pedal state and what limits acceleration"""
+import numpy as np
+import dataclasses
+
+from .physics import AIR_DENSITY, GRAVITY
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class DerivedChannels:
+    """Per-sample channels of a lap, computed once from its telemetry arrays.
+
+    G-forces are in units of GRAVITY.  Longitudinal g is signed (braking is
+    negative) and taken over the interval ending at each sample; it is zero
+    at the first sample and where time does not advance, as at the
+    instantaneous speed drop on corner entry.  Lateral g is v²/r in
+    corners and zero on straights.  ``throttle`` and ``brake`` mark samples
+    reached by speeding up or slowing down; on throttle, ``traction_limited``
+    marks samples where tire grip rather than engine power caps the
+    acceleration and ``power_limited`` the others.
+    """
+    longitudinal_g: np.ndarray
+    lateral_g: np.ndarray
+    combined_g: np.ndarray
+    throttle: np.ndarray
+    brake: np.ndarray
+    power_limited: np.ndarray
+    traction_limited: np.ndarray
+
+    def __len__(self):
+        return len(self.longitudinal_g)
+
+    def columns(self):
+        """Channel name to array, in field order"""
+        return {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+
+    def take(self, indices):
+        """Channels of the samples at ``indices`` (or a boolean mask)"""
+        return DerivedChannels(**{name: values[indices] for name, values in self.columns().items()})
+
+CHANNEL_NAMES = tuple(field.name for field in dataclasses.fields(DerivedChannels))
+
+def derive_channels(car, speed, time, radius=None):
+    """DerivedChannels of one lap from its speed (km/h) and time (s) arrays.
+
+    ``car`` is the car as simulated, setup applied.  ``radius`` holds the
+    corner radius (m) of every sample's segment, NaN or 0 on straights;
+    without it lateral g is zero.
+    """
+    speed_ms = np.asarray(speed, dtype=float) / 3.6
+    time = np.asarray(time, dtype=float)
+
+    speed_diff = np.diff(speed_ms)
+    time_diff = np.diff(time)
+    longitudinal = np.zeros_like(speed_ms)
+    np.divide(speed_diff, time_diff * GRAVITY, out=longitudinal[1:], where=time_diff > 0)
+
+    lateral = np.zeros_like(speed_ms)
+    if radius is not None:
+        radius = np.asarray(radius, dtype=float)
+        np.divide(speed_ms**2, radius * GRAVITY, out=lateral, where=radius > 0)
+
+    throttle = np.zeros(len(speed_ms), dtype=bool)
+    brake = np.zeros(len(speed_ms), dtype=bool)
+    throttle[1:], brake[1:] = speed_diff > 0, speed_diff < 0
+
+    # Same forces as physics.acceleration_curve: traction limits where the
+    # engine could push harder than the tires can transmit
+    v = np.maximum(speed_ms, 5)
+    engine_force = (car.power * 1000 / v - 0.5 * AIR_DENSITY * car.drag_coef * car.frontal_area * v**2
+                    - car.rolling_resistance * car.mass * GRAVITY)
+    traction_limit = car.tire_grip * (car.mass * GRAVITY + 0.5 * AIR_DENSITY * car.downforce_coef * car.frontal_area * v**2)
+    traction_limited = throttle & (engine_force > traction_limit)
+
+    return DerivedChannels(
+        longitudinal_g=longitudinal,
+        lateral_g=lateral,
+        combined_g=np.hypot(longitudinal, lateral),
+        throttle=throttle,
+        brake=brake,
+        power_limited=throttle & ~traction_limited,
+        traction_limited=traction_limited,
+    )
+
+def segment_indices(track, names):
+    """Index into track.compiled of every sample's segment name; -1 for the "Start" label.
+
+    Samples must be in lap order.  Names are matched to segments in track
+    order, so a name used by several segments resolves to the right one
+    unless those segments are adjacent; names not found on the track get -1.
+    """
+    names = np.asarray(names, dtype=object)
+    if not len(names):
+        return np.empty(0, dtype=np.intp)
+    starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+    track_names = track.compiled.names
+
+    run_indices = []
+    position = 0
+    for run, name in enumerate(names[starts].tolist()):
+        if run == 0 and name == "Start":
+            run_indices.append(-1)
+            continue
+        found = position
+        while found < len(track_names) and track_names[found] != name:
+            found += 1
+        if found < len(track_names):
+            position = found
+            run_indices.append(found)
+        else:
+            run_indices.append(-1)
+    return np.repeat(np.array(run_indices, dtype=np.intp), np.diff(np.r_[starts, len(names)]))
+
+def lap_channels(track, car, lap):
+    """DerivedChannels of a simulate_lap() result dict or a TelemetryTable of ``car`` on ``track``"""
+    if isinstance(lap, dict):
+        speed, time, names = lap['speeds'], lap['times'], lap['segments']
+    else:
+        speed, time = lap.speed, lap.time
+        names = np.array(lap.segment_names, dtype=object)[lap.segment]
+    index = segment_indices(track, names)
+    radius = np.where(index >= 0, track.compiled.radii[index], np.nan)  # radii are NaN on straights
+    return derive_channels(car, speed, time, radius)
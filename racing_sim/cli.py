@@ -0,0 +1,498 @@
+"""Command line interface: ``python -m racing_sim simulate|stint|strategy|tune|sensitivity|montecarlo|run|history|list``.
+
+``simulate`` runs one lap and prints its summary (or its telemetry with
+--telemetry, plus derived channels with --channels).  ``stint`` prints one
+row per lap of --laps consecutive laps, burning fuel and wearing tires.
+``strategy`` prints the fastest pit strategies of a --laps lap race.
+``tune`` searches car parameters for the fastest lap and prints the
+convergence trace, one row per generation.  ``sensitivity`` prints
+d(lap time)/d(parameter) of every physics field per car and track.
+``montecarlo`` draws parameters from --param distributions and prints
+lap-time statistics (or the histogram with --histogram).  ``run`` reads a JSON job spec and streams one row per lap
+from a process-pool sweep, e.g.::
+
+    {
+      "solver": "envelope",
+      "jobs": [
+        {"tracks": ["Monza", "Monaco"], "cars": ["Red Bull RB19"],
+         "fuel_loads": [0, 50, 100], "compounds": ["Soft", "Hard"], "weathers": ["dry", "light rain"]},
+        {"tracks": "Suzuka", "weathers": ["heavy rain"]}
+      ]
+    }
+
+Every job field takes a value or a list.  Omitted tracks and cars mean all
+of them; fuel_loads, compounds and weathers default to 0, Medium and Dry.
+
+With --store DATABASE both record their laps in a LapStore, which
+``history`` queries: the best lap per car, or every lap within --within
+seconds of pole.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+from .batch import run_sweep
+from .cars import TIRE_COMPOUND_GRIP, WEATHER_GRIP, CarSetup, create_car_database
+from .channels import derive_channels
+from .physics import LAP_SOLVERS, simulate_lap
+from .montecarlo import MONTE_CARLO_BATCH, MONTE_CARLO_LAPS, Normal, Triangular, Uniform, monte_carlo
+from .sampling import Decimate, EveryNSteps, FixedDistance, FixedTime
+from .sensitivity import sensitivity_matrix
+from .stint import simulate_stint
+from .store import LapStore
+from .strategy import STRATEGY_TOP, optimize_strategy
+from .telemetry import TelemetryTable, _pyarrow, iter_csv, stream_lap, write_telemetry
+from .tracks import create_tracks
+from .tuning import SETUP_MAX_GENERATIONS, SETUP_POPULATION, optimize_setup, setup_bounds
+
+FORMATS = ("json", "csv", "parquet", "arrow")
+JOB_FIELDS = ("tracks", "cars", "fuel_loads", "compounds", "weathers")
+SAMPLER_KINDS = {"steps": EveryNSteps, "distance": FixedDistance, "time": FixedTime, "decimate": Decimate}
+DISTRIBUTION_KINDS = {"normal": Normal, "uniform": Uniform, "triangular": Triangular}
+STORE_BATCH = 1000  # sweep rows recorded per transaction
+
+def _lookup(name, choices, kind):
+    """Exact or case-insensitive match of ``name`` among ``choices``"""
+    if name in choices:
+        return name
+    folded = {choice.casefold(): choice for choice in choices}
+    try:
+        return folded[name.casefold()]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} '{name}', expected one of {sorted(choices)}")
+
+def _weather(name):
+    """Weather names as typed on a command line: dry, light-rain, Heavy_Rain, ..."""
+    return _lookup(name.replace('-', ' ').replace('_', ' '), WEATHER_GRIP, "weather")
+
+def _sampler(spec):
+    """Telemetry sampler from KIND:VALUE, e.g. steps:10, distance:5, time:0.1, decimate:0.5"""
+    kind, _, value = spec.partition(':')
+    policy = SAMPLER_KINDS[_lookup(kind, SAMPLER_KINDS, "sampler")]
+    try:
+        value = int(value) if policy is EveryNSteps else float(value)
+    except ValueError:
+        raise ValueError(f"Invalid sampler '{spec}', expected KIND:VALUE with KIND one of {list(SAMPLER_KINDS)}")
+    return policy(value)
+
+def _listed(value):
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+def _track_car_setup(args):
+    """(track, base car, setup) for the --track, --car, --fuel-load, --compound and --weather options"""
+    cars, tracks = create_car_database(), create_tracks()
+    car_name = _lookup(args.car, cars, "car")
+    track_name = _lookup(args.track, tracks, "track")
+    compound = _lookup(args.compound, TIRE_COMPOUND_GRIP, "tire compound") if args.compound else None
+    setup = CarSetup(args.fuel_load, compound, _weather(args.weather))
+    return tracks[track_name], cars[car_name], setup
+
+def _simulation(args):
+    """(track, base car, setup, sampler) for the simulate options"""
+    sampler = _sampler(args.sampler) if args.sampler else None
+    return *_track_car_setup(args), sampler
+
+def simulate_records(args):
+    """Summary row of one lap"""
+    track, base_car, setup, sampler = _simulation(args)
+    car = base_car.with_setup(setup)
+    result = simulate_lap(track, car, args.solver, sampler)
+    if args.store:
+        LapStore(args.store).record(track, base_car, result, setup, args.solver)
+    return [{
+        'Track': track.name,
+        'Car': car.name,
+        'Fuel Load': setup.fuel_load,
+        'Tire Compound': setup.tire_compound,
+        'Weather': setup.weather,
+        'Solver': args.solver,
+        'Lap Time': float(result['lap_time']),
+        'Top Speed': float(result['top_speed']),
+        'Avg Speed': float(result['avg_speed']),
+    }]
+
+def write_lap_telemetry(args):
+    """Telemetry of one lap: JSON rows and CSV blocks streamed chunk by chunk, otherwise a columnar TelemetryTable.
+
+    Derived channels (--channels) need the whole lap, so with them rows
+    follow once the lap is simulated.
+    """
+    track, base_car, setup, sampler = _simulation(args)
+    car = base_car.with_setup(setup)
+    stream = stream_lap(track, car, args.solver, sampler=sampler)
+
+    def laps():
+        if args.format == "csv" and not args.channels:
+            return stream
+        lap = TelemetryTable.from_stream(stream)
+        return lap.with_channels(track, car) if args.channels else lap
+
+    if args.format == "json":
+        records = _channel_records(stream, car) if args.channels else _telemetry_records(stream)
+        write_records(records, "json", args.output)
+    elif args.output:
+        write_telemetry(args.output, laps(), args.format)
+    elif args.format == "csv":
+        sys.stdout.writelines(iter_csv(laps()))
+    else:
+        raise ValueError(f"--format {args.format} needs --output")
+    if args.store:
+        LapStore(args.store).record(track, base_car, stream.summary, setup, args.solver)
+
+def stint_records(args):
+    """One row per lap of a stint"""
+    track, car, setup = _track_car_setup(args)
+    if args.laps < 1:
+        raise ValueError(f"--laps must be at least 1, got {args.laps}")
+    stint = simulate_stint(track, car, args.laps, setup, tire_age=args.tire_age, exact=args.exact)
+    return [
+        {
+            'Track': track.name,
+            'Car': car.name,
+            'Lap': lap,
+            'Tire Compound': setup.tire_compound,
+            'Tire Age': age,
+            'Fuel': fuel,
+            'Grip': grip,
+            'Lap Time': lap_time,
+            'Fuel Used': fuel_used,
+            'Race Time': elapsed,
+        }
+        for lap, age, fuel, grip, lap_time, fuel_used, elapsed in zip(
+            stint.lap.tolist(), stint.tire_age.tolist(), stint.fuel.tolist(), stint.grip_factor.tolist(),
+            stint.lap_time.tolist(), stint.fuel_used.tolist(), stint.elapsed.tolist())
+    ]
+
+def strategy_records(args):
+    """One row per strategy, fastest first"""
+    cars, tracks = create_car_database(), create_tracks()
+    track = tracks[_lookup(args.track, tracks, "track")]
+    car = cars[_lookup(args.car, cars, "car")]
+    compounds = [_lookup(compound, TIRE_COMPOUND_GRIP, "tire compound") for compound in args.compounds.split(',')]
+    search = optimize_strategy(track, car, args.laps, _weather(args.weather), args.fuel_load, args.pit_loss,
+                               args.max_stops, tuple(compounds), args.top, args.workers)
+    return [
+        {
+            'Track': track.name,
+            'Car': car.name,
+            'Rank': rank,
+            'Strategy': strategy.describe(),
+            'Stops': strategy.stops,
+            'Pit Laps': list(strategy.pit_laps),
+            'Race Time': strategy.race_time,
+        }
+        for rank, strategy in enumerate(search.strategies, 1)
+    ]
+
+def _parameter_bounds(spec):
+    """(name, (low, high)) from NAME=LOW:HIGH, e.g. downforce_coef=2.0:4.0"""
+    name, _, values = spec.partition('=')
+    low, _, high = values.partition(':')
+    try:
+        return name, (float(low), float(high))
+    except ValueError:
+        raise ValueError(f"Invalid parameter bounds '{spec}', expected NAME=LOW:HIGH")
+
+def tune_records(args):
+    """Convergence trace of a setup search, one row per generation; the last row holds the best setup"""
+    track, car, setup = _track_car_setup(args)
+    bounds = dict(map(_parameter_bounds, args.param)) if args.param else setup_bounds(car)
+    result = optimize_setup(track, car, bounds, setup, aero_map=not args.no_aero_map, population=args.population,
+                            max_generations=args.generations, seed=args.seed)
+    return [
+        {
+            'Track': track.name,
+            'Car': car.name,
+            'Generation': point.generation,
+            'Evaluations': point.evaluations,
+            'Best Lap Time': point.best_lap_time,
+            'Mean Lap Time': point.mean_lap_time,
+            'Step Size': point.step_size,
+            **point.parameters,
+        }
+        for point in result.trace
+    ]
+
+def sensitivity_records(args):
+    """One row per (track, car): lap time and its derivative by every physics field"""
+    cars, tracks = create_car_database(), create_tracks()
+    track_names = [_lookup(name, tracks, "track") for name in args.track] if args.track else list(tracks)
+    car_names = [_lookup(name, cars, "car") for name in args.car] if args.car else list(cars)
+    compound = _lookup(args.compound, TIRE_COMPOUND_GRIP, "tire compound") if args.compound else None
+    matrix = sensitivity_matrix({name: tracks[name] for name in track_names}, {name: cars[name] for name in car_names},
+                                CarSetup(args.fuel_load, compound, _weather(args.weather)), args.per_percent)
+    return matrix.to_dict('records')
+
+def _distribution(spec):
+    """(name, distribution) from NAME=KIND:ARGS, e.g. weather_grip=normal:0.85:0.03 or power=uniform:740:770"""
+    name, _, values = spec.partition('=')
+    kind, *arguments = values.split(':')
+    distribution = DISTRIBUTION_KINDS[_lookup(kind, DISTRIBUTION_KINDS, "distribution")]
+    try:
+        return name, distribution(*map(float, arguments))
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid distribution '{spec}' ({error}); expected NAME=normal:MEAN:STD, "
+                         f"NAME=uniform:LOW:HIGH or NAME=triangular:LOW:MODE:HIGH")
+
+def montecarlo_records(args):
+    """Summary row of the lap-time distribution, or one row per histogram bin"""
+    track, car, setup = _track_car_setup(args)
+    stats = monte_carlo(track, car, dict(map(_distribution, args.param or ())), args.laps, setup, args.seed,
+                        args.batch_size, args.ci)
+    if args.histogram:
+        edges, counts = stats.histogram()
+        return [{'Bin Start': start, 'Bin End': end, 'Laps': count}
+                for start, end, count in zip(edges[:-1].tolist(), edges[1:].tolist(), counts.tolist()) if count]
+    return [{'Track': track.name, 'Car': car.name, **stats.summary()}]
+
+def _telemetry_records(stream):
+    """Rows of a TelemetryStream, produced chunk by chunk as the lap is simulated"""
+    for chunk in stream:
+        names = stream.segment_names
+        for distance, speed, time, code in zip(chunk.distance.tolist(), chunk.speed.tolist(),
+                                               chunk.time.tolist(), chunk.segment.tolist()):
+            yield {'distance': distance, 'speed': speed, 'time': time, 'segment': names[code]}
+
+def _channel_records(stream, car):
+    """Rows of a TelemetryStream with its derived channels, once the whole lap is simulated"""
+    chunks = list(stream)
+    columns = {name: np.concatenate([getattr(chunk, name) for chunk in chunks])
+               for name in ('distance', 'speed', 'time', 'segment')}
+    # Stream codes are positions on the track (0 is the start), so radii need no name matching
+    radius = np.append(np.nan, stream.track.compiled.radii)[columns['segment']]
+    channels = derive_channels(car, columns['speed'], columns['time'], radius).columns()
+    names = stream.segment_names
+    for distance, speed, time, code, *values in zip(*(column.tolist() for column in columns.values()),
+                                                     *(values.tolist() for values in channels.values())):
+        yield {'distance': distance, 'speed': speed, 'time': time, 'segment': names[code],
+               **dict(zip(channels, values))}
+
+def load_jobs(path):
+    """Parse and validate a job spec; returns (solver, list of run_sweep keyword dicts)"""
+    with open(path) as f:
+        spec = json.load(f)
+    cars, tracks = create_car_database(), create_tracks()
+    solver = spec.get('solver', 'envelope')
+    if solver not in LAP_SOLVERS:
+        raise ValueError(f"Unknown lap solver '{solver}', expected one of {sorted(LAP_SOLVERS)}")
+
+    jobs = []
+    for number, job in enumerate(spec.get('jobs', []), 1):
+        unknown = set(job) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Job {number}: unknown fields {sorted(unknown)}, expected {list(JOB_FIELDS)}")
+        track_names = [_lookup(name, tracks, "track") for name in _listed(job.get('tracks', list(tracks)))]
+        car_names = [_lookup(name, cars, "car") for name in _listed(job.get('cars', list(cars)))]
+        compounds = [_lookup(name, TIRE_COMPOUND_GRIP, "tire compound") for name in _listed(job.get('compounds', "Medium"))]
+        jobs.append({
+            'tracks': {name: tracks[name] for name in track_names},
+            'cars': {name: cars[name] for name in car_names},
+            'fuel_loads': [float(fuel) for fuel in _listed(job.get('fuel_loads', 0))],
+            'compounds': compounds,
+            'weathers': [_weather(name) for name in _listed(job.get('weathers', "Dry"))],
+        })
+    return solver, jobs
+
+def run_records(args):
+    """Rows of every lap in the job spec, streamed as sweep chunks complete"""
+    solver, jobs = load_jobs(args.spec)
+    store = LapStore(args.store) if args.store else None
+    sweeps = ((job, run_sweep(solver=solver, max_workers=args.workers, **job)) for job in jobs)
+    return itertools.chain.from_iterable(
+        _recorded(rows, store, job, solver) if store is not None else rows for job, rows in sweeps
+    )
+
+def _recorded(rows, store, job, solver):
+    """Pass sweep rows through, recording them in ``store`` every STORE_BATCH rows"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        yield row
+        if len(batch) == STORE_BATCH:
+            store.record_rows(batch, job['tracks'], job['cars'], solver)
+            batch = []
+    store.record_rows(batch, job['tracks'], job['cars'], solver)
+
+def history_records(args):
+    """Stored laps on one track: the best per car, or all within --within seconds of pole"""
+    if not os.path.exists(args.store):
+        raise ValueError(f"No lap store at '{args.store}'")
+    store = LapStore(args.store)
+    compound = _lookup(args.compound, TIRE_COMPOUND_GRIP, "tire compound") if args.compound else None
+    filters = {'tire_compound': compound, 'fuel_load': args.fuel_load, 'solver': args.solver}
+    weather = _weather(args.weather)
+    if args.within is not None:
+        return store.within_of_pole(args.track, args.within, weather, **filters)
+    return store.best_laps(args.track, weather, **filters)
+
+def write_records(records, fmt, output):
+    """Write rows as a JSON array, CSV, Parquet or an Arrow IPC stream; JSON and CSV stream row by row"""
+    if fmt in ("parquet", "arrow"):
+        if output is None:
+            raise ValueError(f"--format {fmt} needs --output")
+        pa = _pyarrow()
+        table = pa.Table.from_pylist(list(records))
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, output)
+        else:
+            with pa.ipc.new_stream(output, table.schema) as writer:
+                writer.write_table(table)
+        return
+
+    stream = open(output, 'w', newline='') if output else sys.stdout
+    try:
+        if fmt == "csv":
+            writer = None
+            for record in records:
+                if writer is None:
+                    writer = csv.DictWriter(stream, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow(record)
+        else:
+            stream.write("[")
+            for i, record in enumerate(records):
+                stream.write(("," if i else "") + "\n  " + json.dumps(record))
+            stream.write("\n]\n")
+    finally:
+        if output:
+            stream.close()
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m racing_sim", description="Headless racing lap simulator")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_output_options(command):
+        command.add_argument('--format', choices=FORMATS, default="json")
+        command.add_argument('--output', '-o', help="output file (default: stdout; required for parquet and arrow)")
+
+    simulate = commands.add_parser('simulate', help="simulate one lap")
+    simulate.add_argument('--track', required=True)
+    simulate.add_argument('--car', required=True)
+    simulate.add_argument('--weather', default="dry", help=f"one of {list(WEATHER_GRIP)}, any case, '-' or '_' for spaces")
+    simulate.add_argument('--fuel-load', type=float, default=0, help="kg")
+    simulate.add_argument('--compound', help=f"one of {list(TIRE_COMPOUND_GRIP)}")
+    simulate.add_argument('--solver', choices=sorted(LAP_SOLVERS), default="timestep")
+    simulate.add_argument('--telemetry', action='store_true', help="output the lap trace instead of the summary")
+    simulate.add_argument('--channels', action='store_true',
+                          help="add derived channels (g-forces, throttle/brake, power/traction limit) to --telemetry")
+    simulate.add_argument('--sampler', metavar='KIND:VALUE',
+                          help="telemetry sampling: steps:N, distance:METRES, time:SECONDS or decimate:KMH")
+    simulate.add_argument('--store', metavar='DATABASE', help="also record the lap in this lap store")
+    add_output_options(simulate)
+
+    stint = commands.add_parser('stint', help="simulate consecutive laps burning fuel and wearing tires")
+    stint.add_argument('--track', required=True)
+    stint.add_argument('--car', required=True)
+    stint.add_argument('--laps', type=int, required=True)
+    stint.add_argument('--weather', default="dry", help=f"one of {list(WEATHER_GRIP)}, any case, '-' or '_' for spaces")
+    stint.add_argument('--fuel-load', type=float, default=0, help="kg at the start")
+    stint.add_argument('--compound', help=f"one of {list(TIRE_COMPOUND_GRIP)}")
+    stint.add_argument('--tire-age', type=int, default=0, help="laps already on the tires")
+    stint.add_argument('--exact', action='store_true', help="re-solve every lap instead of interpolating the lap model")
+    add_output_options(stint)
+
+    strategy = commands.add_parser('strategy', help="search pit stop laps and compound orders for the fastest race")
+    strategy.add_argument('--track', required=True)
+    strategy.add_argument('--car', required=True)
+    strategy.add_argument('--laps', type=int, required=True)
+    strategy.add_argument('--weather', default="dry", help=f"one of {list(WEATHER_GRIP)}, any case, '-' or '_' for spaces")
+    strategy.add_argument('--fuel-load', type=float, help="kg at the start (default: enough for the race)")
+    strategy.add_argument('--pit-loss', type=float, help="seconds lost per stop (default: the track's)")
+    strategy.add_argument('--max-stops', type=int, default=3)
+    strategy.add_argument('--compounds', default=",".join(TIRE_COMPOUND_GRIP), help="comma-separated compounds to use")
+    strategy.add_argument('--top', type=int, default=STRATEGY_TOP, help="strategies to list")
+    strategy.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    add_output_options(strategy)
+
+    tune = commands.add_parser('tune', help="search car parameters for the fastest lap (CMA-ES)")
+    tune.add_argument('--track', required=True)
+    tune.add_argument('--car', required=True)
+    tune.add_argument('--param', action='append', metavar='NAME=LOW:HIGH',
+                      help="car parameter to search and its bounds, repeatable (default: downforce_coef at 0.5-1.5x)")
+    tune.add_argument('--no-aero-map', action='store_true', help="keep drag_coef fixed while downforce_coef varies")
+    tune.add_argument('--weather', default="dry", help=f"one of {list(WEATHER_GRIP)}, any case, '-' or '_' for spaces")
+    tune.add_argument('--fuel-load', type=float, default=0, help="kg")
+    tune.add_argument('--compound', help=f"one of {list(TIRE_COMPOUND_GRIP)}")
+    tune.add_argument('--population', type=int, default=SETUP_POPULATION, help="candidates per generation")
+    tune.add_argument('--generations', type=int, default=SETUP_MAX_GENERATIONS, help="most generations")
+    tune.add_argument('--seed', type=int, default=0)
+    add_output_options(tune)
+
+    sensitivity = commands.add_parser('sensitivity', help="lap-time derivatives by every car physics parameter")
+    sensitivity.add_argument('--track', action='append', help="track to include, repeatable (default: all)")
+    sensitivity.add_argument('--car', action='append', help="car to include, repeatable (default: all)")
+    sensitivity.add_argument('--weather', default="dry", help=f"one of {list(WEATHER_GRIP)}, any case, '-' or '_' for spaces")
+    sensitivity.add_argument('--fuel-load', type=float, default=0, help="kg")
+    sensitivity.add_argument('--compound', help=f"one of {list(TIRE_COMPOUND_GRIP)}")
+    sensitivity.add_argument('--per-percent', action='store_true',
+                             help="seconds per 1%% of each parameter instead of per unit")
+    add_output_options(sensitivity)
+
+    montecarlo = commands.add_parser('montecarlo', help="lap-time distribution under uncertain parameters")
+    montecarlo.add_argument('--track', required=True)
+    montecarlo.add_argument('--car', required=True)
+    montecarlo.add_argument('--param', action='append', metavar='NAME=KIND:ARGS',
+                            help="distribution of a car parameter, weather_grip or fuel_load, repeatable: "
+                                 "normal:MEAN:STD, uniform:LOW:HIGH or triangular:LOW:MODE:HIGH")
+    montecarlo.add_argument('--weather', default="dry", help=f"one of {list(WEATHER_GRIP)}, any case, '-' or '_' for spaces")
+    montecarlo.add_argument('--fuel-load', type=float, default=0, help="kg, unless --param samples it")
+    montecarlo.add_argument('--compound', help=f"one of {list(TIRE_COMPOUND_GRIP)}")
+    montecarlo.add_argument('--laps', type=int, default=MONTE_CARLO_LAPS, help="most laps to run")
+    montecarlo.add_argument('--batch-size', type=int, default=MONTE_CARLO_BATCH, help="laps per stacked solve")
+    montecarlo.add_argument('--ci', type=float, metavar='SECONDS',
+                            help="stop early once the 95%% confidence interval of the mean is within ±SECONDS")
+    montecarlo.add_argument('--seed', type=int, default=0)
+    montecarlo.add_argument('--histogram', action='store_true', help="output the lap-time histogram instead")
+    add_output_options(montecarlo)
+
+    run = commands.add_parser('run', help="run every lap of a JSON job spec on a process pool")
+    run.add_argument('spec', help="job spec file")
+    run.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    run.add_argument('--store', metavar='DATABASE', help="also record the laps in this lap store")
+    add_output_options(run)
+
+    history = commands.add_parser('history', help="query laps recorded with --store")
+    history.add_argument('store', metavar='DATABASE', help="lap store file")
+    history.add_argument('--track', required=True, help="track name as recorded")
+    history.add_argument('--weather', default="dry", help=f"one of {list(WEATHER_GRIP)}, any case, '-' or '_' for spaces")
+    history.add_argument('--within', type=float, metavar='SECONDS',
+                         help="every lap within SECONDS of pole instead of the best lap per car")
+    history.add_argument('--compound', help="only laps on this tire compound")
+    history.add_argument('--fuel-load', type=float, help="only laps with this fuel load (kg)")
+    history.add_argument('--solver', choices=sorted(LAP_SOLVERS), help="only laps of this solver")
+    add_output_options(history)
+
+    listing = commands.add_parser('list', help="list built-in cars or tracks")
+    listing.add_argument('what', choices=("cars", "tracks"))
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        names = create_car_database() if args.what == "cars" else create_tracks()
+        print("\n".join(names))
+        return
+
+    try:
+        if args.command == 'simulate' and args.telemetry:
+            write_lap_telemetry(args)
+        else:
+            producers = {'simulate': simulate_records, 'stint': stint_records, 'strategy': strategy_records,
+                         'tune': tune_records, 'sensitivity': sensitivity_records,
+                         'montecarlo': montecarlo_records, 'run': run_records, 'history': history_records}
+            records = producers[args.command](args)
+            write_records(records, args.format, args.output)
+    except BrokenPipeError:
+        # stdout closed early, e.g. piped into head: silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except (ValueError, OSError, ImportError) as error:
+        parser.error(str(error))
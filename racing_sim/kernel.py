@@ -0,0 +1,128 @@
+"""Optional compiled kernel for the time-stepped lap solver.
+
+_timestep_kernel is the loop of physics._timestep_steps over array-encoded
+track and car data, in the subset of Python that numba compiles.  With
+numba installed it is compiled on first use and cached to disk, so the
+compilation is paid once per deployment; without numba, or with
+RACING_SIM_JIT=0 in the environment, compiled_timestep_kernel() is None
+and simulate_lap keeps the reference generator.
+"""
+import functools
+import os
+
+import numpy as np
+
+from .tracks import STRAIGHT
+
+def _timestep_kernel(type_codes, lengths, next_corner, speed_caps, corner_speeds,
+                     acceleration, deceleration, stopping, per_step,
+                     dt, start_speed, no_corner_speed, distances, speeds, times, codes):
+    """Every step of a time-stepped lap, written to the output arrays while they have room.
+
+    Speeds are in km/h, the car tables are a PerformanceEnvelope's arrays
+    and ``speed_caps`` holds each straight's speed cap with DRS applied.
+    Returns (steps, lap_time, total_distance, top_speed); steps past the
+    end of the outputs are counted but not written.
+    """
+    capacity = len(distances)
+    last = len(acceleration) - 2
+    current_speed = top_speed = start_speed
+    total_time = 0.0
+    total_distance = 0.0
+    n = 0
+    if capacity > 0:
+        distances[0], speeds[0], times[0], codes[0] = 0.0, current_speed, 0.0, 0
+    n += 1
+
+    for i in range(len(type_codes)):
+        segment_length = lengths[i]
+        segment_code = i + 1
+
+        if type_codes[i] == STRAIGHT:
+            j = next_corner[i]
+            next_corner_speed = corner_speeds[j] if j >= 0 else no_corner_speed
+            x = min(next_corner_speed * per_step, last + 1)
+            k = min(int(x), last)
+            target_stopping = stopping[k] + (x - k) * (stopping[k + 1] - stopping[k])
+            speed_cap = speed_caps[i]
+
+            distance_covered = 0.0
+            while distance_covered < segment_length:
+                remaining = segment_length - distance_covered
+                x = current_speed * per_step
+                k = min(int(x), last)
+                x -= k
+                braking_dist = stopping[k] + x * (stopping[k + 1] - stopping[k]) - target_stopping
+
+                if braking_dist >= remaining:
+                    decel = (deceleration[k] + x * (deceleration[k + 1] - deceleration[k])) * 3.6
+                    current_speed = max(next_corner_speed, current_speed - decel * dt)
+                else:
+                    accel = acceleration[k] + x * (acceleration[k + 1] - acceleration[k])
+                    current_speed = min(speed_cap, current_speed + accel * 3.6 * dt)
+
+                distance_step = current_speed / 3.6 * dt
+                distance_covered += distance_step
+                total_distance += distance_step
+                total_time += dt
+                if current_speed > top_speed:
+                    top_speed = current_speed
+
+                if n < capacity:
+                    distances[n], speeds[n], times[n], codes[n] = total_distance, current_speed, total_time, segment_code
+                n += 1
+
+        else:
+            if corner_speeds[i] < current_speed:
+                current_speed = corner_speeds[i]
+                if n < capacity:
+                    distances[n], speeds[n], times[n], codes[n] = total_distance, current_speed, total_time, segment_code
+                n += 1
+
+            total_time += segment_length / (current_speed / 3.6)
+            total_distance += segment_length
+
+            if n < capacity:
+                distances[n], speeds[n], times[n], codes[n] = total_distance, current_speed, total_time, segment_code
+            n += 1
+
+    return n, total_time, total_distance, top_speed
+
+@functools.cache
+def compiled_timestep_kernel():
+    """_timestep_kernel compiled by numba, or None; numba is only imported on the first call"""
+    if os.environ.get("RACING_SIM_JIT", "1") == "0":
+        return None
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.njit(cache=True)(_timestep_kernel)
+
+def _step_capacity(type_codes, lengths, corner_speeds, dt, start_speed, no_corner_speed):
+    """Upper bound on the steps of a _timestep_kernel lap.
+
+    The start and every corner's entry and exit take at most 1 + 2 per
+    segment.  The speed never drops below the slowest corner, start or
+    no-corner target, so a straight takes at most its length over the
+    distance of a step at that speed, plus one.
+    """
+    straights = type_codes == STRAIGHT
+    slowest = min(start_speed, no_corner_speed, float(corner_speeds[~straights].min(initial=np.inf)))
+    step_distance = slowest / 3.6 * dt
+    return 1 + 2 * len(type_codes) + int(np.ceil(lengths[straights] / step_distance).sum()) + int(straights.sum())
+
+def timestep_lap_arrays(kernel, arguments):
+    """(distances, speeds, times, codes, (lap_time, total_distance, top_speed)) of a kernel run.
+
+    The outputs are allocated from _step_capacity() and cut to the steps
+    taken, so the lap is simulated once.
+    """
+    type_codes, lengths, _, _, corner_speeds, _, _, _, _, dt, start_speed, no_corner_speed = arguments
+    n = _step_capacity(type_codes, lengths, corner_speeds, dt, start_speed, no_corner_speed)
+    outputs = (np.empty(n), np.empty(n), np.empty(n), np.empty(n, dtype=np.int32))
+    steps, lap_time, total_distance, top_speed = kernel(*arguments, *outputs)
+    if steps > n:  # The bound failed; run again with room for every step
+        outputs = (np.empty(steps), np.empty(steps), np.empty(steps), np.empty(steps, dtype=np.int32))
+        kernel(*arguments, *outputs)
+    return tuple(output[:steps] for output in outputs) + ((lap_time, total_distance, top_speed),)
@@ -0,0 +1,207 @@
+"""Monte Carlo lap times: car and condition parameters drawn from distributions.
+
+Parameters are the car's CAR_PHYSICS_FIELDS plus ``weather_grip`` (the
+WEATHER_GRIP factor of the setup's weather) and ``fuel_load``.  Laps are
+solved in stacked envelope batches and only their lap times are folded
+into a LapTimeStats, so memory stays bounded however many laps are run.
+"""
+import dataclasses
+import math
+import statistics
+
+import numpy as np
+
+from .cars import WEATHER_GRIP, CarSetup
+from .physics import CAR_PHYSICS_FIELDS, _stacked_envelope_speeds, stack_cars
+
+MONTE_CARLO_PARAMETERS = CAR_PHYSICS_FIELDS + ("weather_grip", "fuel_load")
+MONTE_CARLO_LAPS = 10_000
+MONTE_CARLO_BATCH = 1000  # laps per stacked solve; bounds memory and sets how often early stopping is checked
+MONTE_CARLO_MIN_LAPS = 500  # laps before a confidence interval may stop the run
+HISTOGRAM_BIN_WIDTH = 0.005  # s, resolution of the streamed percentiles
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Normal:
+    """Normal distribution"""
+    mean: float
+    std: float
+
+    def __post_init__(self):
+        if self.std < 0:
+            raise ValueError(f"std must not be negative, got {self.std}")
+
+    def sample(self, rng, n):
+        return rng.normal(self.mean, self.std, n)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Uniform:
+    """Uniform distribution over [low, high)"""
+    low: float
+    high: float
+
+    def __post_init__(self):
+        if not self.low <= self.high:
+            raise ValueError(f"low must not exceed high, got ({self.low}, {self.high})")
+
+    def sample(self, rng, n):
+        return rng.uniform(self.low, self.high, n)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Triangular:
+    """Triangular distribution from low to high, peaking at mode"""
+    low: float
+    mode: float
+    high: float
+
+    def __post_init__(self):
+        if not self.low <= self.mode <= self.high or self.low == self.high:
+            raise ValueError(f"Expected low <= mode <= high with low < high, got ({self.low}, {self.mode}, {self.high})")
+
+    def sample(self, rng, n):
+        return rng.triangular(self.low, self.mode, self.high, n)
+
+class LapTimeStats:
+    """Streaming lap-time statistics: count, mean and variance, extremes and a histogram.
+
+    Moments are merged batch by batch (Chan's parallel update), so they are
+    exact; percentiles come from a histogram of ``bin_width`` seconds that
+    grows to cover the laps seen, interpolated within bins, so they are
+    exact to a bin width.
+    """
+
+    def __init__(self, bin_width=HISTOGRAM_BIN_WIDTH):
+        if not bin_width > 0:
+            raise ValueError(f"bin_width must be positive, got {bin_width}")
+        self.bin_width = bin_width
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self._first_bin = 0
+        self._counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, lap_times):
+        """Fold a batch of lap times (s) into the statistics"""
+        lap_times = np.asarray(lap_times, dtype=float).ravel()
+        n = len(lap_times)
+        if not n:
+            return
+        batch_mean = float(lap_times.mean())
+        delta = batch_mean - self.mean
+        total = self.count + n
+        self._m2 += float(((lap_times - batch_mean)**2).sum()) + delta**2 * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, float(lap_times.min()))
+        self.max = max(self.max, float(lap_times.max()))
+
+        bins = np.floor(lap_times / self.bin_width).astype(np.int64)
+        low, high = int(bins.min()), int(bins.max())
+        if not len(self._counts):
+            self._first_bin = low
+        first = min(self._first_bin, low)
+        last = max(self._first_bin + len(self._counts) - 1, high)
+        if first != self._first_bin or last - first + 1 != len(self._counts):
+            counts = np.zeros(last - first + 1, dtype=np.int64)
+            counts[self._first_bin - first:self._first_bin - first + len(self._counts)] = self._counts
+            self._counts, self._first_bin = counts, first
+        self._counts += np.bincount(bins - first, minlength=len(self._counts))
+
+    @property
+    def std(self):
+        """Sample standard deviation (s)"""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def ci_half_width(self, confidence=0.95):
+        """Half-width (s) of the normal-approximation confidence interval of the mean lap time"""
+        if self.count < 2:
+            return math.inf
+        return statistics.NormalDist().inv_cdf(0.5 + confidence / 2) * self.std / math.sqrt(self.count)
+
+    def percentile(self, q):
+        """Lap time (s) at percentile ``q`` (0-100, scalar or array), to within a histogram bin"""
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, math.nan)[()]
+        cumulative = np.cumsum(self._counts)
+        rank = q / 100 * self.count
+        index = np.minimum(np.searchsorted(cumulative, rank, side='left'), len(cumulative) - 1)
+        before = np.where(index > 0, cumulative[index - 1], 0)
+        within = (rank - before) / np.maximum(self._counts[index], 1)
+        values = (self._first_bin + index + within) * self.bin_width
+        return np.clip(values, self.min, self.max)[()]
+
+    def histogram(self):
+        """(bin edges, counts) covering every lap seen"""
+        edges = (self._first_bin + np.arange(len(self._counts) + 1)) * self.bin_width
+        return edges.round(9), self._counts.copy()  # round off the float noise of the bin multiples
+
+    def summary(self, percentiles=PERCENTILES, confidence=0.95):
+        """Row of the headline statistics"""
+        return {
+            'Laps': self.count,
+            'Mean': self.mean,
+            'Std': self.std,
+            'Min': self.min,
+            **{f'P{q:g}': float(value) for q, value in zip(percentiles, np.atleast_1d(self.percentile(percentiles)))},
+            'Max': self.max,
+            'Mean CI': self.ci_half_width(confidence),
+        }
+
+def _sampled_stack(car, setup, samples, n):
+    """Stacked rows of ``car`` with the sampled parameters and the setup's fuel and grip"""
+    compound_grip = setup.grip_factor / WEATHER_GRIP[setup.weather]
+    grip = np.broadcast_to(compound_grip * samples.get("weather_grip", WEATHER_GRIP[setup.weather]), (n,))
+    fuel = np.broadcast_to(samples.get("fuel_load", setup.fuel_load), (n,))
+    stacked = stack_cars([car] * n, grip_factors=grip, extra_mass=fuel)
+    for field in CAR_PHYSICS_FIELDS:
+        if field in samples:
+            column = samples[field][:, None]
+            if field == "tire_grip":
+                column = column * grip[:, None]
+            elif field == "mass":
+                column = column + fuel[:, None]
+            setattr(stacked, field, column)
+    return stacked
+
+def monte_carlo(track, car, distributions, laps=MONTE_CARLO_LAPS, setup=None, seed=0, batch_size=MONTE_CARLO_BATCH,
+                ci_half_width=None, confidence=0.95, bin_width=HISTOGRAM_BIN_WIDTH, callback=None):
+    """Lap-time distribution of ``car`` (without setup) on ``track`` under uncertain parameters.
+
+    ``distributions`` maps MONTE_CARLO_PARAMETERS names to distributions
+    (Normal, Uniform, Triangular or anything with sample(rng, n)); the
+    others keep the car's and ``setup``'s values.  Up to ``laps`` laps are
+    drawn from a generator seeded by ``seed`` and solved ``batch_size`` at a
+    time, so a run repeats exactly for the same seed and batch size.  With
+    ``ci_half_width`` (s) the run stops early, after at least
+    MONTE_CARLO_MIN_LAPS laps, once the ``confidence`` interval of the mean
+    is that tight.  ``callback``, if given, receives the LapTimeStats after
+    every batch.  Returns the LapTimeStats.
+    """
+    setup = setup or CarSetup()
+    unknown = [name for name in distributions if name not in MONTE_CARLO_PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown parameters {unknown}, expected some of {list(MONTE_CARLO_PARAMETERS)}")
+    if laps < 1 or batch_size < 1:
+        raise ValueError(f"laps and batch_size must be at least 1, got {laps} and {batch_size}")
+
+    rng = np.random.default_rng(seed)
+    stats = LapTimeStats(bin_width)
+    while stats.count < laps:
+        n = min(batch_size, laps - stats.count)
+        samples = {name: np.asarray(distribution.sample(rng, n), dtype=float)
+                   for name, distribution in distributions.items()}
+        for name, values in samples.items():
+            if values.min() < 0 or (name != "fuel_load" and values.min() == 0):
+                raise ValueError(f"The distribution of {name} gave {values.min():g}; "
+                                 f"{name} must be {'non-negative' if name == 'fuel_load' else 'positive'}")
+        _, _, lap_times = _stacked_envelope_speeds(track.compiled, _sampled_stack(car, setup, samples, n))
+        stats.update(lap_times)
+        if callback is not None:
+            callback(stats)
+        if (ci_half_width is not None and stats.count >= MONTE_CARLO_MIN_LAPS
+                and stats.ci_half_width(confidence) <= ci_half_width):
+            break
+    return stats
@@ -0,0 +1,955 @@
+"""Vehicle physics and the lap solvers"""
+import numpy as np
+import math
+import bisect
+import dataclasses
+import functools
+import types
+
+from .kernel import compiled_timestep_kernel, timestep_lap_arrays
+from .sampling import EveryNSteps
+from .tracks import STRAIGHT
+
+PHYSICS_VERSION = 4  # bump whenever a solver change alters results; part of every cache key
+GRAVITY = 9.81
+AIR_DENSITY = 1.225
+MIN_CORNER_SPEED = 15  # km/h
+DEFAULT_CORNER_SPEED = 30  # km/h, used for segments without a usable radius
+LAP_START_SPEED = 80  # km/h
+NO_CORNER_TARGET_SPEED = 100  # km/h, braking target when no corner follows a straight
+DRS_BOOST = 1.15
+ENVELOPE_STEP = 5.0  # m, distance resolution of the envelope solver
+ENVELOPE_SPEED_POINTS = 256
+TIMESTEP_DT = 0.05  # s, step of the time-stepped solver
+ADAPTIVE_RTOL = 1e-6  # relative (and absolute, in m and m/s) error per step of the adaptive solver
+ADAPTIVE_MAX_STEP = 0.5  # s, also the widest telemetry gap of the adaptive solver
+PERFORMANCE_SPEED_STEP = 0.2  # km/h between the speeds of a PerformanceEnvelope
+PERFORMANCE_RADII = (1.0, 10_000.0, 512)  # m, log-spaced corner radii of a PerformanceEnvelope
+
+def solve_corner_speeds(radius, mass, tire_grip, downforce_coef, frontal_area):
+    """Solve the grip/centripetal balance for the maximum corner speed.
+
+    grip * (m*g + 0.5*rho*Cl*A*v^2) = m*v^2/r has the closed-form solution
+    v^2 = grip*m*g / (m/r - grip*0.5*rho*Cl*A).  All arguments broadcast, so
+    car parameters passed as columns and radii as a row give a cars x corners
+    table in km/h.  When downforce grows faster than the centripetal demand
+    the corner is aero-unbounded and the speed comes back as ``np.inf``.
+    """
+    radius = np.asarray(radius, dtype=float)
+    mass = np.asarray(mass, dtype=float)
+    tire_grip = np.asarray(tire_grip, dtype=float)
+    aero = 0.5 * AIR_DENSITY * np.asarray(downforce_coef, dtype=float) * np.asarray(frontal_area, dtype=float)
+
+    valid_radius = radius > 0
+    safe_radius = np.where(valid_radius, radius, 1.0)
+    margin = mass / safe_radius - tire_grip * aero
+
+    bounded = margin > 0
+    speed_sq = np.where(bounded, tire_grip * mass * GRAVITY / np.where(bounded, margin, 1.0), np.inf)
+    speeds = np.maximum(np.sqrt(speed_sq) * 3.6, MIN_CORNER_SPEED)
+
+    return np.where(valid_radius, speeds, DEFAULT_CORNER_SPEED)
+
+def corner_speed_table(cars, radii):
+    """Maximum corner speeds (km/h) for every car over every radius"""
+    columns = lambda attr: np.array([getattr(car, attr) for car in cars], dtype=float)[:, None]
+    return solve_corner_speeds(
+        np.asarray(radii, dtype=float)[None, :],
+        columns('mass'), columns('tire_grip'),
+        columns('downforce_coef'), columns('frontal_area')
+    )
+
+def calculate_corner_speed(car, radius):
+    """Calculate maximum speed for a corner based on physics"""
+    return float(solve_corner_speeds(radius, car.mass, car.tire_grip, car.downforce_coef, car.frontal_area))
+
+def calculate_acceleration(car, speed_kmh):
+    """Calculate acceleration at current speed"""
+    speed_ms = speed_kmh / 3.6
+    
+    # Engine power limit
+    if speed_ms < 5:
+        speed_ms = 5
+    engine_force = car.power * 1000 / speed_ms
+    
+    # Aerodynamic drag
+    drag_force = 0.5 * AIR_DENSITY * car.drag_coef * car.frontal_area * speed_ms**2
+    
+    # Rolling resistance
+    rolling_force = car.rolling_resistance * car.mass * GRAVITY
+    
+    # Net force
+    net_force = engine_force - drag_force - rolling_force
+    
+    # Traction limit
+    downforce = 0.5 * AIR_DENSITY * car.downforce_coef * car.frontal_area * speed_ms**2
+    traction_limit = car.tire_grip * (car.mass * GRAVITY + downforce)
+    
+    # Apply traction limit
+    net_force = min(net_force, traction_limit)
+    
+    return max(-10, net_force / car.mass)
+
+def braking_terms(car):
+    """Braking deceleration of the car as A + B*v² (m/s², v in m/s).
+
+    A is tire grip on the car's weight; B collects the grip gained from
+    downforce and the aerodynamic drag, both of which scale with v².
+    """
+    base_decel = car.tire_grip * GRAVITY
+    aero_decel = 0.5 * AIR_DENSITY * car.frontal_area * (car.tire_grip * car.downforce_coef + car.drag_coef) / car.mass
+    return base_decel, aero_decel
+
+def calculate_braking_distance(car, start_speed, end_speed):
+    """Calculate braking distance.
+
+    The distance integral v dv / (A + B*v²) has a closed form, so the growth
+    of deceleration with speed is accounted for exactly.
+    """
+    if start_speed <= end_speed:
+        return 0
+    
+    start_ms = start_speed / 3.6
+    end_ms = end_speed / 3.6
+    base_decel, aero_decel = braking_terms(car)
+    
+    if aero_decel <= 0:
+        distance = (start_ms**2 - end_ms**2) / (2 * base_decel)
+    else:
+        distance = math.log((base_decel + aero_decel * start_ms**2) / (base_decel + aero_decel * end_ms**2)) / (2 * aero_decel)
+    
+    return max(0, distance)
+
+def braking_speed(car, end_ms, distance):
+    """Highest speed (m/s) from which the car can brake to ``end_ms`` within ``distance``.
+
+    Inverse of calculate_braking_distance.  Arguments may be arrays, and the
+    car may be a stack of cars from stack_cars().
+    """
+    base_decel, aero_decel = braking_terms(car)
+    aero_decel = np.maximum(aero_decel, 1e-9)  # the limit of no drag/downforce is constant deceleration
+    growth = np.exp(np.minimum(2 * aero_decel * distance, 700.0))
+    return np.sqrt(((base_decel + aero_decel * end_ms**2) * growth - base_decel) / aero_decel)
+
+def top_speed_limit(car):
+    """Maximum speed (km/h) allowed for the car's category"""
+    return 380 if car.category == "Formula 1" else 300
+
+def acceleration_curve(car, speed_ms):
+    """Vectorized calculate_acceleration over an array of speeds in m/s"""
+    speed_ms = np.maximum(np.asarray(speed_ms, dtype=float), 5)
+    engine_force = car.power * 1000 / speed_ms
+    drag_force = 0.5 * AIR_DENSITY * car.drag_coef * car.frontal_area * speed_ms**2
+    rolling_force = car.rolling_resistance * car.mass * GRAVITY
+    downforce = 0.5 * AIR_DENSITY * car.downforce_coef * car.frontal_area * speed_ms**2
+    traction_limit = car.tire_grip * (car.mass * GRAVITY + downforce)
+    net_force = np.minimum(engine_force - drag_force - rolling_force, traction_limit)
+    return np.maximum(-10, net_force / car.mass)
+
+def deceleration_curve(car, speed_ms):
+    """Braking deceleration (m/s², positive) over an array of speeds in m/s"""
+    base_decel, aero_decel = braking_terms(car)
+    return base_decel + aero_decel * np.asarray(speed_ms, dtype=float)**2
+
+def acceleration_table(car, max_speed_ms):
+    """Distance needed to accelerate from standstill to each speed.
+
+    Integrates ds = v dv / a(v) once per set of car parameters so that any
+    straight can be solved by interpolation instead of stepping.  The table
+    stops short of the speed where drag overcomes the engine.
+    """
+    return _acceleration_table(
+        car.mass, car.power, car.drag_coef, car.downforce_coef,
+        car.tire_grip, car.rolling_resistance, car.frontal_area, float(max_speed_ms)
+    )
+
+@functools.lru_cache(maxsize=256)
+def _acceleration_table(mass, power, drag_coef, downforce_coef, tire_grip, rolling_resistance, frontal_area, max_speed_ms):
+    car = types.SimpleNamespace(
+        mass=mass, power=power, drag_coef=drag_coef, downforce_coef=downforce_coef,
+        tire_grip=tire_grip, rolling_resistance=rolling_resistance, frontal_area=frontal_area
+    )
+    speeds = np.linspace(0, max_speed_ms, ENVELOPE_SPEED_POINTS)
+    accel = acceleration_curve(car, speeds)
+    stalled = np.flatnonzero(accel <= 0)
+    if len(stalled):
+        speeds, accel = speeds[:stalled[0]], accel[:stalled[0]]
+
+    per_speed = speeds / accel
+    distances = np.concatenate(([0.0], np.cumsum(0.5 * (per_speed[1:] + per_speed[:-1]) * np.diff(speeds))))
+    speeds.flags.writeable = False
+    distances.flags.writeable = False
+    return speeds, distances
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class PerformanceEnvelope:
+    """Lookup tables of one car's performance, for interpolation in the lap solvers.
+
+    ``speeds`` run from 0 to the car's DRS speed cap in PERFORMANCE_SPEED_STEP
+    increments.  At each speed ``acceleration`` is calculate_acceleration(),
+    ``deceleration`` the braking deceleration and ``stopping_distance`` the
+    braking distance to a standstill, so the braking distance between two
+    speeds is a difference of two entries.  ``corner_speeds`` holds
+    calculate_corner_speed() over the log-spaced ``radii`` (inf where the
+    corner is aero-unbounded).  All arrays are read-only; build one with
+    performance_envelope().
+    """
+    speeds: np.ndarray  # km/h
+    acceleration: np.ndarray  # m/s²
+    deceleration: np.ndarray  # m/s²
+    stopping_distance: np.ndarray  # m
+    radii: np.ndarray  # m
+    corner_speeds: np.ndarray  # km/h
+
+    @property
+    def max_speed(self):
+        return float(self.speeds[-1])
+
+    def acceleration_at(self, speed_kmh):
+        """Interpolated acceleration (m/s²) at the given speeds"""
+        return np.interp(speed_kmh, self.speeds, self.acceleration)
+
+    def braking_distance(self, start_speed, end_speed):
+        """Interpolated braking distance (m) between speeds in km/h, 0 when not slowing down"""
+        start = np.interp(start_speed, self.speeds, self.stopping_distance)
+        end = np.interp(np.minimum(end_speed, self.max_speed), self.speeds, self.stopping_distance)
+        return np.maximum(0.0, start - end)
+
+    def corner_speed(self, radius):
+        """Interpolated maximum corner speeds (km/h); radii that are not positive get DEFAULT_CORNER_SPEED.
+
+        The grip/centripetal balance makes 1/v² linear in 1/r, so
+        interpolating on those axes is exact between table radii, save for
+        the one interval where corners turn aero-unbounded: it comes back
+        finite but far above any speed cap.
+        """
+        radius = np.asarray(radius, dtype=float)
+        valid = radius > 0
+        inverse_sq = np.interp(1 / np.where(valid, radius, 1.0), 1 / self.radii[::-1], self.corner_speeds[::-1]**-2.0)
+        with np.errstate(divide='ignore'):
+            speeds = np.where(inverse_sq > 0, inverse_sq**-0.5, np.inf)
+        return np.where(valid, speeds, DEFAULT_CORNER_SPEED)
+
+def performance_envelope(car):
+    """PerformanceEnvelope of a car, built once per set of physical parameters and category.
+
+    Setups change the mass and grip, so every setup-adjusted car from
+    Car.with_setup() gets its own tables.
+    """
+    return _performance_envelope(*(getattr(car, field) for field in CAR_PHYSICS_FIELDS), car.category)
+
+@functools.lru_cache(maxsize=256)
+def _performance_envelope(mass, power, drag_coef, downforce_coef, tire_grip, rolling_resistance, frontal_area, category):
+    car = types.SimpleNamespace(
+        mass=mass, power=power, drag_coef=drag_coef, downforce_coef=downforce_coef,
+        tire_grip=tire_grip, rolling_resistance=rolling_resistance, frontal_area=frontal_area, category=category
+    )
+    cap = top_speed_limit(car) * (DRS_BOOST if category == "Formula 1" else 1.0)
+    speeds = np.arange(math.ceil(cap / PERFORMANCE_SPEED_STEP) + 1) * PERFORMANCE_SPEED_STEP
+    base_decel, aero_decel = braking_terms(car)
+    if aero_decel > 0:
+        stopping_distance = np.log1p(aero_decel * (speeds / 3.6)**2 / base_decel) / (2 * aero_decel)
+    else:
+        stopping_distance = (speeds / 3.6)**2 / (2 * base_decel)
+    radii = np.geomspace(*PERFORMANCE_RADII)
+    corner_speeds = solve_corner_speeds(radii, mass, tire_grip, downforce_coef, frontal_area)
+
+    tables = {
+        'speeds': speeds,
+        'acceleration': acceleration_curve(car, speeds / 3.6),
+        'deceleration': deceleration_curve(car, speeds / 3.6),
+        'stopping_distance': stopping_distance,
+        'radii': radii,
+        'corner_speeds': corner_speeds,
+    }
+    for table in tables.values():
+        table.flags.writeable = False
+    return PerformanceEnvelope(**tables)
+
+def _interp_scalar(x, xp, fp):
+    """np.interp for one value over Python lists, without the array round-trip"""
+    i = bisect.bisect_right(xp, x)
+    if i == 0:
+        return fp[0]
+    if i == len(xp):
+        return fp[-1]
+    x0, x1 = xp[i - 1], xp[i]
+    return fp[i - 1] + (fp[i] - fp[i - 1]) * (x - x0) / (x1 - x0)
+
+@functools.lru_cache(maxsize=64)
+def _envelope_grid(compiled):
+    """Distance grid shared by every car on a track; a corner is a two-point piece"""
+    is_corner = compiled.is_corner
+    lengths = compiled.lengths
+
+    n_points = np.where(is_corner, 2, np.maximum(2, np.ceil(lengths / ENVELOPE_STEP).astype(int) + 1))
+    piece = np.repeat(np.arange(len(compiled)), n_points)
+    first = np.concatenate(([0], np.cumsum(n_points)[:-1]))
+    local = np.arange(len(piece)) - np.repeat(first, n_points)
+    s = local * (lengths / (n_points - 1))[piece]
+
+    # Half step lengths for trapezoidal time integration, zero at each piece start
+    half_steps = np.zeros(len(s))
+    half_steps[1:] = 0.5 * np.diff(s)
+    half_steps[first] = 0.0
+
+    # Output drops the duplicated entry point of every piece
+    keep = local > 0
+    keep[0] = True
+    segment_codes = piece[keep].astype(np.int32) + 1  # indexes ("Start",) + compiled.names
+    segment_codes[0] = 0
+    names = np.array(("Start",) + compiled.names, dtype=object)[segment_codes]
+
+    return types.SimpleNamespace(
+        corner_flags=is_corner.tolist(),
+        is_corner=is_corner,
+        lengths=lengths,
+        segment_lengths=lengths.tolist(),
+        radii=compiled.radii[is_corner],
+        drs_flags=compiled.drs.tolist(),
+        piece=piece,
+        s=s,
+        remaining=lengths[piece] - s,
+        corner_points=is_corner[piece],
+        half_steps=half_steps,
+        keep=keep,
+        distances=(compiled.start_distance[piece] + s)[keep],
+        segment_codes=segment_codes,
+        names=names,
+        total_distance=float(lengths.sum()),
+    )
+
+def _simulate_lap_envelope(track, car, sampler=None):
+    """Distance-discretized lap: forward acceleration pass, backward braking pass, min envelope"""
+    grid = _envelope_grid(track.compiled)
+    corner_flags = grid.corner_flags
+    n_segments = len(corner_flags)
+    speed_cap = top_speed_limit(car) / 3.6
+    drs_cap = speed_cap * DRS_BOOST if car.category == "Formula 1" else speed_cap
+    caps = [drs_cap if drs else speed_cap for drs in grid.drs_flags]
+    accel_speeds, accel_dist = acceleration_table(car, drs_cap)
+
+    corner_limits = np.full(n_segments, np.inf)
+    corner_limits[grid.is_corner] = solve_corner_speeds(
+        grid.radii, car.mass, car.tire_grip, car.downforce_coef, car.frontal_area
+    ) / 3.6
+
+    # Backward pass: braking target at the end of each segment.  Straights
+    # rarely follow each other, so the braking speeds of all of them are
+    # solved at once and only chained straights are re-solved in the loop.
+    limits = corner_limits.tolist()
+    straight_entry = braking_speed(car, np.append(corner_limits[1:], np.inf), grid.lengths).tolist()
+    exit_target = [0.0] * n_segments
+    next_limit = NO_CORNER_TARGET_SPEED / 3.6
+    for i in range(n_segments - 1, -1, -1):
+        exit_target[i] = next_limit
+        if corner_flags[i]:
+            next_limit = limits[i]
+        elif i + 1 < n_segments and corner_flags[i + 1]:
+            next_limit = straight_entry[i]
+        else:
+            next_limit = float(braking_speed(car, next_limit, grid.segment_lengths[i]))
+
+    # Forward pass over segments: the entry speed of each one
+    speed_table, distance_table = accel_speeds.tolist(), accel_dist.tolist()
+    entry_speed = [0.0] * n_segments
+    entry_offset = [0.0] * n_segments
+    current_speed = LAP_START_SPEED / 3.6
+    for i in range(n_segments):
+        entry_speed[i] = current_speed = min(current_speed, limits[i])
+        if not corner_flags[i]:
+            entry_offset[i] = start = _interp_scalar(current_speed, speed_table, distance_table)
+            reachable = _interp_scalar(start + grid.segment_lengths[i], distance_table, speed_table)
+            current_speed = min(reachable, caps[i], exit_target[i])
+
+    # Min envelope over the whole lap grid at once
+    piece = grid.piece
+    forward = np.interp(np.array(entry_offset)[piece] + grid.s, accel_dist, accel_speeds)
+    backward = braking_speed(car, np.array(exit_target)[piece], grid.remaining)
+    speeds = np.minimum(np.minimum(forward, backward), np.array(caps)[piece])
+    speeds = np.where(grid.corner_points, np.array(entry_speed)[piece], speeds)
+
+    inv_speed = 1.0 / speeds
+    step_times = grid.half_steps.copy()
+    step_times[1:] *= inv_speed[1:] + inv_speed[:-1]
+    times = np.cumsum(step_times)[grid.keep]
+
+    speeds = speeds[grid.keep] * 3.6
+    speeds[0] = LAP_START_SPEED
+    total_time = float(times[-1])
+    top_speed = float(speeds.max())
+    distances, segments = grid.distances.copy(), grid.names.copy()
+
+    sampler = sampler or DEFAULT_SAMPLERS["envelope"]
+    if sampler is not None:
+        steps = zip(distances.tolist(), speeds.tolist(), times.tolist(), grid.segment_codes.tolist())
+        distances, speeds, times, codes = (np.array(column) for column in zip(*sampler.sample(steps)))
+        segments = np.array(("Start",) + track.compiled.names, dtype=object)[codes]
+
+    return {
+        'lap_time': total_time,
+        'total_distance': grid.total_distance,
+        'avg_speed': (grid.total_distance / total_time) * 3.6,
+        'top_speed': top_speed,
+        'distances': distances,
+        'speeds': speeds,
+        'times': times,
+        'segments': segments
+    }
+
+def simulate_lap(track, car, solver="timestep", sampler=None):
+    """Simulate a complete lap with detailed physics.
+
+    ``solver`` picks the integration scheme: "timestep" advances straights in
+    50 ms steps, "adaptive" integrates the same model with error-controlled
+    steps and exact braking points, "envelope" solves straights on a
+    distance grid in one pass.
+    ``sampler`` is a racing_sim.sampling policy choosing the telemetry
+    points; None keeps the solver default from DEFAULT_SAMPLERS.
+    """
+    try:
+        lap_solver = LAP_SOLVERS[solver]
+    except KeyError:
+        raise ValueError(f"Unknown lap solver '{solver}', expected one of {sorted(LAP_SOLVERS)}")
+    return lap_solver(track, car, sampler)
+
+def _timestep_steps(track, car, dt=TIMESTEP_DT):
+    """Time-stepped reference lap as a generator of every solver step.
+
+    Yields (distance m, speed km/h, time s, segment code) tuples, where the
+    code indexes ("Start",) + track.compiled.names; a corner contributes its
+    entry, when the speed drops into it, and its exit.  Returns
+    (lap_time, total_distance, top_speed) when exhausted.  Straights take
+    explicit Euler steps of ``dt`` seconds, with the car's physics
+    interpolated from its performance_envelope().
+    """
+    current_speed = top_speed = LAP_START_SPEED
+    total_time = 0
+    total_distance = 0
+    
+    yield 0, current_speed, 0, 0
+
+    compiled = track.compiled
+    envelope = performance_envelope(car)
+    corner_speeds = envelope.corner_speed(compiled.radii).tolist()
+    next_corner = compiled.next_corner.tolist()
+    drs_flags = compiled.drs.tolist()
+    lengths = compiled.lengths.tolist()
+
+    # Uniform speed grid, so a table lookup is one index computation
+    per_step = 1 / PERFORMANCE_SPEED_STEP
+    last = len(envelope.speeds) - 2
+    acceleration = envelope.acceleration.tolist()
+    deceleration = envelope.deceleration.tolist()
+    stopping = envelope.stopping_distance.tolist()
+    
+    for i, segment_type in enumerate(compiled.type_codes.tolist()):
+        segment_length = lengths[i]
+        segment_code = i + 1
+        
+        if segment_type == STRAIGHT:
+            j = next_corner[i]
+            next_corner_speed = corner_speeds[j] if j >= 0 else NO_CORNER_TARGET_SPEED
+            x = min(next_corner_speed * per_step, last + 1)
+            k = min(int(x), last)
+            target_stopping = stopping[k] + (x - k) * (stopping[k + 1] - stopping[k])
+            
+            # DRS effect
+            drs_boost = DRS_BOOST if drs_flags[i] and car.category == "Formula 1" else 1.0
+            speed_cap = top_speed_limit(car) * drs_boost
+            
+            distance_covered = 0
+            while distance_covered < segment_length:
+                remaining = segment_length - distance_covered
+                x = current_speed * per_step
+                k = min(int(x), last)
+                x -= k
+                braking_dist = stopping[k] + x * (stopping[k + 1] - stopping[k]) - target_stopping
+                
+                if braking_dist >= remaining:
+                    # Brake
+                    decel = (deceleration[k] + x * (deceleration[k + 1] - deceleration[k])) * 3.6  # km/h per second
+                    current_speed = max(next_corner_speed, current_speed - decel * dt)
+                else:
+                    # Accelerate
+                    accel = acceleration[k] + x * (acceleration[k + 1] - acceleration[k])
+                    current_speed = min(speed_cap, current_speed + accel * 3.6 * dt)  # m/s² -> km/h
+                
+                # Distance and time
+                distance_step = current_speed / 3.6 * dt
+                distance_covered += distance_step
+                total_distance += distance_step
+                total_time += dt
+                if current_speed > top_speed:
+                    top_speed = current_speed
+                
+                yield total_distance, current_speed, total_time, segment_code
+        
+        else:
+            # Corner handling
+            if corner_speeds[i] < current_speed:
+                current_speed = corner_speeds[i]
+                yield total_distance, current_speed, total_time, segment_code
+            
+            # Time through corner
+            corner_time = segment_length / (current_speed / 3.6)
+            total_time += corner_time
+            total_distance += segment_length
+            
+            yield total_distance, current_speed, total_time, segment_code
+    
+    return total_time, total_distance, top_speed
+
+def _acceleration_function(car):
+    """calculate_acceleration as a function of speed in m/s, with the car's constants folded in"""
+    power = car.power * 1000
+    drag = 0.5 * AIR_DENSITY * car.drag_coef * car.frontal_area
+    lift = 0.5 * AIR_DENSITY * car.downforce_coef * car.frontal_area
+    rolling = car.rolling_resistance * car.mass * GRAVITY
+    weight = car.mass * GRAVITY
+    mass, grip = car.mass, car.tire_grip
+
+    def acceleration(speed_ms):
+        speed_ms = max(speed_ms, 5.0)
+        speed_sq = speed_ms * speed_ms
+        net_force = min(power / speed_ms - drag * speed_sq - rolling, grip * (weight + lift * speed_sq))
+        return max(-10.0, net_force / mass)
+
+    return acceleration
+
+def _dopri_step(acceleration, speed, accel, h):
+    """One Dormand-Prince 5(4) step of s' = v, v' = a(v) from ``speed`` with a(speed) = ``accel``.
+
+    Returns (distance, new speed, distance error, speed error, a(new speed)).
+    The tableau is unrolled; the stage nodes drop out because a(v) does not
+    depend on time.  The last stage is the derivative at the new state, so
+    an accepted step hands it on as the first stage of the next one.
+    """
+    k1 = accel
+    v2 = speed + h * (k1 / 5)
+    k2 = acceleration(v2)
+    v3 = speed + h * (3 / 40 * k1 + 9 / 40 * k2)
+    k3 = acceleration(v3)
+    v4 = speed + h * (44 / 45 * k1 - 56 / 15 * k2 + 32 / 9 * k3)
+    k4 = acceleration(v4)
+    v5 = speed + h * (19372 / 6561 * k1 - 25360 / 2187 * k2 + 64448 / 6561 * k3 - 212 / 729 * k4)
+    k5 = acceleration(v5)
+    v6 = speed + h * (9017 / 3168 * k1 - 355 / 33 * k2 + 46732 / 5247 * k3 + 49 / 176 * k4 - 5103 / 18656 * k5)
+    k6 = acceleration(v6)
+    new_speed = speed + h * (35 / 384 * k1 + 500 / 1113 * k3 + 125 / 192 * k4 - 2187 / 6784 * k5 + 11 / 84 * k6)
+    k7 = acceleration(new_speed)
+    distance = h * (35 / 384 * speed + 500 / 1113 * v3 + 125 / 192 * v4 - 2187 / 6784 * v5 + 11 / 84 * v6)
+    distance_error = h * (71 / 57600 * speed - 71 / 16695 * v3 + 71 / 1920 * v4 - 17253 / 339200 * v5
+                          + 22 / 525 * v6 - 1 / 40 * new_speed)
+    speed_error = h * (71 / 57600 * k1 - 71 / 16695 * k3 + 71 / 1920 * k4 - 17253 / 339200 * k5
+                       + 22 / 525 * k6 - 1 / 40 * k7)
+    return distance, new_speed, distance_error, speed_error, k7
+
+def _step_to_event(acceleration, speed, accel, h, event):
+    """Shortest step from ``speed`` at which ``event(distance, speed)`` changes sign.
+
+    ``event`` is negative at the start and not negative after a step of
+    ``h``; the crossing is bracketed by regula falsi (Illinois variant) on
+    the step length.  Returns (h, distance, new speed, a(new speed)).
+    """
+    low, high = 0.0, h
+    f_low = event(0.0, speed)
+    step = _dopri_step(acceleration, speed, accel, h)
+    f_high = event(step[0], step[1])
+    side = 0
+    for _ in range(60):
+        if f_high == 0 or high - low < 1e-12:
+            break
+        trial = high - f_high * (high - low) / (f_high - f_low) if f_high != f_low else 0.5 * (low + high)
+        if not low < trial < high:
+            trial = 0.5 * (low + high)
+        trial_step = _dopri_step(acceleration, speed, accel, trial)
+        f_trial = event(trial_step[0], trial_step[1])
+        if abs(f_trial) < 1e-10:
+            high, step = trial, trial_step
+            break
+        if f_trial < 0:
+            low, f_low = trial, f_trial
+            if side == -1:
+                f_high *= 0.5
+            side = -1
+        else:
+            high, f_high, step = trial, f_trial, trial_step
+            if side == 1:
+                f_low *= 0.5
+            side = 1
+    return high, step[0], step[1], step[4]
+
+def _braking_time(base_decel, aero_decel, start_ms, end_ms):
+    """Time to brake from start_ms to end_ms at deceleration A + B*v²"""
+    if aero_decel <= 0:
+        return (start_ms - end_ms) / base_decel
+    scale = math.sqrt(aero_decel / base_decel)
+    return (math.atan(start_ms * scale) - math.atan(end_ms * scale)) / math.sqrt(base_decel * aero_decel)
+
+def _braked_speed(base_decel, aero_decel, start_ms, distance):
+    """Speed after braking over ``distance`` from start_ms (0 if the car would stop)"""
+    if aero_decel <= 0:
+        return math.sqrt(max(0.0, start_ms**2 - 2 * base_decel * distance))
+    speed_sq = ((base_decel + aero_decel * start_ms**2) * math.exp(-2 * aero_decel * distance) - base_decel) / aero_decel
+    return math.sqrt(max(0.0, speed_sq))
+
+def _braking_points(base_decel, aero_decel, start_ms, end_ms, duration):
+    """(distance, speed) at even instants of a braking phase, at most ADAPTIVE_MAX_STEP apart"""
+    n_points = max(1, math.ceil(duration / ADAPTIVE_MAX_STEP))
+    for k in range(1, n_points):
+        t = duration * k / n_points
+        if aero_decel <= 0:
+            speed = start_ms - base_decel * t
+            distance = (start_ms**2 - speed**2) / (2 * base_decel)
+        else:
+            scale = math.sqrt(aero_decel / base_decel)
+            speed = math.tan(math.atan(start_ms * scale) - math.sqrt(base_decel * aero_decel) * t) / scale
+            distance = math.log((base_decel + aero_decel * start_ms**2) / (base_decel + aero_decel * speed**2)) / (2 * aero_decel)
+        yield t, distance, speed
+    yield duration, None, end_ms
+
+def _adaptive_steps(track, car, rtol=ADAPTIVE_RTOL):
+    """Lap of the time-stepped model integrated to ``rtol`` instead of in fixed steps.
+
+    Same physics and step tuples as _timestep_steps().  On a straight the
+    car accelerates under Dormand-Prince 5(4) with error-controlled steps
+    until an event: the braking point for the next corner, the speed cap or
+    the end of the straight, each located to within 1e-10 of a metre or m/s.
+    Braking (deceleration A + B*v²) and running at the speed cap have
+    closed-form solutions and take no steps.
+    """
+    current_speed = top_speed = LAP_START_SPEED
+    total_time = 0
+    total_distance = 0
+
+    yield 0, current_speed, 0, 0
+
+    compiled = track.compiled
+    corner_speeds = solve_corner_speeds(
+        compiled.radii, car.mass, car.tire_grip, car.downforce_coef, car.frontal_area
+    ).tolist()
+    next_corner = compiled.next_corner.tolist()
+    drs_flags = compiled.drs.tolist()
+    lengths = compiled.lengths.tolist()
+    acceleration = _acceleration_function(car)
+    base_decel, aero_decel = braking_terms(car)
+    h = TIMESTEP_DT
+
+    for i, segment_type in enumerate(compiled.type_codes.tolist()):
+        segment_length = lengths[i]
+        segment_code = i + 1
+
+        if segment_type == STRAIGHT:
+            j = next_corner[i]
+            target = (corner_speeds[j] if j >= 0 else NO_CORNER_TARGET_SPEED) / 3.6
+            drs_boost = DRS_BOOST if drs_flags[i] and car.category == "Formula 1" else 1.0
+            cap = top_speed_limit(car) * drs_boost / 3.6
+            speed = min(current_speed / 3.6, cap)
+            covered = 0.0
+
+            def braking_margin(distance, speed):
+                return calculate_braking_distance(car, speed * 3.6, target * 3.6) - (segment_length - covered - distance)
+
+            while segment_length - covered > 1e-9:
+                remaining = segment_length - covered
+                if braking_margin(0.0, speed) >= -1e-9:
+                    # Brake for the next corner, to a stop at its speed or to the end of the straight
+                    end_speed = max(target, _braked_speed(base_decel, aero_decel, speed, remaining))
+                    duration = _braking_time(base_decel, aero_decel, speed, end_speed)
+                    start_time, start_distance = total_time, total_distance
+                    for t, distance, point_speed in _braking_points(base_decel, aero_decel, speed, end_speed, duration):
+                        if distance is None:
+                            distance = min(remaining, calculate_braking_distance(car, speed * 3.6, end_speed * 3.6))
+                        total_time, total_distance = start_time + t, start_distance + distance
+                        yield total_distance, point_speed * 3.6, total_time, segment_code
+                    covered += total_distance - start_distance
+                    speed = end_speed
+                    if end_speed > target:
+                        covered = segment_length
+                elif speed >= cap - 1e-9:
+                    # Hold the speed cap up to the braking point, or to the end of the straight
+                    run = max(0.0, remaining - calculate_braking_distance(car, cap * 3.6, target * 3.6))
+                    run = run if run > 1e-9 else remaining
+                    speed = cap
+                    covered += run
+                    total_distance += run
+                    total_time += run / cap
+                    yield total_distance, cap * 3.6, total_time, segment_code
+                else:
+                    accel = acceleration(speed)
+                    while True:
+                        h = min(h, ADAPTIVE_MAX_STEP)
+                        distance, new_speed, distance_error, speed_error, new_accel = _dopri_step(acceleration, speed, accel, h)
+                        error = max(
+                            abs(distance_error) / (rtol + rtol * (covered + distance)),
+                            abs(speed_error) / (rtol + rtol * max(speed, new_speed)),
+                        )
+                        factor = min(5.0, max(0.2, 0.9 * error**-0.2)) if error > 0 else 5.0
+                        if error <= 1.0:
+                            break
+                        h *= factor
+                    events = [
+                        braking_margin,
+                        lambda distance, speed: speed - cap,
+                        lambda distance, speed: covered + distance - segment_length,
+                    ]
+                    crossed = [event for event in events if event(distance, new_speed) >= 0]
+                    if crossed:
+                        step_time, distance, new_speed = h, distance, new_speed
+                        for event in crossed:
+                            found = _step_to_event(acceleration, speed, accel, step_time, event)
+                            if found[0] <= step_time:
+                                step_time, distance, new_speed, _ = found
+                        new_speed = min(new_speed, cap)
+                        distance = min(distance, remaining)
+                    else:
+                        step_time = h
+                        h *= factor
+                    speed = new_speed
+                    covered += distance
+                    total_distance += distance
+                    total_time += step_time
+                    yield total_distance, speed * 3.6, total_time, segment_code
+                top_speed = max(top_speed, speed * 3.6)
+            current_speed = speed * 3.6
+
+        else:
+            # Corner handling
+            if corner_speeds[i] < current_speed:
+                current_speed = corner_speeds[i]
+                yield total_distance, current_speed, total_time, segment_code
+
+            # Time through corner
+            corner_time = segment_length / (current_speed / 3.6)
+            total_time += corner_time
+            total_distance += segment_length
+
+            yield total_distance, current_speed, total_time, segment_code
+
+    return total_time, total_distance, top_speed
+
+def _solver_samples(steps, sampler):
+    """Steps of a stepping solver passed through ``sampler`` (None keeps all); returns the solver's totals"""
+    totals = []
+
+    def recorded():
+        totals.append((yield from steps))
+
+    yield from sampler.sample(recorded()) if sampler else recorded()
+    return totals[0]
+
+def _timestep_samples(track, car, sampler=None):
+    """Recorded samples of the time-stepped lap; returns (lap_time, total_distance, top_speed)"""
+    return (yield from _solver_samples(_timestep_steps(track, car), sampler or DEFAULT_SAMPLERS["timestep"]))
+
+def _timestep_kernel_arguments(track, car, dt=TIMESTEP_DT):
+    """Array encoding of a track and a car for racing_sim.kernel, up to the output arrays"""
+    compiled = track.compiled
+    envelope = performance_envelope(car)
+    speed_cap = top_speed_limit(car)
+    speed_caps = np.where(compiled.drs & (car.category == "Formula 1"), speed_cap * DRS_BOOST, speed_cap * 1.0)
+    return (
+        compiled.type_codes, compiled.lengths, compiled.next_corner, speed_caps,
+        envelope.corner_speed(compiled.radii), envelope.acceleration, envelope.deceleration,
+        envelope.stopping_distance, 1 / PERFORMANCE_SPEED_STEP,
+        float(dt), float(LAP_START_SPEED), float(NO_CORNER_TARGET_SPEED),
+    )
+
+def _kernel_samples(track, car, kernel, sampler=None):
+    """_timestep_samples() with the steps computed by ``kernel`` in one call"""
+    *columns, totals = timestep_lap_arrays(kernel, _timestep_kernel_arguments(track, car))
+    yield from (sampler or DEFAULT_SAMPLERS["timestep"]).sample(zip(*(column.tolist() for column in columns)))
+    return totals
+
+def _adaptive_samples(track, car, sampler=None):
+    """Recorded samples of the adaptive-step lap; returns (lap_time, total_distance, top_speed)"""
+    return (yield from _solver_samples(_adaptive_steps(track, car), sampler or DEFAULT_SAMPLERS["adaptive"]))
+
+def _drain(generator, consume):
+    """Pass every item of ``generator`` to ``consume``; returns the generator's return value"""
+    while True:
+        try:
+            consume(next(generator))
+        except StopIteration as stop:
+            return stop.value
+
+def _simulate_lap_timestep(track, car, sampler=None):
+    """Time-stepped reference lap simulation, run by the compiled kernel when numba is available"""
+    kernel = compiled_timestep_kernel()
+    if kernel is not None:
+        return _stepped_lap(track, _kernel_samples(track, car, kernel, sampler))
+    return _stepped_lap(track, _timestep_samples(track, car, sampler))
+
+def _simulate_lap_adaptive(track, car, sampler=None):
+    """Lap of the time-stepped model with error-controlled steps and exact braking points"""
+    return _stepped_lap(track, _adaptive_samples(track, car, sampler))
+
+def _stepped_lap(track, samples_generator):
+    """simulate_lap() result of a stepping solver's samples"""
+    samples = []
+    total_time, total_distance, top_speed = _drain(samples_generator, samples.append)
+    distances, speeds, times, codes = (list(column) for column in zip(*samples))
+    labels = ("Start",) + track.compiled.names
+    
+    return {
+        'lap_time': total_time,
+        'total_distance': total_distance,
+        'avg_speed': (total_distance / total_time) * 3.6,
+        'top_speed': top_speed,
+        'distances': distances,
+        'speeds': speeds,
+        'times': times,
+        'segments': [labels[code] for code in codes]
+    }
+
+# Telemetry recorded when simulate_lap gets no sampler; None keeps every solver point
+DEFAULT_SAMPLERS = {
+    "timestep": EveryNSteps(10),
+    "envelope": None,
+    "adaptive": None,
+}
+
+LAP_SOLVERS = {
+    "timestep": _simulate_lap_timestep,
+    "envelope": _simulate_lap_envelope,
+    "adaptive": _simulate_lap_adaptive,
+}
+
+CAR_PHYSICS_FIELDS = ('mass', 'power', 'drag_coef', 'downforce_coef', 'tire_grip', 'rolling_resistance', 'frontal_area')
+
+def stack_cars(cars, grip_factors=1.0, extra_mass=0.0):
+    """Stack car parameters into (n_cars, 1) NumPy columns.
+
+    The result quacks like a Car for the physics functions, which then
+    broadcast over all cars at once.  ``grip_factors`` and ``extra_mass``
+    are applied per row, so setups can be folded in without touching the
+    Car objects.
+    """
+    cars = list(cars)
+    stacked = types.SimpleNamespace(
+        names=[car.name for car in cars],
+        categories=[car.category for car in cars],
+    )
+    for field in CAR_PHYSICS_FIELDS:
+        setattr(stacked, field, np.array([getattr(car, field) for car in cars], dtype=float)[:, None])
+    stacked.tire_grip = stacked.tire_grip * np.reshape(np.asarray(grip_factors, dtype=float), (-1, 1))
+    stacked.mass = stacked.mass + np.reshape(np.asarray(extra_mass, dtype=float), (-1, 1))
+
+    is_f1 = np.array([car.category == "Formula 1" for car in cars])[:, None]
+    stacked.speed_cap = np.array([top_speed_limit(car) for car in cars], dtype=float)[:, None] / 3.6
+    stacked.drs_cap = np.where(is_f1, stacked.speed_cap * DRS_BOOST, stacked.speed_cap)
+    return stacked
+
+def _interp_rows(x, xp, fp):
+    """Row-wise np.interp: row i of ``x`` is interpolated on (xp[i], fp[i]).
+
+    Rows are laid end to end on one increasing axis so that a single
+    searchsorted call serves every row.
+    """
+    n_rows, n_cols = xp.shape
+    x = np.broadcast_to(np.asarray(x, dtype=float), (n_rows,) + np.shape(x)[1:])
+    x = x.reshape(n_rows, -1)
+    low, high = xp[:, :1], xp[:, -1:]
+    span = float((high - low).max()) + 1.0
+    offsets = np.arange(n_rows)[:, None] * span
+
+    flat_xp = (xp - low + offsets).ravel()
+    query = np.clip(x, low, high) - low + offsets
+    idx = np.searchsorted(flat_xp, query.ravel(), side='right') - 1
+    row_start = np.repeat(np.arange(n_rows) * n_cols, x.shape[1])
+    idx = np.clip(idx, row_start, row_start + n_cols - 2)
+
+    flat_fp = fp.ravel()
+    x0, x1 = flat_xp[idx], flat_xp[idx + 1]
+    weight = np.where(x1 > x0, (query.ravel() - x0) / np.where(x1 > x0, x1 - x0, 1.0), 0.0)
+    return (flat_fp[idx] + weight * (flat_fp[idx + 1] - flat_fp[idx])).reshape(x.shape)
+
+def _stacked_acceleration_tables(stacked):
+    """Acceleration distance tables for stacked cars on one shared speed grid.
+
+    Beyond the speed where drag overcomes the engine the acceleration is
+    floored, so the distance to reach it grows without bound instead of the
+    table being cut short per car.
+    """
+    speeds = np.linspace(0, float(stacked.drs_cap.max()), ENVELOPE_SPEED_POINTS)
+    accel = np.maximum(acceleration_curve(stacked, speeds[None, :]), 1e-3)
+    per_speed = speeds / accel
+    steps = 0.5 * (per_speed[:, 1:] + per_speed[:, :-1]) * np.diff(speeds)
+    distances = np.concatenate((np.zeros((len(accel), 1)), np.cumsum(steps, axis=1)), axis=1)
+    return np.broadcast_to(speeds, distances.shape), distances
+
+def _simulate_stacked_envelope(track, stacked):
+    """Envelope solver advancing every stacked car around the track together.
+
+    Returns lap time (s), top speed and average speed (km/h) per row.
+    """
+    grid, speeds, lap_times = _stacked_envelope_speeds(track.compiled, stacked)
+    kept_speeds = speeds[:, grid.keep]
+    kept_speeds[:, 0] = LAP_START_SPEED / 3.6
+    return lap_times, kept_speeds.max(axis=1) * 3.6, grid.total_distance / lap_times * 3.6
+
+def _stacked_envelope_speeds(compiled, stacked):
+    """(envelope grid, speeds in m/s at every grid point per row, lap time per row) of stacked cars"""
+    grid = _envelope_grid(compiled)
+    n_segments = len(grid.corner_flags)
+    n_cars = len(stacked.names)
+    speed_tables, distance_tables = _stacked_acceleration_tables(stacked)
+    caps = np.where(np.array(grid.drs_flags)[None, :], stacked.drs_cap, stacked.speed_cap)
+
+    limits = np.full((n_cars, n_segments), np.inf)
+    limits[:, grid.is_corner] = solve_corner_speeds(
+        grid.radii[None, :], stacked.mass, stacked.tire_grip, stacked.downforce_coef, stacked.frontal_area
+    ) / 3.6
+
+    # Backward pass
+    exit_target = np.empty((n_cars, n_segments))
+    next_limit = np.full(n_cars, NO_CORNER_TARGET_SPEED / 3.6)
+    for i in range(n_segments - 1, -1, -1):
+        exit_target[:, i] = next_limit
+        if grid.corner_flags[i]:
+            next_limit = limits[:, i]
+        else:
+            next_limit = braking_speed(stacked, next_limit[:, None], grid.segment_lengths[i])[:, 0]
+
+    # Forward pass over segments
+    entry_speed = np.empty((n_cars, n_segments))
+    entry_offset = np.zeros((n_cars, n_segments))
+    current_speed = np.full(n_cars, LAP_START_SPEED / 3.6)
+    for i in range(n_segments):
+        current_speed = np.minimum(current_speed, limits[:, i])
+        entry_speed[:, i] = current_speed
+        if not grid.corner_flags[i]:
+            start = _interp_rows(current_speed[:, None], speed_tables, distance_tables)[:, 0]
+            entry_offset[:, i] = start
+            reachable = _interp_rows((start + grid.segment_lengths[i])[:, None], distance_tables, speed_tables)[:, 0]
+            current_speed = np.minimum(np.minimum(reachable, caps[:, i]), exit_target[:, i])
+
+    # Min envelope over the lap grid for every car
+    piece = grid.piece
+    forward = _interp_rows(entry_offset[:, piece] + grid.s, distance_tables, speed_tables)
+    backward = braking_speed(stacked, exit_target[:, piece], grid.remaining)
+    speeds = np.minimum(np.minimum(forward, backward), caps[:, piece])
+    speeds = np.where(grid.corner_points, entry_speed[:, piece], speeds)
+
+    inv_speed = 1.0 / speeds
+    step_times = np.broadcast_to(grid.half_steps, speeds.shape).copy()
+    step_times[:, 1:] *= inv_speed[:, 1:] + inv_speed[:, :-1]
+    return grid, speeds, step_times.sum(axis=1)
+
+def _stacked_engine_work(grid, stacked, speeds):
+    """Work (J) the engine delivers over a lap per stacked row, from _stacked_envelope_speeds().
+
+    Every grid step that does not lose speed is driven: the engine supplies
+    the kinetic energy gained plus drag and rolling losses (drag at the
+    step's mean v²).  Braking steps and the speed drops at corner entry
+    cost nothing.
+    """
+    step_lengths = 2 * grid.half_steps[1:]  # zero across piece boundaries
+    v_sq = speeds**2
+    gained = 0.5 * stacked.mass * np.diff(v_sq, axis=1)
+    mean_v_sq = 0.5 * (v_sq[:, 1:] + v_sq[:, :-1])
+    losses = (0.5 * AIR_DENSITY * stacked.drag_coef * stacked.frontal_area * mean_v_sq
+              + stacked.rolling_resistance * stacked.mass * GRAVITY) * step_lengths
+    driven = (gained >= 0) & (step_lengths > 0)
+    return np.where(driven, gained + losses, 0.0).sum(axis=1)
@@ -0,0 +1,169 @@
+"""Telemetry sampling policies.
+
+A policy turns the stream of solver steps, (distance m, speed km/h, time s,
+segment code) tuples, into the samples that are recorded.  Policies are
+frozen dataclasses, so they are hashable, picklable and part of cache keys.
+The first and the last step of a lap are always recorded.
+
+lttb() thins finished series for display rather than for recording.
+"""
+import dataclasses
+import math
+
+import numpy as np
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class EveryNSteps:
+    """Record every n-th solver step, and the first and last step of every segment.
+
+    The segment boundaries keep each corner's entry and exit however short
+    the corner is next to the stride.
+    """
+    n: int = 10
+
+    def __post_init__(self):
+        if self.n < 1:
+            raise ValueError(f"n must be at least 1, got {self.n}")
+
+    def sample(self, steps):
+        previous = None
+        kept = False  # whether previous was recorded
+        for i, step in enumerate(steps):
+            boundary = previous is not None and step[3] != previous[3]
+            if boundary and not kept:
+                yield previous
+            kept = boundary or i % self.n == 0
+            if kept:
+                yield step
+            previous = step
+        if previous is not None and not kept:
+            yield previous
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FixedDistance:
+    """Resample at every ``spacing`` metres, interpolating linearly between steps"""
+    spacing: float = 10.0  # m
+
+    def __post_init__(self):
+        if not self.spacing > 0:
+            raise ValueError(f"spacing must be positive, got {self.spacing}")
+
+    def sample(self, steps):
+        return _resample(steps, 0, self.spacing)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FixedTime:
+    """Resample at every ``spacing`` seconds, interpolating linearly between steps"""
+    spacing: float = 0.1  # s
+
+    def __post_init__(self):
+        if not self.spacing > 0:
+            raise ValueError(f"spacing must be positive, got {self.spacing}")
+
+    def sample(self, steps):
+        return _resample(steps, 2, self.spacing)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Decimate:
+    """Drop steps that linear interpolation over distance reproduces within ``tolerance``.
+
+    Swinging-door compression: a step is only recorded when the straight
+    line from the last recorded sample can no longer pass within
+    ``tolerance`` km/h of every skipped speed, so the error bound holds
+    without buffering steps.
+    """
+    tolerance: float = 0.5  # km/h
+
+    def __post_init__(self):
+        if self.tolerance < 0:
+            raise ValueError(f"tolerance must not be negative, got {self.tolerance}")
+
+    def sample(self, steps):
+        anchor = previous = None
+        low, high = -math.inf, math.inf  # slopes from the anchor that keep skipped steps in tolerance
+        for step in steps:
+            if anchor is None:
+                yield step
+                anchor = previous = step
+                continue
+            run = step[0] - anchor[0]
+            if run > 0:
+                slope = (step[1] - anchor[1]) / run
+                if not low <= slope <= high:
+                    yield previous
+                    anchor = previous
+                    run = step[0] - anchor[0]
+                    low, high = -math.inf, math.inf
+            if run <= 0:
+                # Speed jump at one distance (corner entry): keep both sides
+                if previous is not anchor:
+                    yield previous
+                yield step
+                anchor = previous = step
+                low, high = -math.inf, math.inf
+                continue
+            low = max(low, (step[1] - self.tolerance - anchor[1]) / run)
+            high = min(high, (step[1] + self.tolerance - anchor[1]) / run)
+            previous = step
+        if previous is not anchor:
+            yield previous
+
+def _resample(steps, axis, spacing):
+    """Samples at multiples of ``spacing`` along step field ``axis`` (0 distance, 2 time)"""
+    previous = None
+    for step in steps:
+        if previous is None:
+            yield step
+            last = step[axis]
+            mark = math.floor(last / spacing) + 1
+        else:
+            start, end = previous[axis], step[axis]
+            while end > start and mark * spacing <= end:
+                weight = (mark * spacing - start) / (end - start)
+                yield tuple(a + weight * (b - a) for a, b in zip(previous[:3], step[:3])) + (step[3],)
+                last = mark * spacing
+                mark += 1
+        previous = step
+    if previous is not None and previous[axis] > last:
+        yield previous
+
+def lttb(x, y, n_out):
+    """Indices of at most ``n_out`` points of (x, y) chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; every bucket in between keeps the
+    point forming the largest triangle with the point kept from the
+    previous bucket and the mean of the next one, which preserves peaks
+    and braking drops that plain striding would cut.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError(f"n_out must be at least 3, got {n_out}")
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # buckets of the interior points
+    starts, ends = edges[:-1], edges[1:]
+    sizes = ends - starts
+    # Mean point of the following bucket (the last point after the final bucket)
+    x_sums, y_sums = np.add.reduceat(x[1:n - 1], starts - 1), np.add.reduceat(y[1:n - 1], starts - 1)
+    next_x = np.append(x_sums[1:] / sizes[1:], x[-1])
+    next_y = np.append(y_sums[1:] / sizes[1:], y[-1])
+
+    # Twice the triangle area is |ax * p + ay * q + r| for the kept point a
+    # of the previous bucket, so only that term is left to the loop
+    bucket = np.repeat(np.arange(len(sizes)), sizes)
+    candidates_x, candidates_y = x[1:n - 1], y[1:n - 1]
+    p = candidates_y - next_y[bucket]
+    q = next_x[bucket] - candidates_x
+    r = candidates_x * next_y[bucket] - next_x[bucket] * candidates_y
+
+    indices = np.empty(n_out, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+    ax, ay = x[0], y[0]
+    for k, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        lo, hi = start - 1, end - 1
+        best = lo + int(np.abs(ax * p[lo:hi] + ay * q[lo:hi] + r[lo:hi]).argmax())
+        indices[k + 1] = best + 1
+        ax, ay = candidates_x[best], candidates_y[best]
+    return indices
@@ -0,0 +1,86 @@
+"""Lap-time sensitivities: d(lap time)/d(parameter) for every physics field of a car"""
+import numpy as np
+import dataclasses
+
+from .batch import _named_items
+from .cars import CarSetup
+from .physics import CAR_PHYSICS_FIELDS, _stacked_envelope_speeds, stack_cars
+
+SENSITIVITY_STEP = 1e-4  # relative perturbation of each parameter for the central differences
+SENSITIVITY_UNITS = {
+    "mass": "s/kg",
+    "power": "s/kW",
+    "drag_coef": "s/unit",
+    "downforce_coef": "s/unit",
+    "tire_grip": "s/unit",
+    "rolling_resistance": "s/unit",
+    "frontal_area": "s/m²",
+}
+
+def _perturbed_cars(car, step):
+    """The car, then every CAR_PHYSICS_FIELDS value raised and lowered by ``step``; and the absolute steps"""
+    cars = [car]
+    steps = []
+    for field in CAR_PHYSICS_FIELDS:
+        value = getattr(car, field)
+        delta = step * abs(value) if value else step
+        cars += [dataclasses.replace(car, **{field: value + delta}), dataclasses.replace(car, **{field: value - delta})]
+        steps.append(delta)
+    return cars, np.array(steps)
+
+def _sensitivities(track, cars, setup, step):
+    """(lap times, derivatives n_cars x fields) of ``cars`` on ``track``, all perturbations in one stacked solve"""
+    stacked_cars, steps = [], []
+    for car in cars:
+        perturbed, car_steps = _perturbed_cars(car, step)
+        stacked_cars += perturbed
+        steps.append(car_steps)
+    stacked = stack_cars(stacked_cars, grip_factors=setup.grip_factor, extra_mass=setup.fuel_load)
+    _, _, lap_times = _stacked_envelope_speeds(track.compiled, stacked)
+
+    rows = lap_times.reshape(len(cars), 1 + 2 * len(CAR_PHYSICS_FIELDS))
+    return rows[:, 0], (rows[:, 1::2] - rows[:, 2::2]) / (2 * np.array(steps))
+
+def lap_time_sensitivity(track, car, setup=None, step=SENSITIVITY_STEP):
+    """d(lap time)/d(parameter) of ``car`` (without setup) on ``track``, in SENSITIVITY_UNITS.
+
+    Central differences of the envelope solver with every parameter moved
+    by ``step`` of its value, all 2 x 7 perturbed cars solved as one
+    stacked batch.  ``setup`` applies as in Car.with_setup(); derivatives
+    are with respect to the car's own values, before the setup.
+    """
+    _, derivatives = _sensitivities(track, [car], setup or CarSetup(), step)
+    return dict(zip(CAR_PHYSICS_FIELDS, derivatives[0].tolist()))
+
+def sensitivity_matrix(tracks, cars, setup=None, per_percent=False, step=SENSITIVITY_STEP):
+    """Lap-time sensitivities of every car on every track as a tidy DataFrame.
+
+    ``tracks`` and ``cars`` may be name-keyed dicts or iterables, as for
+    simulate_batch(); all cars and perturbations on a track are solved in
+    one stacked pass.  One row per (track, car) with its lap time and a
+    column per CAR_PHYSICS_FIELDS entry: seconds per unit, or with
+    ``per_percent`` seconds per 1% of the car's value, which compares
+    parameters of different units.
+    """
+    import pandas as pd
+
+    setup = setup or CarSetup()
+    car_items = _named_items(cars)
+    values = np.array([[getattr(car, field) for field in CAR_PHYSICS_FIELDS] for _, car in car_items])
+
+    frames = []
+    for track_name, track in _named_items(tracks):
+        lap_times, derivatives = _sensitivities(track, [car for _, car in car_items], setup, step)
+        if per_percent:
+            derivatives = derivatives * values / 100
+        frames.append(pd.DataFrame({
+            'Track': track_name,
+            'Car': [car_name for car_name, _ in car_items],
+            'Lap Time': lap_times,
+            **dict(zip(CAR_PHYSICS_FIELDS, derivatives.T)),
+        }))
+
+    columns = ['Track', 'Car', 'Lap Time', *CAR_PHYSICS_FIELDS]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
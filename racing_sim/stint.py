@@ -0,0 +1,176 @@
+"""Multi-lap stints: fuel burn and tire wear carried from lap to lap"""
+import numpy as np
+import dataclasses
+import functools
+
+from .cars import Car, CarSetup
+from .physics import CAR_PHYSICS_FIELDS, _stacked_engine_work, _stacked_envelope_speeds, stack_cars
+
+FUEL_ENERGY_DENSITY = 43e6  # J/kg
+ENGINE_EFFICIENCY = 0.5  # share of the fuel's energy delivered as engine work
+TIRE_WEAR = {"Soft": 0.004, "Medium": 0.0025, "Hard": 0.0015}  # share of grip lost per lap of tire age
+TIRE_CLIFF = {"Soft": 18, "Medium": 30, "Hard": 42}  # tire age (laps) from which wear is CLIFF_WEAR_FACTOR times faster
+CLIFF_WEAR_FACTOR = 3.0
+MIN_TIRE_GRIP = 0.5  # worn tires keep at least this share of their grip
+LAP_MODEL_FUEL = (0.0, 160.0, 9)  # kg, fuel loads a LapModel is solved at; the top grows in steps of the same size
+LAP_MODEL_GRIP = (0.3, 1.1, 33)  # grip factors (compound, weather and wear combined), spaced evenly in 1/sqrt(grip)
+EXACT_STINT_PASSES = 2  # stacked solves refining the fuel trajectory of simulate_stint(exact=True)
+
+def tire_grip_factor(compound, age):
+    """Grip of ``compound`` tires ``age`` laps old relative to new ones; 1 for no compound choice"""
+    age = np.asarray(age, dtype=float)
+    if compound is None:
+        return np.ones_like(age)
+    worn = age + (CLIFF_WEAR_FACTOR - 1) * np.maximum(age - TIRE_CLIFF[compound], 0)
+    return np.maximum(1 - TIRE_WEAR[compound] * worn, MIN_TIRE_GRIP)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class LapModel:
+    """Lap time and fuel use of one car on one track as functions of fuel load and grip.
+
+    Both are solved by the envelope solver at every point of a fuel x grip
+    grid in one stacked batch, then interpolated bilinearly, so a stint lap
+    costs a table lookup instead of a simulation.  ``grip`` is the factor
+    applied to the car's tire grip (compound, weather and wear combined);
+    its nodes are evenly spaced in 1/sqrt(grip), along which corner times
+    and so lap times are close to linear.
+    """
+    fuel: np.ndarray  # kg
+    grip: np.ndarray  # decreasing
+    lap_time: np.ndarray  # s, fuel x grip
+    fuel_used: np.ndarray  # kg per lap, fuel x grip
+
+    def __call__(self, fuel, grip):
+        """(lap time s, fuel used kg) at fuel loads and grip factors; arguments broadcast"""
+        fuel, grip = np.broadcast_arrays(np.asarray(fuel, dtype=float), np.asarray(grip, dtype=float))
+        if fuel.size and (fuel.min() < self.fuel[0] or fuel.max() > self.fuel[-1]):
+            raise ValueError(f"Fuel load outside the modelled {self.fuel[0]:g}-{self.fuel[-1]:g} kg")
+        if grip.size and (grip.min() < self.grip[-1] or grip.max() > self.grip[0]):
+            raise ValueError(f"Grip factor outside the modelled {self.grip[-1]:g}-{self.grip[0]:g}")
+        i, x = _cell(self.fuel, fuel)
+        j, y = _cell(self.grip**-0.5, grip**-0.5)
+
+        def bilinear(table):
+            low = table[i, j] + y * (table[i, j + 1] - table[i, j])
+            high = table[i + 1, j] + y * (table[i + 1, j + 1] - table[i + 1, j])
+            return low + x * (high - low)
+
+        return bilinear(self.lap_time), bilinear(self.fuel_used)
+
+def _cell(axis, values):
+    """Index of the uniform-axis cell holding each value and the position within it"""
+    step = (axis[-1] - axis[0]) / (len(axis) - 1)
+    position = (values - axis[0]) / step
+    index = np.minimum(position.astype(int), len(axis) - 2)
+    return index, position - index
+
+def lap_model(track, car, max_fuel=None):
+    """LapModel of ``car`` (without setup) on ``track``, solved once per car, track and fuel range.
+
+    The fuel axis spans LAP_MODEL_FUEL, extended in steps of its node
+    spacing to cover ``max_fuel`` (kg) when that is heavier.
+    """
+    low, high, points = LAP_MODEL_FUEL
+    step = (high - low) / (points - 1)
+    if max_fuel is not None and max_fuel > high:
+        points += int(np.ceil((max_fuel - high) / step))
+        high = low + step * (points - 1)
+    return _lap_model(track.compiled, *(getattr(car, field) for field in CAR_PHYSICS_FIELDS), car.category,
+                      (low, high, points))
+
+@functools.lru_cache(maxsize=128)
+def _lap_model(compiled, mass, power, drag_coef, downforce_coef, tire_grip, rolling_resistance, frontal_area, category,
+               fuel_axis):
+    car = Car("", mass, power, drag_coef, downforce_coef, tire_grip, rolling_resistance, frontal_area, "", category)
+    fuel = np.linspace(*fuel_axis)
+    low, high, points = LAP_MODEL_GRIP
+    grip = np.linspace(high**-0.5, low**-0.5, points)**-2
+    fuel_grid, grip_grid = np.meshgrid(fuel, grip, indexing='ij')
+    stacked = stack_cars([car] * fuel_grid.size, grip_factors=grip_grid.ravel(), extra_mass=fuel_grid.ravel())
+    grid, speeds, lap_times = _stacked_envelope_speeds(compiled, stacked)
+    fuel_used = _stacked_engine_work(grid, stacked, speeds) / (ENGINE_EFFICIENCY * FUEL_ENERGY_DENSITY)
+
+    arrays = (fuel, grip, lap_times.reshape(fuel_grid.shape), fuel_used.reshape(fuel_grid.shape))
+    for array in arrays:
+        array.flags.writeable = False
+    return LapModel(*arrays)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Stint:
+    """Lap-by-lap table of a stint; fuel and tire age are at the start of each lap"""
+    lap: np.ndarray
+    tire_age: np.ndarray  # laps
+    fuel: np.ndarray  # kg
+    grip_factor: np.ndarray
+    lap_time: np.ndarray  # s
+    fuel_used: np.ndarray  # kg
+    elapsed: np.ndarray  # s, race time at the end of each lap
+
+    def __len__(self):
+        return len(self.lap)
+
+    @property
+    def total_time(self):
+        return float(self.elapsed[-1]) if len(self) else 0.0
+
+    @property
+    def fuel_remaining(self):
+        """Fuel left after the last lap (kg); negative when the stint ran short"""
+        return float(self.fuel[-1] - self.fuel_used[-1]) if len(self) else 0.0
+
+    def to_pandas(self):
+        import pandas as pd
+        return pd.DataFrame({
+            'Lap': self.lap,
+            'Tire Age': self.tire_age,
+            'Fuel (kg)': self.fuel,
+            'Grip': self.grip_factor,
+            'Lap Time': self.lap_time,
+            'Fuel Used (kg)': self.fuel_used,
+            'Race Time': self.elapsed,
+        })
+
+def simulate_stint(track, car, laps, setup=None, tire_age=0, first_lap=1, start_time=0.0, exact=False):
+    """Run ``laps`` consecutive laps of ``car`` (without setup), burning fuel and wearing tires.
+
+    ``setup`` gives the fuel at the start, the tire compound and the
+    weather.  Each lap's time and fuel use come from the car's LapModel at
+    the fuel on board and the worn tires' grip, so laps are table lookups;
+    a car that runs dry keeps the time of an empty tank.  With ``exact``
+    every lap is then re-solved by the envelope solver, all laps in one
+    stacked batch per pass, so the table matches simulate_lap(..., "envelope")
+    rather than the default time-stepped solver.
+    ``tire_age``, ``first_lap`` and ``start_time`` continue a race after a
+    pit stop.
+    """
+    setup = setup or CarSetup()
+    if laps < 0:
+        raise ValueError(f"laps must not be negative, got {laps}")
+    model = lap_model(track, car, setup.fuel_load)
+    age = tire_age + np.arange(laps)
+    grip = setup.grip_factor * tire_grip_factor(setup.tire_compound, age)
+
+    fuel = np.empty(laps)
+    lap_times = np.empty(laps)
+    fuel_used = np.empty(laps)
+    on_board = float(setup.fuel_load)
+    for lap in range(laps):
+        fuel[lap] = on_board
+        lap_times[lap], fuel_used[lap] = model(max(on_board, 0.0), grip[lap])
+        on_board -= fuel_used[lap]
+
+    for _ in range(EXACT_STINT_PASSES if exact and laps else 0):
+        stacked = stack_cars([car] * laps, grip_factors=grip, extra_mass=np.maximum(fuel, 0.0))
+        grid, speeds, lap_times = _stacked_envelope_speeds(track.compiled, stacked)
+        fuel_used = _stacked_engine_work(grid, stacked, speeds) / (ENGINE_EFFICIENCY * FUEL_ENERGY_DENSITY)
+        fuel = setup.fuel_load - np.concatenate(([0.0], np.cumsum(fuel_used)[:-1]))
+
+    return Stint(
+        lap=first_lap + np.arange(laps),
+        tire_age=age,
+        fuel=fuel,
+        grip_factor=grip,
+        lap_time=lap_times,
+        fuel_used=fuel_used,
+        elapsed=start_time + np.cumsum(lap_times),
+    )
@@ -0,0 +1,188 @@
+"""Persistent SQLite store of lap results for querying historical runs"""
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from .cache import track_hash
+from .cars import CarSetup
+from .physics import CAR_PHYSICS_FIELDS, PHYSICS_VERSION
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS laps (
+    key TEXT NOT NULL UNIQUE,
+    recorded_at REAL NOT NULL,
+    track TEXT NOT NULL,
+    track_hash TEXT NOT NULL,
+    car TEXT NOT NULL,
+    category TEXT NOT NULL,
+    {''.join(f'{field} REAL NOT NULL, ' for field in CAR_PHYSICS_FIELDS)}
+    weather TEXT NOT NULL,
+    tire_compound TEXT,
+    fuel_load REAL NOT NULL,
+    solver TEXT NOT NULL,
+    lap_time REAL NOT NULL,
+    top_speed REAL NOT NULL,
+    avg_speed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS laps_by_car ON laps (track, weather, car, lap_time);
+CREATE INDEX IF NOT EXISTS laps_by_time ON laps (track, weather, lap_time);
+"""
+
+COLUMNS = ('key', 'recorded_at', 'track', 'track_hash', 'car', 'category') + CAR_PHYSICS_FIELDS + (
+    'weather', 'tire_compound', 'fuel_load', 'solver', 'lap_time', 'top_speed', 'avg_speed')
+
+INSERT = f"INSERT OR IGNORE INTO laps ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+# Optional equality filters of the queries; None means any value
+FILTERS = ('tire_compound', 'fuel_load', 'solver', 'track_hash')
+
+def _lap_key(car, digest, setup, solver):
+    """Content hash of a lap like simulation_key(), but from a precomputed track hash, without a sampler
+    and with the car's name, which is a stored column"""
+    payload = {
+        'version': PHYSICS_VERSION,
+        'car': {field: getattr(car, field) for field in CAR_PHYSICS_FIELDS + ('category', 'name')},
+        'track': digest,
+        'setup': dataclasses.asdict(setup),
+        'solver': solver,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=float)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def _filters(filters):
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown lap filters {sorted(unknown)}, expected {list(FILTERS)}")
+    filters = {name: value for name, value in filters.items() if value is not None}
+    return "".join(f" AND {name} = :{name}" for name in filters), filters
+
+class LapStore:
+    """Lap summaries in an SQLite database, indexed by track, conditions, car and lap time.
+
+    Rows hold the base car's physical parameters, the track name and content
+    hash, the setup (weather, tire compound, fuel load), the solver and the
+    lap summary.  Each distinct simulation of a named car is stored once,
+    so recording a rerun of the same setup is a no-op until PHYSICS_VERSION
+    changes.  ``path`` ":memory:" keeps the store
+    for the lifetime of the object only.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.track_hashes = {}
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM laps").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def _track_hash(self, track):
+        key = id(track)
+        if key not in self.track_hashes or self.track_hashes[key][0] is not track:
+            self.track_hashes[key] = (track, track_hash(track))
+        return self.track_hashes[key][1]
+
+    def _row(self, track, car, setup, solver, lap_time, top_speed, avg_speed, recorded_at):
+        digest = self._track_hash(track)
+        return (_lap_key(car, digest, setup, solver), recorded_at, track.name, digest, car.name, car.category,
+                *(getattr(car, field) for field in CAR_PHYSICS_FIELDS),
+                setup.weather, setup.tire_compound, float(setup.fuel_load), solver,
+                float(lap_time), float(top_speed), float(avg_speed))
+
+    def _insert(self, rows):
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(INSERT, rows)
+            return self.connection.total_changes - before
+
+    def record(self, track, car, result, setup=None, solver="timestep"):
+        """Store a simulate_lap() result of ``car`` (before ``setup`` is applied); True if it was new"""
+        row = self._row(track, car, setup or CarSetup(), solver,
+                        result['lap_time'], result['top_speed'], result['avg_speed'], time.time())
+        return self._insert([row]) == 1
+
+    def record_rows(self, rows, tracks, cars, solver="envelope"):
+        """Store run_sweep() or simulate_batch() rows in one transaction; returns the number of new laps.
+
+        ``tracks`` and ``cars`` are the name-keyed dicts the rows were
+        simulated from.  Rows without fuel load or tire compound (as from
+        simulate_batch()) are stored with no fuel and no compound choice.
+        """
+        now = time.time()
+        return self._insert(
+            self._row(tracks[row['Track']], cars[row['Car']],
+                      CarSetup(row.get('Fuel Load', 0), row.get('Tire Compound'), row['Weather']),
+                      solver, row['Lap Time'], row['Top Speed'], row['Avg Speed'], now)
+            for row in rows
+        )
+
+    def _query(self, sql, params):
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def runs(self, track, weather="Dry", car=None, limit=None, **filters):
+        """Laps on ``track`` in ``weather``, fastest first; optionally of one car and other FILTERS"""
+        where, params = _filters(filters)
+        if car is not None:
+            where += " AND car = :car"
+            params['car'] = car
+        sql = f"SELECT * FROM laps WHERE track = :track AND weather = :weather{where} ORDER BY lap_time"
+        if limit is not None:
+            sql += " LIMIT :limit"
+        return self._query(sql, dict(params, track=track, weather=weather, limit=limit))
+
+    def best_laps(self, track, weather="Dry", **filters):
+        """Fastest lap of every car on ``track`` in ``weather``, fastest first.
+
+        Cars are enumerated with a loose index scan (one index seek per car
+        rather than a scan of every lap), and each car's best lap is the
+        first matching entry of its lap time ordered index range.
+        """
+        where, params = _filters(filters)
+        sql = f"""
+            WITH RECURSIVE cars(car) AS (
+                SELECT MIN(car) FROM laps WHERE track = :track AND weather = :weather
+                UNION ALL
+                SELECT (SELECT MIN(car) FROM laps WHERE track = :track AND weather = :weather AND car > cars.car)
+                FROM cars WHERE cars.car IS NOT NULL
+            )
+            SELECT laps.* FROM cars JOIN laps ON laps.rowid = (
+                SELECT rowid FROM laps INDEXED BY laps_by_car
+                WHERE track = :track AND weather = :weather AND car = cars.car{where}
+                ORDER BY lap_time LIMIT 1
+            )
+            ORDER BY laps.lap_time
+        """
+        return self._query(sql, dict(params, track=track, weather=weather))
+
+    def pole(self, track, weather="Dry", **filters):
+        """Fastest stored lap on ``track`` in ``weather``, or None"""
+        laps = self.runs(track, weather, limit=1, **filters)
+        return laps[0] if laps else None
+
+    def within_of_pole(self, track, margin, weather="Dry", **filters):
+        """Every lap within ``margin`` seconds of pole on ``track`` in ``weather``, fastest first"""
+        where, params = _filters(filters)
+        sql = f"""
+            SELECT * FROM laps INDEXED BY laps_by_time
+            WHERE track = :track AND weather = :weather{where} AND lap_time <= (
+                SELECT lap_time FROM laps INDEXED BY laps_by_time
+                WHERE track = :track AND weather = :weather{where}
+                ORDER BY lap_time LIMIT 1
+            ) + :margin
+            ORDER BY lap_time
+        """
+        return self._query(sql, dict(params, track=track, weather=weather, margin=margin))
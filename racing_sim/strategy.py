@@ -0,0 +1,250 @@
+"""Pit strategy search: stop laps and compound orders for the fastest race"""
+import numpy as np
+import dataclasses
+import heapq
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .cars import TIRE_COMPOUND_GRIP, WEATHER_GRIP, CarSetup
+from .stint import Stint, lap_model, simulate_stint, tire_grip_factor
+
+# Time lost to a stop (pit lane at limited speed plus the stationary time), s
+PIT_LOSS = {
+    "Monza": 24.0,
+    "Silverstone": 20.5,
+    "Monaco": 19.5,
+    "Spa-Francorchamps": 18.5,
+    "Suzuka": 22.5,
+    "Nurburgring": 21.0,
+}
+DEFAULT_PIT_LOSS = 22.0  # s, tracks without an entry in PIT_LOSS
+FUEL_RESERVE = 1.0  # kg left at the flag by race_fuel()
+STRATEGY_TOP = 10  # strategies returned by optimize_strategy
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Strategy:
+    """Compound of every stint and the laps at whose end the car pits"""
+    compounds: tuple
+    pit_laps: tuple
+    race_time: float  # s, as estimated by the search
+
+    @property
+    def stops(self):
+        return len(self.pit_laps)
+
+    def describe(self):
+        """E.g. "Medium -> 23 -> Hard\""""
+        return " -> ".join(itertools.chain.from_iterable(
+            (compound, str(lap)) for compound, lap in zip(self.compounds, self.pit_laps)
+        )) + (" -> " if self.pit_laps else "") + self.compounds[-1]
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class StrategySearch:
+    """Fastest strategies first, with the number of search nodes expanded out of the strategies possible"""
+    strategies: tuple
+    nodes: int
+    search_space: int
+
+    @property
+    def best(self):
+        return self.strategies[0] if self.strategies else None
+
+def race_fuel(track, car, laps, weather="Dry"):
+    """Fuel (kg) to start ``laps`` laps with and finish with FUEL_RESERVE, on Medium tires"""
+    fuel = 0.0
+    for _ in range(3):  # Burn grows with the fuel carried; converges to well under a gram
+        stint = simulate_stint(track, car, laps, CarSetup(fuel, "Medium", weather))
+        fuel += FUEL_RESERVE - stint.fuel_remaining
+    return fuel
+
+def stint_times(track, car, laps, weather="Dry", fuel_load=None, compounds=tuple(TIRE_COMPOUND_GRIP)):
+    """Memo of stint times: [compound, start lap, length] is the time (s) of a stint on new tires.
+
+    Start laps count from 0 and lengths run to the end of the race.  All
+    stints share one fuel trajectory, that of a Medium tire race from
+    ``fuel_load`` (default race_fuel()), so a stint's time depends on its
+    compound, start lap and length only; the grip's small effect on fuel
+    burn is left out.  Every entry comes from the car's LapModel in one
+    vectorized lookup.
+    """
+    fuel_load = race_fuel(track, car, laps, weather) if fuel_load is None else fuel_load
+    fuel = np.maximum(simulate_stint(track, car, laps, CarSetup(fuel_load, "Medium", weather)).fuel, 0.0)
+
+    start, age = np.meshgrid(np.arange(laps), np.arange(laps), indexing='ij')
+    lap = np.minimum(start + age, laps - 1)  # Laps past the flag are never read
+    grip = np.array([TIRE_COMPOUND_GRIP[compound] * WEATHER_GRIP[weather] * tire_grip_factor(compound, np.arange(laps))
+                     for compound in compounds])
+    lap_times, _ = lap_model(track, car, fuel_load)(fuel[lap][None, :, :], grip[:, None, :])
+    table = np.zeros((len(compounds), laps, laps + 1))
+    np.cumsum(lap_times, axis=2, out=table[:, :, 1:])
+    return table
+
+def _lower_bounds(table):
+    """Least time from each lap to the flag: every lap on the fastest new tires, no stops"""
+    fresh = table[:, :, 1].min(axis=0)
+    return np.append(np.cumsum(fresh[::-1])[::-1], 0.0)
+
+def _search_space(laps, max_stops, n_compounds, two_compounds):
+    """Number of distinct strategies with up to ``max_stops`` stops"""
+    return sum(
+        math.comb(laps - 1, stops) * (n_compounds ** (stops + 1) - (n_compounds if two_compounds else 0))
+        for stops in range(0 if not two_compounds else 1, max_stops + 1)
+    )
+
+def _seed_bound(table, pit_loss, top, two_compounds):
+    """Race time of the top-th fastest strategy with at most one stop, enumerated directly"""
+    n_compounds, laps = table.shape[:2]
+    length = np.arange(1, laps)
+    times = [] if two_compounds else list(table[:, 0, laps])
+    for first, second in itertools.product(range(n_compounds), repeat=2):
+        if first != second or not two_compounds:
+            times.extend((table[first, 0, length] + pit_loss + table[second, length, laps - length]).tolist())
+    return sorted(times)[top - 1] if len(times) >= top else math.inf
+
+def _search(table, lower, pit_loss, max_stops, two_compounds, top, bound, first_stints):
+    """Depth-first branch and bound over strategies opening with the (compound, length) ``first_stints``.
+
+    Returns (top strategies as (race time, compounds, pit laps) sorted by
+    time, nodes expanded).  A branch is cut as soon as its time so far plus
+    the lower bound to the flag exceeds the top-th best race found, or
+    ``bound`` before that.
+    """
+    n_compounds, laps = table.shape[:2]
+    found = []  # Heap of (-race time, compounds, pit laps), the slowest kept strategy on top
+    threshold = bound
+    nodes = 0
+
+    def record(race_time, compounds, pit_laps):
+        nonlocal threshold
+        heapq.heappush(found, (-race_time, compounds, pit_laps))
+        if len(found) > top:
+            heapq.heappop(found)
+        if len(found) == top:
+            threshold = min(threshold, -found[0][0])
+
+    def extend(start, time, compounds, pit_laps):
+        nonlocal nodes
+        nodes += 1
+        remaining = laps - start
+        for compound in range(n_compounds):
+            used = compounds + (compound,)
+            stint = table[compound, start]
+            if not two_compounds or len(set(used)) > 1:
+                race_time = time + stint[remaining]
+                if race_time <= threshold:
+                    record(race_time, used, pit_laps)
+            if len(pit_laps) == max_stops or remaining < 2:
+                continue
+            # Pit after 1 .. remaining - 1 laps, most promising first
+            bounds = time + stint[1:remaining] + pit_loss + lower[start + 1:laps]
+            for index in np.argsort(bounds, kind='stable').tolist():
+                if bounds[index] > threshold:
+                    break
+                stop = start + index + 1
+                extend(stop, time + stint[index + 1] + pit_loss, used, pit_laps + (stop,))
+
+    for compound, length in first_stints:
+        used = (compound,)
+        if length == laps:
+            if not two_compounds:
+                record(table[compound, 0, laps], used, ())
+            continue
+        time = table[compound, 0, length] + pit_loss
+        if max_stops and time + lower[length] <= threshold:
+            extend(length, time, used, (length,))
+
+    return sorted((-negative, compounds, pit_laps) for negative, compounds, pit_laps in found), nodes
+
+# Search tables installed once per strategy worker process
+_STRATEGY_TABLES = {}
+
+def _init_strategy_worker(table, lower):
+    _STRATEGY_TABLES['table'] = table
+    _STRATEGY_TABLES['lower'] = lower
+
+def _search_chunk(pit_loss, max_stops, two_compounds, top, bound, first_stints):
+    return _search(_STRATEGY_TABLES['table'], _STRATEGY_TABLES['lower'], pit_loss, max_stops,
+                   two_compounds, top, bound, first_stints)
+
+def optimize_strategy(track, car, laps, weather="Dry", fuel_load=None, pit_loss=None, max_stops=3,
+                      compounds=tuple(TIRE_COMPOUND_GRIP), top=STRATEGY_TOP, max_workers=None):
+    """Fastest pit strategies of ``car`` (without setup) over a ``laps`` lap race on ``track``.
+
+    Searches every order of ``compounds`` and every set of stop laps with
+    1 to ``max_stops`` stops; in the dry at least two compounds must be
+    used, in the wet a no-stop race is allowed too.  ``pit_loss`` defaults
+    to the track's PIT_LOSS entry.  Stint times come from the stint_times()
+    memo, and branches are pruned by a lower bound (every remaining lap on
+    the fastest new tires) against the top-th fastest race found, seeded by
+    enumerating one-stop races.  The first stints are split over a process
+    pool of ``max_workers`` (default: CPU count; 1 searches in-process).
+    """
+    if laps < 2:
+        raise ValueError(f"A race with pit stops needs at least 2 laps, got {laps}")
+    if not 1 <= max_stops <= laps - 1:
+        raise ValueError(f"max_stops must be between 1 and {laps - 1}, got {max_stops}")
+    unknown = [compound for compound in compounds if compound not in TIRE_COMPOUND_GRIP]
+    if unknown:
+        raise ValueError(f"Unknown tire compounds {unknown}, expected some of {list(TIRE_COMPOUND_GRIP)}")
+    two_compounds = weather == "Dry"
+    if two_compounds and len(set(compounds)) < 2:
+        raise ValueError("A dry race must use two different compounds; give at least two")
+    if pit_loss is None:
+        pit_loss = PIT_LOSS.get(track.name, DEFAULT_PIT_LOSS)
+
+    table = stint_times(track, car, laps, weather, fuel_load, compounds)
+    lower = _lower_bounds(table)
+    bound = _seed_bound(table, pit_loss, top, two_compounds)
+    first_stints = [(compound, length) for compound in range(len(compounds)) for length in range(1, laps + 1)]
+
+    max_workers = max_workers or os.cpu_count() or 1
+    arguments = (pit_loss, max_stops, two_compounds, top, bound)
+    if max_workers == 1:
+        results = [_search(table, lower, *arguments, first_stints)]
+    else:
+        # Short first stints leave the most to search, so interleave them across chunks
+        chunks = [first_stints[start::max_workers * 4] for start in range(max_workers * 4)]
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_strategy_worker,
+                                 initargs=(table, lower)) as executor:
+            results = list(executor.map(_search_chunk, *zip(*((*arguments, chunk) for chunk in chunks if chunk))))
+
+    found = sorted(itertools.chain.from_iterable(strategies for strategies, _ in results))[:top]
+    return StrategySearch(
+        strategies=tuple(
+            Strategy(tuple(compounds[index] for index in stints), pit_laps, float(race_time))
+            for race_time, stints, pit_laps in found
+        ),
+        nodes=sum(nodes for _, nodes in results),
+        search_space=_search_space(laps, max_stops, len(compounds), two_compounds),
+    )
+
+def simulate_strategy(track, car, strategy, laps, weather="Dry", fuel_load=None, pit_loss=None):
+    """Lap-by-lap Stint of a whole race run to ``strategy``, fuel carried across stops.
+
+    Unlike the search, every stint burns fuel at its own grip; the pit loss
+    is added to the lap on which the car pits.
+    """
+    fuel_load = race_fuel(track, car, laps, weather) if fuel_load is None else fuel_load
+    if pit_loss is None:
+        pit_loss = PIT_LOSS.get(track.name, DEFAULT_PIT_LOSS)
+    stints = []
+    fuel = fuel_load
+    bounds = (0,) + strategy.pit_laps + (laps,)
+    for compound, start, end in zip(strategy.compounds, bounds, bounds[1:]):
+        stint = simulate_stint(track, car, end - start, CarSetup(max(fuel, 0.0), compound, weather), first_lap=start + 1)
+        fuel = stint.fuel_remaining
+        stints.append(stint)
+
+    lap_times = np.concatenate([stint.lap_time for stint in stints])
+    lap_times[np.asarray(strategy.pit_laps, dtype=int) - 1] += pit_loss
+    return Stint(
+        lap=np.concatenate([stint.lap for stint in stints]),
+        tire_age=np.concatenate([stint.tire_age for stint in stints]),
+        fuel=np.concatenate([stint.fuel for stint in stints]),
+        grip_factor=np.concatenate([stint.grip_factor for stint in stints]),
+        lap_time=lap_times,
+        fuel_used=np.concatenate([stint.fuel_used for stint in stints]),
+        elapsed=np.cumsum(lap_times),
+    )
@@ -0,0 +1,332 @@
+"""Lap telemetry: streaming in fixed-size NumPy chunks and columnar storage"""
+import numpy as np
+import dataclasses
+import csv
+import io
+import itertools
+import os
+
+from .channels import CHANNEL_NAMES, DerivedChannels, lap_channels
+from .physics import LAP_SOLVERS, _adaptive_samples, _timestep_samples, simulate_lap
+
+TELEMETRY_CHUNK_SIZE = 4096  # samples per chunk
+
+TELEMETRY_FORMATS = {".parquet": "parquet", ".arrows": "arrow", ".arrow": "arrow", ".csv": "csv"}
+
+# Column titles of the derived channels in DataFrames
+CHANNEL_LABELS = {
+    'longitudinal_g': 'Longitudinal (g)',
+    'lateral_g': 'Lateral (g)',
+    'combined_g': 'Combined (g)',
+    'throttle': 'Throttle',
+    'brake': 'Brake',
+    'power_limited': 'Power Limited',
+    'traction_limited': 'Traction Limited',
+}
+
+# Solvers that can emit samples while they integrate; the others are solved
+# for the whole lap first and then handed out in chunks
+SAMPLE_SOURCES = {
+    "timestep": _timestep_samples,
+    "adaptive": _adaptive_samples,
+}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class TelemetryChunk:
+    """Consecutive telemetry samples of a lap"""
+    distance: np.ndarray  # m
+    speed: np.ndarray  # km/h
+    time: np.ndarray  # s
+    segment: np.ndarray  # int32 codes into TelemetryStream.segment_names
+
+    def __len__(self):
+        return len(self.distance)
+
+class TelemetryStream:
+    """Lap telemetry as an iterable of TelemetryChunk with at most chunk_size samples.
+
+    Iterating runs the simulation and buffers one chunk at a time, so memory
+    does not grow with the number of samples.  Segment names are dictionary
+    encoded: chunk.segment holds codes into ``segment_names`` ("Start"
+    first, then the track segments in order).  Once iteration finishes,
+    ``summary`` holds lap_time, total_distance, avg_speed and top_speed as
+    simulate_lap() reports them.  ``sampler`` picks the recorded points as
+    in simulate_lap().
+    """
+    def __init__(self, track, car, solver="timestep", chunk_size=TELEMETRY_CHUNK_SIZE, sampler=None):
+        if solver not in LAP_SOLVERS:
+            raise ValueError(f"Unknown lap solver '{solver}', expected one of {sorted(LAP_SOLVERS)}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        self.track = track
+        self.car = car
+        self.solver = solver
+        self.chunk_size = chunk_size
+        self.sampler = sampler
+        self.segment_names = ("Start",) + track.compiled.names
+        self.summary = None
+
+    def __iter__(self):
+        if self.solver in SAMPLE_SOURCES:
+            return self._sampled_chunks(SAMPLE_SOURCES[self.solver](self.track, self.car, self.sampler))
+        return self._solved_chunks()
+
+    def _sampled_chunks(self, samples):
+        buffer = []
+        while True:
+            try:
+                buffer.append(next(samples))
+            except StopIteration as stop:
+                lap_time, total_distance, top_speed = stop.value
+                break
+            if len(buffer) == self.chunk_size:
+                yield self._chunk(*zip(*buffer))
+                buffer = []
+        if buffer:
+            yield self._chunk(*zip(*buffer))
+        self.summary = {
+            'lap_time': lap_time,
+            'total_distance': total_distance,
+            'avg_speed': (total_distance / lap_time) * 3.6,
+            'top_speed': top_speed,
+        }
+
+    def _solved_chunks(self):
+        """Whole-lap solvers: memory is bounded by one lap rather than one chunk"""
+        result = simulate_lap(self.track, self.car, self.solver, self.sampler)
+        codes = {name: code for code, name in reversed(list(enumerate(self.segment_names)))}
+        segments = [codes[name] for name in result['segments']]
+        for start in range(0, len(result['distances']), self.chunk_size):
+            stop = start + self.chunk_size
+            yield self._chunk(result['distances'][start:stop], result['speeds'][start:stop],
+                              result['times'][start:stop], segments[start:stop])
+        self.summary = {key: result[key] for key in ('lap_time', 'total_distance', 'avg_speed', 'top_speed')}
+
+    def _chunk(self, distance, speed, time, segment):
+        return TelemetryChunk(
+            distance=np.asarray(distance, dtype=float),
+            speed=np.asarray(speed, dtype=float),
+            time=np.asarray(time, dtype=float),
+            segment=np.asarray(segment, dtype=np.int32),
+        )
+
+def stream_lap(track, car, solver="timestep", chunk_size=TELEMETRY_CHUNK_SIZE, sampler=None):
+    """Telemetry of one lap as a TelemetryStream of fixed-size chunks"""
+    return TelemetryStream(track, car, solver, chunk_size, sampler)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class TelemetryTable:
+    """Columnar lap telemetry.
+
+    Distance (m), speed (km/h) and time (s) are float32 arrays; segment
+    names are dictionary encoded as int32 codes into the unique, sorted
+    ``segment_names``.  ``channels`` optionally holds the lap's
+    DerivedChannels, which every export then includes as extra columns.
+    """
+    distance: np.ndarray
+    speed: np.ndarray
+    time: np.ndarray
+    segment: np.ndarray
+    segment_names: tuple
+    channels: DerivedChannels | None = None
+
+    def __len__(self):
+        return len(self.distance)
+
+    @classmethod
+    def from_chunks(cls, chunks, segment_names):
+        """Table of TelemetryChunk values, converted to float32 chunk by chunk"""
+        columns = {'distance': [], 'speed': [], 'time': [], 'segment': []}
+        for chunk in chunks:
+            for name, values in columns.items():
+                values.append(getattr(chunk, name).astype(np.int32 if name == 'segment' else np.float32))
+        # Deduplicate the dictionary: segment names need not be unique on a track
+        names, remap = np.unique(np.array(segment_names, dtype=object), return_inverse=True)
+        return cls(
+            distance=np.concatenate(columns['distance'] or [np.empty(0, np.float32)]),
+            speed=np.concatenate(columns['speed'] or [np.empty(0, np.float32)]),
+            time=np.concatenate(columns['time'] or [np.empty(0, np.float32)]),
+            segment=remap.astype(np.int32)[np.concatenate(columns['segment'] or [np.empty(0, np.int32)])],
+            segment_names=tuple(names.tolist()),
+        )
+
+    @classmethod
+    def from_stream(cls, stream):
+        """Table of a TelemetryStream, without materializing float64 telemetry"""
+        return cls.from_chunks(stream, stream.segment_names)
+
+    @classmethod
+    def from_result(cls, result, channels=None):
+        """Table of a simulate_lap() result dict, with its DerivedChannels if given"""
+        names, codes = np.unique(np.array(result['segments'], dtype=object), return_inverse=True)
+        return cls(
+            distance=np.asarray(result['distances'], dtype=np.float32),
+            speed=np.asarray(result['speeds'], dtype=np.float32),
+            time=np.asarray(result['times'], dtype=np.float32),
+            segment=codes.astype(np.int32),
+            segment_names=tuple(names.tolist()),
+            channels=channels,
+        )
+
+    @classmethod
+    def from_arrow(cls, table):
+        """Table of one lap read back by read_telemetry(); zero-copy for single-chunk numeric columns"""
+        segment = _single_chunk(table.column('segment').unify_dictionaries())
+        return cls(
+            distance=_single_chunk(table.column('distance')).to_numpy(),
+            speed=_single_chunk(table.column('speed')).to_numpy(),
+            time=_single_chunk(table.column('time')).to_numpy(),
+            segment=segment.indices.to_numpy().astype(np.int32, copy=False),
+            segment_names=tuple(segment.dictionary.to_pylist()),
+            channels=DerivedChannels(**{
+                name: _single_chunk(table.column(name)).to_numpy(zero_copy_only=False) for name in CHANNEL_NAMES
+            }) if set(CHANNEL_NAMES) <= set(table.column_names) else None,
+        )
+
+    def with_channels(self, track, car):
+        """The table with the DerivedChannels of ``car`` (setup applied) on ``track`` attached"""
+        return dataclasses.replace(self, channels=lap_channels(track, car, self))
+
+    def channel_columns(self):
+        """Derived channel columns for export: g-forces as float32, flags as bool; empty without channels"""
+        if self.channels is None:
+            return {}
+        return {name: values.astype(np.float32) if values.dtype.kind == 'f' else values
+                for name, values in self.channels.columns().items()}
+
+    def to_arrow(self, lap=0):
+        """pyarrow Table with a ``lap`` column and a dictionary-typed ``segment`` column"""
+        pa = _pyarrow()
+        return pa.table({
+            'lap': np.full(len(self), lap, dtype=np.uint32),
+            'distance': self.distance,
+            'speed': self.speed,
+            'time': self.time,
+            'segment': pa.DictionaryArray.from_arrays(self.segment, pa.array(self.segment_names, pa.string())),
+            **self.channel_columns(),
+        })
+
+    def to_pandas(self):
+        """DataFrame with a categorical Segment column"""
+        import pandas as pd
+        return pd.DataFrame({
+            'Distance (m)': self.distance,
+            'Speed (km/h)': self.speed,
+            'Time (s)': self.time,
+            'Segment': pd.Categorical.from_codes(self.segment, self.segment_names),
+            **{CHANNEL_LABELS[name]: values for name, values in self.channel_columns().items()},
+        })
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow telemetry need pyarrow: pip install pyarrow")
+    return pyarrow
+
+def _single_chunk(column):
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+def _as_laps(laps):
+    return [laps] if isinstance(laps, TelemetryTable) else laps
+
+def _telemetry_format(path, fmt):
+    if fmt is None:
+        fmt = TELEMETRY_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in TELEMETRY_FORMATS.values():
+        raise ValueError(f"Unknown telemetry format for '{path}', expected one of {sorted(set(TELEMETRY_FORMATS.values()))}")
+    return fmt
+
+def _csv_block(lap, distance, speed, time, segment, segment_names, channels=()):
+    """CSV text of consecutive samples of one lap"""
+    block = io.StringIO()
+    csv.writer(block, lineterminator="\n").writerows(zip(
+        [lap] * len(distance),
+        np.char.mod('%.7g', distance),
+        np.char.mod('%.7g', speed),
+        np.char.mod('%.7g', time),
+        [segment_names[code] for code in segment.tolist()],
+        *(values.tolist() for values in channels),
+    ))
+    return block.getvalue()
+
+def iter_csv(laps, block_rows=TELEMETRY_CHUNK_SIZE):
+    """CSV text of one or more TelemetryTable laps, as blocks of at most block_rows rows.
+
+    Derived channel columns follow the segment when the first lap has
+    channels; every lap must then have them.  A TelemetryStream is written
+    chunk by chunk as the lap is simulated, one block per chunk, without
+    channels (they need the whole lap).
+    """
+    header = "lap,distance,speed,time,segment"
+    if isinstance(laps, TelemetryStream):
+        yield header + "\n"
+        for chunk in laps:
+            yield _csv_block(0, chunk.distance, chunk.speed, chunk.time, chunk.segment, laps.segment_names)
+        return
+
+    laps = iter(_as_laps(laps))
+    first = next(laps, None)
+    with_channels = first is not None and first.channels is not None
+    yield header + "".join(f",{name}" for name in CHANNEL_NAMES if with_channels) + "\n"
+    for lap, table in enumerate(itertools.chain([first] if first is not None else [], laps)):
+        if (table.channels is not None) != with_channels:
+            raise ValueError(f"Lap {lap}: every lap of a CSV export must have derived channels or none")
+        channels = [np.char.mod('%.4g', values) if values.dtype.kind == 'f' else values.astype(np.int8)
+                    for values in table.channel_columns().values()]
+        for start in range(0, len(table), block_rows):
+            stop = start + block_rows
+            yield _csv_block(lap, table.distance[start:stop], table.speed[start:stop], table.time[start:stop],
+                             table.segment[start:stop], table.segment_names,
+                             [values[start:stop] for values in channels])
+
+def write_telemetry(path, laps, fmt=None):
+    """Write one TelemetryTable or an iterable of them (numbered laps) to ``path``.
+
+    ``fmt`` is "parquet", "arrow" (IPC stream, one record batch per lap, so
+    laps from different tracks can carry different segment dictionaries) or
+    "csv"; by default it follows the file suffix.  CSV also takes a
+    TelemetryStream, written chunk by chunk as in iter_csv().  Parquet and Arrow also
+    accept a binary file object as ``path`` when ``fmt`` is given.  Laps are written one at a
+    time, so an iterable of laps is never held in memory at once.
+    """
+    fmt = _telemetry_format(path, fmt)
+    if fmt == "csv":
+        with open(path, 'w', newline='') as f:
+            f.writelines(iter_csv(laps))
+        return
+
+    pa = _pyarrow()
+    writer = None
+    try:
+        for lap, table in enumerate(_as_laps(laps)):
+            table = table.to_arrow(lap)
+            if writer is None:
+                if fmt == "parquet":
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(path, table.schema)
+                else:
+                    writer = pa.ipc.new_stream(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def read_telemetry(path, fmt=None):
+    """Telemetry written by write_telemetry() as a pyarrow Table.
+
+    Arrow files are memory-mapped, so columns are zero-copy views of the
+    file and thousands of stored laps can be scanned without loading them.
+    """
+    fmt = _telemetry_format(path, fmt)
+    pa = _pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    if fmt == "arrow":
+        source = pa.memory_map(path)
+        if source.read(6) == b"ARROW1":  # IPC file (Feather v2) rather than stream
+            return pa.ipc.open_file(source).read_all()
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+    raise ValueError("CSV telemetry is export only; write Parquet or Arrow to read it back")
@@ -0,0 +1,205 @@
+"""Setup optimizer: CMA-ES search of Car parameters for the fastest lap on a track"""
+import numpy as np
+import dataclasses
+import math
+
+from .cars import CarSetup
+from .physics import CAR_PHYSICS_FIELDS, _stacked_envelope_speeds, stack_cars
+
+SETUP_BOUNDS = {"downforce_coef": (0.5, 1.5)}  # default search range, as factors of the base car's value
+AERO_DRAG_EXPONENT = 2.0  # along a car's aero map drag_coef grows with downforce_coef to this power
+SETUP_POPULATION = 16  # candidates per generation, solved as one stacked batch
+SETUP_MAX_GENERATIONS = 80
+SETUP_TOLERANCE = 1e-4  # stop once the search spreads less than this share of the bounds
+SETUP_STALL_GENERATIONS = 20  # or once the best lap improved less than SETUP_STALL_TIME over this many
+SETUP_STALL_TIME = 1e-4  # s
+BOUND_PENALTY = 100.0  # s per squared bound width a candidate lies outside the bounds
+CACHE_DIGITS = 10  # significant digits of the parameters keying the evaluation cache
+SETUP_STEP_SIZE = 0.3  # initial spread of the search, as a share of the bounds
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SetupTrace:
+    """State of the search after one generation"""
+    generation: int
+    evaluations: int  # lap solves so far, cache hits excluded
+    best_lap_time: float  # s, best so far
+    mean_lap_time: float  # s, of this generation's candidates, clipped to the bounds
+    step_size: float  # spread of the search, as a share of the bounds
+    parameters: dict  # best so far
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SetupResult:
+    """Fastest car found, its lap time and parameters, and the trace of every generation"""
+    car: object
+    lap_time: float
+    start_lap_time: float  # s, of the car's own values clipped to the bounds
+    parameters: dict
+    trace: tuple
+    evaluations: int
+    cache_hits: int
+
+    def to_pandas(self):
+        """Convergence trace, one row per generation"""
+        import pandas as pd
+        return pd.DataFrame({
+            'Generation': [point.generation for point in self.trace],
+            'Evaluations': [point.evaluations for point in self.trace],
+            'Best Lap Time': [point.best_lap_time for point in self.trace],
+            'Mean Lap Time': [point.mean_lap_time for point in self.trace],
+            'Step Size': [point.step_size for point in self.trace],
+            **{name: [point.parameters[name] for point in self.trace] for name in self.parameters},
+        })
+
+def setup_bounds(car, factors=None):
+    """Absolute search bounds from ``factors`` (default SETUP_BOUNDS) of the car's own values"""
+    return {name: (getattr(car, name) * low, getattr(car, name) * high)
+            for name, (low, high) in (factors or SETUP_BOUNDS).items()}
+
+def aero_map_drag(car, downforce_coef):
+    """drag_coef of ``car`` trimmed to ``downforce_coef``, following AERO_DRAG_EXPONENT"""
+    if car.downforce_coef <= 0:
+        return np.full(np.shape(downforce_coef), car.drag_coef)
+    return car.drag_coef * (np.asarray(downforce_coef, dtype=float) / car.downforce_coef) ** AERO_DRAG_EXPONENT
+
+def setup_lap_times(track, car, parameters, setup=None, cache=None):
+    """Lap times (s) of ``car`` with ``parameters`` (field name to array of values) applied, in one stacked solve.
+
+    ``setup`` applies as in Car.with_setup().  ``cache``, a dict, keeps
+    every lap time by track and car values; points already in it are not
+    solved again.  Returns (lap times, number of cache hits).
+    """
+    setup = setup or CarSetup()
+    cache = {} if cache is None else cache
+    n_points = len(next(iter(parameters.values())))
+    cars = [dataclasses.replace(car, **{name: float(values[i]) for name, values in parameters.items()})
+            for i in range(n_points)]
+    keys = [(track.compiled, car.category, setup.fuel_load, setup.grip_factor,
+             *(float(f"{getattr(candidate, field):.{CACHE_DIGITS}g}") for field in CAR_PHYSICS_FIELDS))
+            for candidate in cars]
+
+    missing = {}  # Key to index of its first candidate, so duplicates are solved once
+    for i, key in enumerate(keys):
+        if key not in cache:
+            missing.setdefault(key, i)
+    if missing:
+        stacked = stack_cars([cars[i] for i in missing.values()],
+                             grip_factors=setup.grip_factor, extra_mass=setup.fuel_load)
+        _, _, lap_times = _stacked_envelope_speeds(track.compiled, stacked)
+        cache.update(zip(missing, lap_times.tolist()))
+    return np.array([cache[key] for key in keys]), n_points - len(missing)
+
+def optimize_setup(track, car, bounds=None, setup=None, aero_map=True, population=SETUP_POPULATION,
+                   max_generations=SETUP_MAX_GENERATIONS, seed=0, cache=None, callback=None):
+    """Search ``car`` parameters within ``bounds`` for the fastest lap on ``track`` with CMA-ES.
+
+    ``bounds`` maps CAR_PHYSICS_FIELDS names to (low, high); the default is
+    setup_bounds(car), the downforce level.  With ``aero_map``, a search of
+    downforce_coef without drag_coef trims drag along aero_map_drag(), so
+    downforce is traded against straight-line speed.  Every generation of
+    ``population`` candidates is solved as one stacked envelope batch
+    through setup_lap_times() and its ``cache``.  The search starts from
+    the car's own values (clipped to the bounds) and is seeded by ``seed``,
+    so runs repeat exactly.  It stops after ``max_generations``, once its
+    spread falls below SETUP_TOLERANCE of the bounds, or once the best lap
+    stalls.  ``callback``, if given, receives every SetupTrace as it is made.
+    """
+    bounds = setup_bounds(car) if bounds is None else dict(bounds)
+    unknown = [name for name in bounds if name not in CAR_PHYSICS_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown car parameters {unknown}, expected some of {list(CAR_PHYSICS_FIELDS)}")
+    if not bounds:
+        raise ValueError("bounds must name at least one car parameter")
+    for name, (low, high) in bounds.items():
+        if not 0 <= low < high:
+            raise ValueError(f"Bounds of {name} must satisfy 0 <= low < high, got ({low}, {high})")
+    if population < 4:
+        raise ValueError(f"population must be at least 4, got {population}")
+    cache = {} if cache is None else cache
+    names = list(bounds)
+    low, high = (np.array([bounds[name][side] for name in names]) for side in (0, 1))
+    trim_drag = aero_map and "downforce_coef" in bounds and "drag_coef" not in bounds
+
+    def parameters(points):
+        values = {name: low[i] + points[:, i] * (high[i] - low[i]) for i, name in enumerate(names)}
+        if trim_drag:
+            values["drag_coef"] = aero_map_drag(car, values["downforce_coef"])
+        return values
+
+    # CMA-ES on the unit box, standard strategy parameters (Hansen's tutorial)
+    n = len(names)
+    mu = population // 2
+    weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+    weights /= weights.sum()
+    mu_eff = 1 / (weights**2).sum()
+    c_c = (4 + mu_eff / n) / (n + 4 + 2 * mu_eff / n)
+    c_s = (mu_eff + 2) / (n + mu_eff + 5)
+    c_1 = 2 / ((n + 1.3)**2 + mu_eff)
+    c_mu = min(1 - c_1, 2 * (mu_eff - 2 + 1 / mu_eff) / ((n + 2)**2 + mu_eff))
+    damping = 1 + 2 * max(0.0, math.sqrt((mu_eff - 1) / (n + 1)) - 1) + c_s
+    chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n**2))
+
+    rng = np.random.default_rng(seed)
+    start = np.array([getattr(car, name) for name in names])
+    mean = np.clip((start - low) / (high - low), 0.0, 1.0)
+    sigma = SETUP_STEP_SIZE
+    covariance = np.eye(n)
+    path_c = np.zeros(n)
+    path_s = np.zeros(n)
+
+    start_times, hits = setup_lap_times(track, car, parameters(mean[None, :]), setup, cache)
+    best_point, best_time = mean, float(start_times[0])
+    evaluations, cache_hits = 1 - hits, hits
+    trace = []
+    for generation in range(1, max_generations + 1):
+        eigenvalues, basis = np.linalg.eigh(covariance)
+        scales = np.sqrt(np.maximum(eigenvalues, 1e-20))
+        steps = rng.standard_normal((population, n)) * scales @ basis.T
+        points = mean + sigma * steps
+        feasible = np.clip(points, 0.0, 1.0)
+        lap_times, hits = setup_lap_times(track, car, parameters(feasible), setup, cache)
+        evaluations += population - hits
+        cache_hits += hits
+        fitness = lap_times + BOUND_PENALTY * ((points - feasible)**2).sum(axis=1)
+
+        fastest = int(lap_times.argmin())
+        if lap_times[fastest] < best_time:
+            best_point, best_time = feasible[fastest], float(lap_times[fastest])
+
+        order = np.argsort(fitness)[:mu]
+        step = weights @ steps[order]
+        mean = mean + sigma * step
+        path_s = (1 - c_s) * path_s + math.sqrt(c_s * (2 - c_s) * mu_eff) * (basis @ ((basis.T @ step) / scales))
+        grown = np.linalg.norm(path_s) / math.sqrt(1 - (1 - c_s)**(2 * generation)) / chi_n < 1.4 + 2 / (n + 1)
+        path_c = (1 - c_c) * path_c + grown * math.sqrt(c_c * (2 - c_c) * mu_eff) * step
+        covariance = ((1 - c_1 - c_mu) * covariance
+                      + c_1 * (np.outer(path_c, path_c) + (not grown) * c_c * (2 - c_c) * covariance)
+                      + c_mu * (steps[order].T * weights) @ steps[order])
+        sigma *= math.exp(c_s / damping * (np.linalg.norm(path_s) / chi_n - 1))
+
+        spread = sigma * math.sqrt(float(np.diag(covariance).max()))
+        point = SetupTrace(
+            generation=generation,
+            evaluations=evaluations,
+            best_lap_time=best_time,
+            mean_lap_time=float(lap_times.mean()),
+            step_size=spread,
+            parameters={name: float(values[0]) for name, values in parameters(best_point[None, :]).items()},
+        )
+        trace.append(point)
+        if callback is not None:
+            callback(point)
+        stalled = (generation > SETUP_STALL_GENERATIONS
+                   and trace[-SETUP_STALL_GENERATIONS - 1].best_lap_time - best_time < SETUP_STALL_TIME)
+        if spread < SETUP_TOLERANCE or stalled:
+            break
+
+    best = {name: float(values[0]) for name, values in parameters(best_point[None, :]).items()}
+    return SetupResult(
+        car=dataclasses.replace(car, **best),
+        lap_time=best_time,
+        start_lap_time=float(start_times[0]),
+        parameters=best,
+        trace=tuple(trace),
+        evaluations=evaluations,
+        cache_hits=cache_hits,
+    )